@@ -0,0 +1,170 @@
+"""
+Guardrails throughput benchmark suite
+
+Generates a synthetic OpenClaw log with a configurable size and violation
+density, loads a configurable rule set (random rules, sequence rules and,
+optionally, every preset) and measures evaluate_log_line, check_rate_limit and
+get_violations: calls/sec, p50/p99 latency and peak traced memory.
+
+Results are JSON so runs from different versions can be compared:
+
+    python benchmarks/bench_guardrails.py --output before.json
+    python benchmarks/bench_guardrails.py --compare before.json
+"""
+import argparse
+import json
+import platform
+import random
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+
+from common import make_engine, time_calls
+from clawcontrol.core.constants import VERSION
+from clawcontrol.services.presets import PRESETS
+
+TOOLS = ["shell", "read_file", "write_file", "browser", "search"]
+WORDS = ["build", "test", "deploy", "lint", "fetch", "parse", "render", "index", "merge", "update"]
+
+
+def make_rules(rule_count: int, patterns_per_rule: int, include_presets: bool,
+               sequence_count: int, rng: random.Random) -> list:
+    rules = [
+        {
+            "name": f"synthetic-{i}",
+            "block_patterns": [f"blk{i}x{j}{rng.randint(0, 9999):04d}" for j in range(patterns_per_rule)]
+        }
+        for i in range(rule_count)
+    ]
+    rules.extend(
+        {
+            "name": f"sequence-{i}",
+            "rule_type": "sequence",
+            "sequence_patterns": [f"seq{i}step{step}" for step in range(3)],
+            "sequence_window_lines": 50
+        }
+        for i in range(sequence_count)
+    )
+    if include_presets:
+        rules.extend(
+            {"name": preset["name"], "block_patterns": preset["block_patterns"],
+             "rate_limit_per_min": preset["rate_limit_per_min"]}
+            for preset in PRESETS.values()
+        )
+    return rules
+
+
+def make_log(line_count: int, density: float, patterns: list, rng: random.Random) -> list:
+    """Synthetic OpenClaw-style lines; `density` of them contain a blocked pattern"""
+    start = datetime(2026, 1, 1)
+    lines = []
+    for i in range(line_count):
+        ts = (start + timedelta(milliseconds=37 * i)).isoformat()
+        tool = rng.choice(TOOLS)
+        args = " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 12)))
+        if patterns and rng.random() < density:
+            args += " " + rng.choice(patterns)
+        lines.append(f"{ts} INFO [tool:{tool}] {args}")
+    return lines
+
+
+def measure(func, args_list: list) -> dict:
+    """Timing pass without tracing, then a traced pass for peak memory"""
+    result = time_calls(func, args_list)
+
+    tracemalloc.start()
+    for args in args_list[:min(len(args_list), 2000)]:
+        func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result["peak_kb"] = round(peak / 1024, 1)
+    return result
+
+
+def run(args) -> dict:
+    rng = random.Random(args.seed)
+    rules = make_rules(args.rules, args.patterns, not args.no_presets, args.sequences, rng)
+    patterns = [
+        pattern for rule in rules
+        for pattern in rule.get("block_patterns", []) + rule.get("sequence_patterns", [])
+    ]
+    lines = make_log(args.lines, args.density, patterns, rng)
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = make_engine(directory, rules)
+        rule_ids = list(engine.rules)
+
+        results = {
+            "evaluate_log_line": measure(engine.evaluate_log_line, [(line, "benchmark") for line in lines]),
+            "check_rate_limit": measure(
+                engine.check_rate_limit,
+                [(rule_ids[i % len(rule_ids)], f"source-{i % 16}") for i in range(args.lines)]
+            ),
+            "get_violations": measure(engine.get_violations, [()] * args.queries)
+        }
+        results["evaluate_log_line"]["violating_lines"] = sum(
+            1 for line in lines if engine._match_line(line)
+        )
+        engine.close()
+
+    return {
+        "benchmark": "guardrails",
+        "version": VERSION,
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "params": {
+            "lines": args.lines,
+            "density": args.density,
+            "rules": len(rules),
+            "patterns": len(patterns),
+            "sequences": args.sequences,
+            "presets": not args.no_presets,
+            "seed": args.seed
+        },
+        "results": results
+    }
+
+
+def compare(current: dict, baseline: dict):
+    """Print per-operation throughput ratios against a previous run"""
+    print(f"Comparing against {baseline.get('version')} ({baseline.get('timestamp')})")
+    print(f"{'operation':>20} {'baseline/s':>12} {'current/s':>12} {'ratio':>7}")
+    for name, result in current["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or not previous.get("per_sec"):
+            continue
+        ratio = result["per_sec"] / previous["per_sec"]
+        print(f"{name:>20} {previous['per_sec']:>12} {result['per_sec']:>12} {ratio:>7.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--lines", type=int, default=20000, help="Synthetic log lines")
+    parser.add_argument("--density", type=float, default=0.01, help="Fraction of lines with a violation")
+    parser.add_argument("--rules", type=int, default=20, help="Synthetic rules in addition to presets")
+    parser.add_argument("--patterns", type=int, default=10, help="Block patterns per synthetic rule")
+    parser.add_argument("--sequences", type=int, default=0, help="Three-step sequence rules")
+    parser.add_argument("--no-presets", action="store_true", help="Do not load presets.PRESETS")
+    parser.add_argument("--queries", type=int, default=1000, help="get_violations calls")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--compare", help="Baseline JSON results to compare against")
+    args = parser.parse_args()
+
+    report = run(args)
+    output = json.dumps(report, indent=2)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
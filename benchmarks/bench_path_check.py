@@ -0,0 +1,74 @@
+"""
+Benchmark for allowed_paths enforcement
+
+Measures evaluate_log_line per-line latency with path checking off and
+on while the number of allowed prefixes grows. Lookup cost should stay
+flat because prefixes are compiled into a single trie.
+
+Usage:
+    python benchmarks/bench_path_check.py [--lines 20000] [--json]
+"""
+import argparse
+import json
+import random
+import tempfile
+
+from common import make_engine, time_calls
+
+DIRECTORIES = ["srv", "opt", "data", "projects", "work", "cache", "build"]
+
+
+def make_lines(count: int, allowed: list, rng: random.Random) -> list:
+    lines = []
+    for i in range(count):
+        if i % 3 == 0:
+            lines.append(f"[tool:write] path={rng.choice(allowed)}/file{i}.txt bytes=512")
+        elif i % 3 == 1:
+            lines.append(f"[tool:shell] ls -la /{rng.choice(DIRECTORIES)}/project{i % 7}/src")
+        else:
+            lines.append(f"[agent] thinking about step {i} without touching files")
+    return lines
+
+
+def run_case(prefix_count: int, line_count: int, directory: str) -> dict:
+    rng = random.Random(prefix_count)
+    allowed = [f"/{rng.choice(DIRECTORIES)}/team{i}/workspace" for i in range(prefix_count)]
+    engine = make_engine(directory, [{"name": "sandbox", "allowed_paths": allowed}])
+    lines = [(line,) for line in make_lines(line_count, allowed, rng)]
+
+    engine.check_paths = False
+    off = time_calls(engine._match_line, lines)
+    engine.check_paths = True
+    on = time_calls(engine._match_line, lines)
+    engine.close()
+
+    return {
+        "allowed_paths": prefix_count,
+        "lines": line_count,
+        "off": off,
+        "on": on,
+        "overhead_p50_us": round(on["p50_us"] - off["p50_us"], 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--lines", type=int, default=20000)
+    parser.add_argument("--json", action="store_true", help="Emit machine-readable results")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = [run_case(count, args.lines, directory) for count in (10, 100, 1000, 5000)]
+
+    if args.json:
+        print(json.dumps({"benchmark": "path_check", "results": results}, indent=2))
+        return
+
+    print(f"{'prefixes':>9} {'off p50us':>10} {'on p50us':>9} {'on p99us':>9} {'overhead':>9}")
+    for r in results:
+        print(f"{r['allowed_paths']:>9} {r['off']['p50_us']:>10} {r['on']['p50_us']:>9} "
+              f"{r['on']['p99_us']:>9} {r['overhead_p50_us']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Micro-benchmark for per-rule rate limiting
+
+Runs sustained check_rate_limit-style load against TokenBucketLimiter
+for increasing limits and sources, and reports the cost per check.
+The cost should stay flat as limits and traffic grow.
+
+Usage:
+    python benchmarks/bench_rate_limit.py [--checks 200000] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clawcontrol.services.rate_limiter import TokenBucketLimiter
+
+
+def run_case(rate_per_min: int, sources: int, checks: int) -> dict:
+    """Time `checks` acquisitions spread over `sources` buckets"""
+    limiter = TokenBucketLimiter()
+    keys = [f"source-{i}" for i in range(sources)] if sources > 1 else [None]
+    key_count = len(keys)
+
+    start = time.perf_counter()
+    allowed = 0
+    for i in range(checks):
+        if limiter.acquire("rule", rate_per_min, keys[i % key_count]):
+            allowed += 1
+    elapsed = time.perf_counter() - start
+
+    return {
+        "rate_limit_per_min": rate_per_min,
+        "sources": sources,
+        "checks": checks,
+        "allowed": allowed,
+        "ns_per_check": round(elapsed / checks * 1e9, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--checks", type=int, default=200000)
+    parser.add_argument("--json", action="store_true", help="Emit machine-readable results")
+    args = parser.parse_args()
+
+    results = [
+        run_case(rate, sources, args.checks)
+        for rate in (60, 1000, 100000)
+        for sources in (1, 1000)
+    ]
+
+    if args.json:
+        print(json.dumps({"benchmark": "rate_limit", "results": results}, indent=2))
+        return
+
+    print(f"{'limit/min':>10} {'sources':>8} {'allowed':>9} {'ns/check':>9}")
+    for r in results:
+        print(f"{r['rate_limit_per_min']:>10} {r['sources']:>8} {r['allowed']:>9} {r['ns_per_check']:>9}")
+
+
+if __name__ == "__main__":
+    main()
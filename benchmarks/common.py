@@ -0,0 +1,58 @@
+"""
+Shared helpers for benchmarks: an isolated GuardrailsEngine and timing
+"""
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("CLAW_TOKEN", "benchmark")
+
+from clawcontrol.services import guardrails as guardrails_module
+from clawcontrol.api.models import GuardRule
+
+
+def make_engine(directory: Path, rules: Iterable[Dict] = ()) -> "guardrails_module.GuardrailsEngine":
+    """Build an engine whose rules and violations live under `directory`"""
+    directory = Path(directory)
+    guardrails_module.config.rules_file = directory / "rules.json"
+    guardrails_module.VIOLATIONS_LOG_FILE = directory / "violations.log"
+    guardrails_module.VIOLATIONS_DIR = directory / "violations"
+
+    engine = guardrails_module.GuardrailsEngine()
+    engine._swap_rules({
+        rule_data.get("id", f"rule-{i}"): GuardRule(id=rule_data.get("id", f"rule-{i}"), **{
+            key: value for key, value in rule_data.items() if key != "id"
+        })
+        for i, rule_data in enumerate(rules)
+    })
+    return engine
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def time_calls(func: Callable, args_list: List) -> Dict:
+    """Call func once per args entry and summarize per-call latency"""
+    latencies = []
+    perf_counter = time.perf_counter
+    start = perf_counter()
+    for args in args_list:
+        call_start = perf_counter()
+        func(*args)
+        latencies.append(perf_counter() - call_start)
+    elapsed = perf_counter() - start
+
+    latencies.sort()
+    return {
+        "calls": len(args_list),
+        "per_sec": round(len(args_list) / elapsed, 1) if elapsed else None,
+        "p50_us": round(percentile(latencies, 0.50) * 1e6, 2),
+        "p99_us": round(percentile(latencies, 0.99) * 1e6, 2)
+    }
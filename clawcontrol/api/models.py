@@ -2,7 +2,7 @@
 Pydantic models for Claw Control API
 """
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel, Field
 
 
@@ -14,6 +14,10 @@ class GuardRule(BaseModel):
     allowed_paths: List[str] = Field(default_factory=list, description="Allowed file paths")
     rate_limit_per_min: int = Field(default=60, description="Max actions per minute")
     enabled: bool = Field(default=True, description="Whether rule is active")
+    rule_type: Literal["pattern", "sequence"] = Field(default="pattern", description="Single-line patterns or a multi-line sequence")
+    sequence_patterns: List[str] = Field(default_factory=list, description="Patterns that must appear in order on separate lines")
+    sequence_window_lines: Optional[int] = Field(None, description="Max lines from first to last sequence step")
+    sequence_window_seconds: Optional[float] = Field(None, description="Max seconds from first to last sequence step")
 
 
 class GuardRuleCreate(BaseModel):
@@ -23,6 +27,10 @@ class GuardRuleCreate(BaseModel):
     allowed_paths: List[str] = Field(default_factory=list)
     rate_limit_per_min: int = 60
     enabled: bool = True
+    rule_type: Literal["pattern", "sequence"] = "pattern"
+    sequence_patterns: List[str] = Field(default_factory=list)
+    sequence_window_lines: Optional[int] = None
+    sequence_window_seconds: Optional[float] = None
 
 
 class ViolationEvent(BaseModel):
@@ -33,16 +41,33 @@ class ViolationEvent(BaseModel):
     severity: str = Field(default="warning", description="Severity level")
 
 
+class EvaluateBatchRequest(BaseModel):
+    """Request to evaluate a chunk of log lines"""
+    lines: List[str] = Field(..., description="Log lines to evaluate")
+
+
+class EvaluateBatchResponse(BaseModel):
+    """Batch evaluation response"""
+    violations: List[ViolationEvent]
+    total: int
+    lines_evaluated: int
+
+
 class OpenClawStatus(BaseModel):
     """OpenClaw status model"""
     running: bool = Field(..., description="Whether OpenClaw is running")
     pid: Optional[int] = Field(None, description="Process ID if running")
     last_seen: Optional[datetime] = Field(None, description="Last activity timestamp")
+    exit_code: Optional[int] = Field(None, description="Exit code of the last run, once it has exited")
+    restarts: int = Field(0, description="Automatic restarts since the last start request")
 
 
 class OpenClawStartRequest(BaseModel):
     """Request to start OpenClaw"""
     openclaw_path: Optional[str] = Field("openclaw", description="Path to OpenClaw executable")
+    restart_policy: Optional[Literal["never", "on-failure", "always"]] = Field(
+        None, description="Restart OpenClaw when it exits (defaults to OPENCLAW_RESTART_POLICY)"
+    )
 
 
 class HealthResponse(BaseModel):
@@ -57,15 +82,67 @@ class StatusResponse(BaseModel):
     health: str
     openclaw_status: OpenClawStatus
     last_violation: Optional[ViolationEvent] = None
+    violations_total: int = 0
+    updated_at: Optional[datetime] = None
 
 
 class LogsResponse(BaseModel):
     """Logs response"""
     lines: List[str]
     total: int
+    next_offset: int = 0
+
+
+class LogSearchHit(BaseModel):
+    """One log line matching a search"""
+    position: int = Field(..., description="Global byte position of the line across rotations")
+    line: str
+
+
+class LogSearchResponse(BaseModel):
+    """Log search results"""
+    hits: List[LogSearchHit]
+    total: int
+    next_cursor: Optional[int] = None
+
+
+class LogRangeResponse(BaseModel):
+    """Log lines within a time range"""
+    lines: List[str]
+    total: int
+    blocks_read: int
+
+
+class LogEvent(BaseModel):
+    """A parsed log line"""
+    ts: datetime
+    level: str
+    tool: str
+    command: str
+    args: str
+
+
+class LogEventsResponse(BaseModel):
+    """Parsed log events"""
+    events: List[LogEvent]
+    total: int
+
+
+class ActionsPerMinute(BaseModel):
+    """Tool actions in one minute"""
+    minute: datetime
+    tool: str
+    count: int
+
+
+class CommandCount(BaseModel):
+    """How often a command was run"""
+    command: str
+    count: int
 
 
 class ViolationsResponse(BaseModel):
     """Violations response"""
     violations: List[ViolationEvent]
     total: int
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page of history")
@@ -4,20 +4,36 @@ API Routes for Claw Control (Phase 1 LSO MVP)
 from datetime import datetime
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
 from clawcontrol.api.auth import verify_token
 from clawcontrol.api.models import (
     GuardRule,
     GuardRuleCreate,
     ViolationEvent,
+    EvaluateBatchRequest,
+    EvaluateBatchResponse,
     OpenClawStatus,
     OpenClawStartRequest,
     HealthResponse,
     StatusResponse,
     LogsResponse,
+    LogRangeResponse,
+    LogSearchResponse,
+    LogEventsResponse,
+    ActionsPerMinute,
+    CommandCount,
     ViolationsResponse,
 )
 from clawcontrol.services.guardrails import guardrails_engine
 from clawcontrol.services.openclaw_adapter import openclaw_adapter
+from clawcontrol.services.log_follower import log_follower
+from clawcontrol.services.log_broadcaster import log_broadcaster
+from clawcontrol.services.log_rotator import log_rotator
+from clawcontrol.services.log_index import log_index
+from clawcontrol.services.event_store import event_store
+from clawcontrol.services.alert_dispatcher import alert_dispatcher
+from clawcontrol.services.metrics import metrics_collector
+from clawcontrol.services.status_snapshot import status_snapshot
 
 router = APIRouter(prefix="/api", dependencies=[Depends(verify_token)])
 
@@ -30,16 +46,8 @@ async def health_check():
 
 @router.get("/status", response_model=StatusResponse)
 async def get_status():
-    """Get combined system status"""
-    openclaw_status = openclaw_adapter.status()
-    violations = guardrails_engine.get_violations(limit=1)
-    last_violation = violations[0] if violations else None
-    
-    return StatusResponse(
-        health="ok",
-        openclaw_status=openclaw_status,
-        last_violation=last_violation
-    )
+    """Get combined system status (prebuilt, kept current by events)"""
+    return Response(content=status_snapshot.status_json(), media_type="application/json")
 
 
 @router.get("/rules", response_model=List[GuardRule])
@@ -84,31 +92,207 @@ async def delete_rule(rule_id: str):
 @router.get("/violations", response_model=ViolationsResponse)
 async def get_violations(
     since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    rule_id: Optional[str] = None,
+    severity: Optional[str] = None,
+    cursor: Optional[str] = None,
     limit: int = Query(100, ge=1, le=1000)
 ):
-    """Get violation events"""
-    violations = guardrails_engine.get_violations(since=since, limit=limit)
+    """
+    Get violation events
+    
+    Without filters, returns the most recent violations. With any of
+    since/until/rule_id/severity/cursor, pages through the full history
+    in time order; pass `next_cursor` back as `cursor` for the next page.
+    """
+    if since is None and until is None and rule_id is None and severity is None and cursor is None:
+        violations = guardrails_engine.get_violations(limit=limit)
+        return ViolationsResponse(violations=violations, total=len(violations))
+    
+    try:
+        violations, next_cursor = guardrails_engine.query_violations(
+            since=since,
+            until=until,
+            rule_id=rule_id,
+            severity=severity,
+            limit=limit,
+            cursor=cursor
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
     return ViolationsResponse(
         violations=violations,
-        total=len(violations)
+        total=len(violations),
+        next_cursor=next_cursor
+    )
+
+
+@router.post("/evaluate/batch", response_model=EvaluateBatchResponse)
+def evaluate_batch(request: EvaluateBatchRequest):
+    """Evaluate a chunk of log lines against all rules"""
+    # Plain def: FastAPI runs it in the threadpool, off the event loop
+    violations = guardrails_engine.evaluate_log_lines(request.lines)
+    return EvaluateBatchResponse(
+        violations=violations,
+        total=len(violations),
+        lines_evaluated=len(request.lines)
     )
 
 
 @router.get("/logs", response_model=LogsResponse)
-async def get_logs(tail: int = Query(100, ge=1, le=1000)):
-    """Get OpenClaw logs"""
-    lines = openclaw_adapter.logs(tail=tail)
+async def get_logs(
+    tail: int = Query(100, ge=1, le=1000),
+    since_offset: Optional[int] = Query(None, ge=0)
+):
+    """
+    Get OpenClaw logs
+    
+    Without `since_offset` the last `tail` lines are returned. Pass the
+    previous response's `next_offset` as `since_offset` to receive only
+    lines appended since then.
+    """
+    if since_offset is None:
+        lines, next_offset = openclaw_adapter.tail(tail)
+    else:
+        lines, next_offset = openclaw_adapter.read_since(since_offset)
+    
     return LogsResponse(
         lines=lines,
-        total=len(lines)
+        total=len(lines),
+        next_offset=next_offset
     )
 
 
+@router.get("/logs/range", response_model=LogRangeResponse)
+def get_logs_range(
+    start: datetime,
+    end: datetime,
+    limit: int = Query(1000, ge=1, le=10000)
+):
+    """Get OpenClaw log lines between two timestamps, including rotated segments"""
+    # Plain def: reading and decompressing segments runs in the threadpool
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    
+    lines, blocks_read = log_rotator.query(start, end, limit=limit)
+    return LogRangeResponse(
+        lines=lines,
+        total=len(lines),
+        blocks_read=blocks_read
+    )
+
+
+@router.get("/logs/search", response_model=LogSearchResponse)
+def search_logs(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(50, ge=1, le=1000),
+    cursor: Optional[int] = Query(None, ge=0)
+):
+    """
+    Search OpenClaw logs, oldest match first
+    
+    Every word in `q` must appear in the line; quoted text must appear
+    verbatim. Pass `next_cursor` back as `cursor` for the next page.
+    """
+    # Plain def: posting files and hit lines are read in the threadpool
+    hits, next_cursor = log_index.search(q, limit=limit, cursor=cursor)
+    return LogSearchResponse(hits=hits, total=len(hits), next_cursor=next_cursor)
+
+
+@router.get("/logs/archive")
+async def get_log_archive_status():
+    """Get rotated log segment counts and sizes"""
+    return log_rotator.stats()
+
+
+@router.get("/logs/follow")
+async def get_log_follow_status():
+    """Get live log follower progress and detection latency"""
+    return {
+        **log_follower.stats(),
+        "stream": log_broadcaster.stats(),
+        "capture": openclaw_adapter.capture_stats()
+    }
+
+
+@router.get("/logs/stream")
+async def stream_logs():
+    """Stream newly appended OpenClaw log lines as Server-Sent Events"""
+    return StreamingResponse(
+        log_broadcaster.stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/events", response_model=LogEventsResponse)
+def get_events(
+    level: Optional[str] = None,
+    tool: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """Get the most recent parsed log events, oldest first"""
+    # Plain def: each event's line is read back from disk in the threadpool
+    events = event_store.events(level=level, tool=tool, since=since, until=until, limit=limit)
+    return LogEventsResponse(events=events, total=len(events))
+
+
+@router.get("/events/actions-per-minute", response_model=List[ActionsPerMinute])
+async def get_actions_per_minute(
+    tool: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    """Get tool actions per minute, broken down by tool"""
+    return event_store.actions_per_minute(tool=tool, since=since, until=until)
+
+
+@router.get("/events/top-commands", response_model=List[CommandCount])
+async def get_top_commands(
+    tool: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(10, ge=1, le=1000)
+):
+    """Get the most frequently run commands"""
+    return event_store.top_commands(limit=limit, tool=tool, since=since, until=until)
+
+
+@router.get("/events/stats")
+async def get_event_store_stats():
+    """Get parsed event counts and column memory use"""
+    return event_store.stats()
+
+
+@router.get("/alerts/delivery")
+async def get_alert_delivery_status():
+    """Get alert delivery throughput, queue depth and per-sink failures"""
+    return alert_dispatcher.stats()
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """Get the latest system metrics sample, history stats and sampler overhead"""
+    return {
+        "latest": metrics_collector.collect_system_metrics(),
+        "stats": metrics_collector.get_stats(),
+        "sampler": metrics_collector.sampler_stats()
+    }
+
+
 @router.post("/openclaw/start", response_model=OpenClawStatus)
 async def start_openclaw(request: OpenClawStartRequest = OpenClawStartRequest()):
     """Start OpenClaw process"""
     try:
-        return openclaw_adapter.start(openclaw_path=request.openclaw_path)
+        status = await openclaw_adapter.astart(
+            openclaw_path=request.openclaw_path,
+            restart_policy=request.restart_policy
+        )
+        status_snapshot.refresh()
+        return status
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -117,7 +301,9 @@ async def start_openclaw(request: OpenClawStartRequest = OpenClawStartRequest())
 async def stop_openclaw():
     """Stop OpenClaw gracefully"""
     try:
-        return openclaw_adapter.stop()
+        status = await openclaw_adapter.astop()
+        status_snapshot.refresh()
+        return status
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -125,4 +311,4 @@ async def stop_openclaw():
 @router.get("/openclaw/status", response_model=OpenClawStatus)
 async def get_openclaw_status():
     """Get OpenClaw status"""
-    return openclaw_adapter.status()
+    return Response(content=status_snapshot.openclaw_json(), media_type="application/json")
@@ -5,7 +5,7 @@ import os
 import json
 from pathlib import Path
 from dotenv import load_dotenv
-from .constants import CONFIG_DIR, LOGS_DIR, DATA_DIR
+from .constants import CONFIG_DIR, LOGS_DIR, DATA_DIR, STORAGE_DB_FILE
 
 load_dotenv()
 
@@ -28,6 +28,47 @@ class Config:
         self.host = os.getenv("HOST", "127.0.0.1")
         self.port = int(os.getenv("PORT", "8787"))
         
+        # Log following
+        self.log_follow_interval = float(os.getenv("LOG_FOLLOW_INTERVAL", "0.05"))
+        
+        # Flag paths outside a rule's allowed_paths
+        self.enforce_allowed_paths = os.getenv("ENFORCE_ALLOWED_PATHS", "true").lower() in ("1", "true", "yes")
+        
+        # Violations log durability: none, interval or always
+        self.violations_fsync = os.getenv("VIOLATIONS_FSYNC", "interval")
+        self.violations_flush_interval = float(os.getenv("VIOLATIONS_FLUSH_INTERVAL", "0.05"))
+        self.violations_retention_days = float(os.getenv("VIOLATIONS_RETENTION_DAYS", "30"))
+        
+        # OpenClaw restart policy: never, on-failure or always
+        self.openclaw_restart_policy = os.getenv("OPENCLAW_RESTART_POLICY", "never")
+        self.openclaw_max_restarts = int(os.getenv("OPENCLAW_MAX_RESTARTS", "5"))
+        self.openclaw_restart_backoff = float(os.getenv("OPENCLAW_RESTART_BACKOFF", "1.0"))
+        
+        # Read OpenClaw output from a pipe instead of its log file
+        self.openclaw_capture_mode = os.getenv("OPENCLAW_CAPTURE_MODE", "false").lower() in ("1", "true", "yes")
+        self.openclaw_capture_buffer_mb = float(os.getenv("OPENCLAW_CAPTURE_BUFFER_MB", "8"))
+        
+        # OpenClaw log rotation and archive retention
+        self.openclaw_log_max_mb = float(os.getenv("OPENCLAW_LOG_MAX_MB", "64"))
+        self.openclaw_log_retention_days = float(os.getenv("OPENCLAW_LOG_RETENTION_DAYS", "7"))
+        self.openclaw_log_archive_max_mb = float(os.getenv("OPENCLAW_LOG_ARCHIVE_MAX_MB", "1024"))
+        
+        # Structured log events: parser name and in-memory event cap
+        self.log_parser = os.getenv("LOG_PARSER", "default")
+        self.event_store_max_events = int(os.getenv("EVENT_STORE_MAX_EVENTS", "2000000"))
+        
+        # Seconds between OpenClaw liveness checks for /api/status
+        self.status_refresh_interval = float(os.getenv("STATUS_REFRESH_INTERVAL", "1.0"))
+        
+        # Persistence for alerts, analytics and violations: json or sqlite
+        self.storage_backend = os.getenv("STORAGE_BACKEND", "json").lower()
+        
+        # Seconds between background system metric samples (0 disables)
+        self.metrics_sample_interval = float(os.getenv("METRICS_SAMPLE_INTERVAL", "1.0"))
+        
+        # Seconds between checks of rules.json for hand edits (0 disables)
+        self.rules_watch_interval = float(os.getenv("RULES_WATCH_INTERVAL", "1.0"))
+        
         # Paths
         self.config_dir = CONFIG_DIR
         self.logs_dir = LOGS_DIR
@@ -35,6 +76,8 @@ class Config:
         
         self.rules_file = CONFIG_DIR / "rules.json"
         self.permissions_file = CONFIG_DIR / "permissions.json"
+        self.alert_sinks_file = CONFIG_DIR / "alert_sinks.json"
+        self.storage_db_file = STORAGE_DB_FILE
     
     def load_json_file(self, filepath: Path, default: dict = None) -> dict:
         """Load JSON file with fallback to default"""
@@ -47,10 +90,12 @@ class Config:
         return default or {}
     
     def save_json_file(self, filepath: Path, data: dict) -> None:
-        """Save data to JSON file"""
+        """Save data to JSON file (atomically, so readers never see a partial file)"""
         filepath.parent.mkdir(parents=True, exist_ok=True)
-        with open(filepath, 'w') as f:
+        tmp_path = filepath.with_name(f".{filepath.name}.tmp")
+        with open(tmp_path, 'w') as f:
             json.dump(data, f, indent=2)
+        os.replace(tmp_path, filepath)
 
 
 config = Config()
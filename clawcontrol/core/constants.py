@@ -22,5 +22,11 @@ TOKEN_HEADER = "X-CLAW-TOKEN"
 
 # OpenClaw
 OPENCLAW_LOG_FILE = LOGS_DIR / "openclaw.log"
+OPENCLAW_ARCHIVE_DIR = LOGS_DIR / "openclaw"
+OPENCLAW_INDEX_DIR = LOGS_DIR / "openclaw.index"
 CONTROLLER_LOG_FILE = LOGS_DIR / "controller.log"
 VIOLATIONS_LOG_FILE = LOGS_DIR / "violations.log"
+VIOLATIONS_DIR = LOGS_DIR / "violations"
+ALERT_DEAD_LETTER_FILE = LOGS_DIR / "alerts.dead-letter.jsonl"
+LOG_FOLLOWER_CHECKPOINT_FILE = DATA_DIR / "log_follower.json"
+STORAGE_DB_FILE = DATA_DIR / "clawcontrol.db"
@@ -2,17 +2,59 @@
 Claw Control - Local Safety Orchestrator
 Main FastAPI Application
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from clawcontrol.api.routes import router
+from clawcontrol.core.config import config
 from clawcontrol.core.constants import VERSION
+from clawcontrol.services.log_follower import log_follower
+from clawcontrol.services.log_rotator import log_rotator
+from clawcontrol.services.log_index import log_index
+from clawcontrol.services.openclaw_adapter import openclaw_adapter
+from clawcontrol.services.status_snapshot import status_snapshot
+from clawcontrol.services.guardrails import guardrails_engine
+from clawcontrol.services.alerts import alert_system
+from clawcontrol.services.alert_dispatcher import alert_dispatcher
+from clawcontrol.services.metrics import metrics_collector
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run background services for the lifetime of the server"""
+    # In capture mode the adapter feeds the follower's handlers from the pipe
+    if not config.openclaw_capture_mode:
+        log_follower.start()
+    log_rotator.start()
+    log_index.start()
+    status_snapshot.start()
+    alert_dispatcher.attach(alert_system)
+    alert_dispatcher.start()
+    if config.metrics_sample_interval > 0:
+        metrics_collector.start()
+    if config.rules_watch_interval > 0:
+        guardrails_engine.start_watching(config.rules_watch_interval)
+    yield
+    # Stop the producers first so violations from their last lines still
+    # become alerts, then flush those alerts and let the sinks deliver them
+    await openclaw_adapter.astop()
+    log_follower.stop()
+    log_rotator.stop()
+    status_snapshot.stop()
+    metrics_collector.stop()
+    log_index.flush()
+    alert_system.flush()
+    alert_dispatcher.stop()
+    guardrails_engine.close()
+
 
 app = FastAPI(
     title="Claw Control",
     description="Local Safety Orchestrator for OpenClaw",
     version=VERSION,
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -0,0 +1,234 @@
+"""
+Alert Dispatcher - Batched background delivery of alerts to webhooks
+"""
+import json
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+import httpx
+from clawcontrol.core.config import config
+from clawcontrol.core.constants import ALERT_DEAD_LETTER_FILE
+
+MAX_RETRY_DELAY = 30.0
+
+
+class AlertSink:
+    """
+    One delivery destination with its own bounded queue and worker.
+    
+    The worker sends alerts as `{"alerts": [...]}` POSTs of up to
+    `batch_size` alerts, waiting at most `batch_interval` seconds to fill
+    a batch. Connection errors, 5xx and 429 responses are retried with
+    exponential backoff; a batch that still fails (or gets another 4xx)
+    is appended to the dead-letter file.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        url: str,
+        uds: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        batch_size: int = 50,
+        batch_interval: float = 1.0,
+        max_retries: int = 5,
+        retry_backoff: float = 0.5,
+        timeout: float = 5.0,
+        max_queue: int = 10000,
+        dead_letter_file: Path = ALERT_DEAD_LETTER_FILE
+    ):
+        self.name = name
+        self.url = url
+        self.uds = uds
+        self.headers = headers or {}
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.timeout = timeout
+        self.dead_letter_file = Path(dead_letter_file)
+        
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._dead_letter_lock = threading.Lock()
+        
+        self.alerts_delivered = 0
+        self.batches_delivered = 0
+        self.attempts_failed = 0
+        self.alerts_dead_lettered = 0
+        self.alerts_dropped = 0
+        self.last_error: Optional[str] = None
+        self.last_latency_ms: Optional[float] = None
+    
+    def submit(self, alert: Dict):
+        """Queue an alert without blocking; drops it if the queue is full"""
+        try:
+            self._queue.put_nowait(alert)
+        except queue.Full:
+            self.alerts_dropped += 1
+    
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=f"alert-sink-{self.name}", daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout: float = 5.0):
+        """Deliver what is already queued (without retrying) and stop"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+    
+    def _next_batch(self) -> List[Dict]:
+        try:
+            batch = [self._queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+        
+        deadline = time.monotonic() + self.batch_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if self._stop_event.is_set():
+                remaining = 0
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+    
+    def _run(self):
+        transport = httpx.HTTPTransport(uds=self.uds) if self.uds else None
+        with httpx.Client(transport=transport, timeout=self.timeout, headers=self.headers) as client:
+            while True:
+                batch = self._next_batch()
+                if batch:
+                    self._deliver(client, batch)
+                elif self._stop_event.is_set():
+                    return
+    
+    def _deliver(self, client: httpx.Client, batch: List[Dict]):
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            retryable = True
+            try:
+                response = client.post(self.url, json={"alerts": batch})
+                if response.status_code < 300:
+                    self.last_latency_ms = (time.perf_counter() - started) * 1000
+                    self.alerts_delivered += len(batch)
+                    self.batches_delivered += 1
+                    return
+                retryable = response.status_code >= 500 or response.status_code == 429
+                self.last_error = f"HTTP {response.status_code}"
+            except httpx.HTTPError as e:
+                self.last_error = str(e) or type(e).__name__
+            
+            self.attempts_failed += 1
+            attempt += 1
+            if not retryable or attempt > self.max_retries or self._stop_event.is_set():
+                self._dead_letter(batch)
+                return
+            
+            delay = min(self.retry_backoff * 2 ** (attempt - 1), MAX_RETRY_DELAY)
+            if self._stop_event.wait(delay):
+                self._dead_letter(batch)
+                return
+    
+    def _dead_letter(self, batch: List[Dict]):
+        entry = {
+            "ts": datetime.now().isoformat(),
+            "sink": self.name,
+            "error": self.last_error,
+            "alerts": batch
+        }
+        try:
+            with self._dead_letter_lock:
+                self.dead_letter_file.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.dead_letter_file, 'a') as f:
+                    f.write(json.dumps(entry) + "\n")
+            self.alerts_dead_lettered += len(batch)
+        except Exception as e:
+            print(f"Error writing alert dead letter: {e}")
+    
+    def stats(self) -> Dict:
+        return {
+            "name": self.name,
+            "url": self.url,
+            "queued": self._queue.qsize(),
+            "alerts_delivered": self.alerts_delivered,
+            "batches_delivered": self.batches_delivered,
+            "attempts_failed": self.attempts_failed,
+            "alerts_dead_lettered": self.alerts_dead_lettered,
+            "alerts_dropped": self.alerts_dropped,
+            "last_error": self.last_error,
+            "last_latency_ms": self.last_latency_ms
+        }
+
+
+class AlertDispatcher:
+    """
+    Fans new alerts out to every configured sink.
+    
+    `submit` only enqueues, so it can be registered as an AlertSystem
+    listener without alert creation ever waiting on the network.
+    """
+    
+    def __init__(self, sinks: Optional[List[AlertSink]] = None):
+        self.sinks: List[AlertSink] = sinks or []
+        self.alerts_submitted = 0
+        self._started_at: Optional[float] = None
+    
+    @classmethod
+    def from_config(cls, sinks_file: Path, dead_letter_file: Path = ALERT_DEAD_LETTER_FILE) -> "AlertDispatcher":
+        """Build sinks from alert_sinks.json (`{"sinks": [{"name", "url", ...}]}`)"""
+        data = config.load_json_file(sinks_file, {"sinks": []})
+        sinks = []
+        for entry in data.get("sinks", []):
+            try:
+                sinks.append(AlertSink(dead_letter_file=dead_letter_file, **entry))
+            except TypeError as e:
+                print(f"Invalid alert sink {entry.get('name')}: {e}")
+        return cls(sinks)
+    
+    def attach(self, alert_system):
+        """Deliver every new alert created by `alert_system` (once, however often called)"""
+        if self.submit not in alert_system.alert_listeners:
+            alert_system.add_alert_listener(self.submit)
+    
+    def submit(self, alert: Dict):
+        self.alerts_submitted += 1
+        for sink in self.sinks:
+            sink.submit(alert)
+    
+    def start(self):
+        self._started_at = time.monotonic()
+        for sink in self.sinks:
+            sink.start()
+    
+    def stop(self, timeout: float = 5.0):
+        for sink in self.sinks:
+            sink.stop(timeout)
+    
+    def stats(self) -> Dict:
+        sinks = [sink.stats() for sink in self.sinks]
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0
+        delivered = sum(sink["alerts_delivered"] for sink in sinks)
+        return {
+            "alerts_submitted": self.alerts_submitted,
+            "alerts_delivered": delivered,
+            "queue_depth": sum(sink["queued"] for sink in sinks),
+            "alerts_per_second": round(delivered / elapsed, 2) if elapsed else 0.0,
+            "sinks": sinks
+        }
+
+
+alert_dispatcher = AlertDispatcher.from_config(config.alert_sinks_file)
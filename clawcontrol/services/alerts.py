@@ -1,11 +1,18 @@
 """
 Alert System - Notifications when violations occur
 """
+from bisect import bisect_left, insort
 from datetime import datetime
-from typing import List, Dict, Optional
-from collections import deque
+from typing import Callable, List, Dict, Optional, Tuple
 import json
+import os
+import threading
+import time
 from pathlib import Path
+from clawcontrol.api.models import ViolationEvent
+from clawcontrol.services.batch_writer import BatchedWriter
+from clawcontrol.services.guardrails import guardrails_engine
+from clawcontrol.services.storage import SQLiteStorage, get_storage
 
 ALERTS_FILE = Path.home() / ".clawcontrol" / "logs" / "alerts.json"
 
@@ -16,39 +23,345 @@ class AlertLevel:
     CRITICAL = "critical"
 
 class AlertSystem:
-    def __init__(self, max_alerts: int = 1000):
+    """
+    Alerts persist as a snapshot plus an append-only journal.
+    
+    Creating an alert or marking alerts read appends one small record to
+    the journal instead of rewriting every alert. On load the snapshot is
+    read and the journal replayed on top; after `compact_every` journal
+    records the current state is written as a new snapshot generation and
+    a fresh journal is started, so replay stays short.
+    
+    Alert IDs increase monotonically and are never reused. Alerts are
+    indexed by ID, and sorted ID lists per level and for unread alerts
+    back filtering, cursor pagination and stats without a full scan.
+    
+    Repeats of an alert with the same fingerprint (level, type, violation
+    type and instance) within `coalesce_window` seconds of its first
+    occurrence are folded into it: its count, last_seen and a few recent
+    message samples are updated in memory, and the change is journaled at
+    most every `update_interval` seconds per alert.
+    
+    With the SQLite storage backend the same records become row inserts
+    and updates in the shared database instead of journal lines; the
+    JSON snapshot and journal are imported on the database's first start.
+    """
+    
+    UPSERT = "INSERT OR REPLACE INTO alerts (id, ts, level, read, alert) VALUES (?, ?, ?, ?, ?)"
+    
+    def __init__(
+        self,
+        max_alerts: int = 1000,
+        alerts_file: Path = ALERTS_FILE,
+        compact_every: Optional[int] = None,
+        coalesce_window: float = 60.0,
+        max_samples: int = 5,
+        update_interval: float = 1.0,
+        storage: Optional[SQLiteStorage] = None
+    ):
         self.max_alerts = max_alerts
-        self.alerts = deque(maxlen=max_alerts)
-        self.unread_count = 0
-        self.alerts_file = ALERTS_FILE
+        self.alerts: Dict[int, Dict] = {}
+        self.alerts_file = Path(alerts_file)
         self.alerts_file.parent.mkdir(parents=True, exist_ok=True)
+        self.compact_every = compact_every or max_alerts
+        self.coalesce_window = coalesce_window
+        self.max_samples = max_samples
+        self.update_interval = update_interval
+        
+        self.next_id = 0
+        self._ids: List[int] = []
+        self._by_level: Dict[str, List[int]] = {}
+        self._unread: List[int] = []
+        self._open: Dict[Tuple, int] = {}
+        self._dirty: Dict[int, None] = {}
+        self._last_update = time.monotonic()
+        self.occurrences_coalesced = 0
+        
+        self.alert_listeners: List[Callable[[Dict], None]] = []
+        
+        self._lock = threading.Lock()
+        self._writer: Optional[BatchedWriter] = None
+        self.generation = 0
+        self.journal_records = 0
+        self.compactions = 0
         
         # Load existing alerts
-        self._load_alerts()
+        self.storage = storage if storage is not None else get_storage()
+        if self.storage is not None:
+            self._load_from_storage()
+        else:
+            self._load_alerts()
+            self._writer = BatchedWriter(self._journal_path(self.generation))
+            if self.journal_records >= self.compact_every:
+                self._compact()
+    
+    def add_alert_listener(self, listener: Callable[[Dict], None]):
+        """Register a callback receiving each newly created alert (not repeats)"""
+        self.alert_listeners.append(listener)
+    
+    @property
+    def unread_count(self) -> int:
+        return len(self._unread)
+    
+    @staticmethod
+    def _fingerprint(alert: Dict) -> Tuple:
+        data = alert.get("data") or {}
+        # Alerts that are not about a violation type are told apart by title
+        return (
+            alert.get("level"),
+            data.get("type"),
+            data.get("violation_type") or alert.get("title"),
+            data.get("instance_id")
+        )
+    
+    def _journal_path(self, generation: int) -> Path:
+        return self.alerts_file.with_name(f"{self.alerts_file.stem}.journal-{generation:08d}.jsonl")
     
     def _load_alerts(self):
-        """Load alerts from file."""
+        """Load the snapshot and replay its journal."""
         if self.alerts_file.exists():
             try:
                 with open(self.alerts_file, 'r') as f:
                     data = json.load(f)
-                    for alert in data.get('alerts', [])[-self.max_alerts:]:
-                        self.alerts.append(alert)
-                    self.unread_count = data.get('unread_count', 0)
+                alerts = data.get('alerts', [])[-self.max_alerts:]
+                if 'next_id' not in data:
+                    # Older files reused IDs; number their alerts in order
+                    for number, alert in enumerate(alerts):
+                        alert["id"] = str(number)
+                for alert in alerts:
+                    self._index(alert)
+                self.next_id = max(data.get('next_id', 0), self.next_id)
+                self.generation = data.get('generation', 0)
             except Exception:
                 pass
+        
+        journal = self._journal_path(self.generation)
+        if journal.exists():
+            self._replay(journal)
+        
+        # Journals from other generations are already folded into the snapshot
+        for path in self.alerts_file.parent.glob(f"{self.alerts_file.stem}.journal-*.jsonl"):
+            if path != journal:
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+    
+    def _load_from_storage(self):
+        """Load the newest alerts from the database, importing the JSON files once."""
+        if not self.storage.get_meta("alerts_imported"):
+            self._load_alerts()
+            self.storage.write(self.UPSERT, [self._row(alert) for alert in self.alerts.values()])
+            self.storage.set_meta("alerts_imported", str(len(self.alerts)))
+            self.storage.flush()
+            return
+        
+        rows = self.storage.query("SELECT alert, read FROM alerts ORDER BY id DESC LIMIT ?", (self.max_alerts,))
+        for alert_json, read in reversed(rows):
+            alert = json.loads(alert_json)
+            alert["read"] = bool(read)
+            self._index(alert)
+        
+        max_id = self.storage.query("SELECT MAX(id) FROM alerts")[0][0]
+        if max_id is not None:
+            self.next_id = max(self.next_id, max_id + 1)
+    
+    @staticmethod
+    def _row(alert: Dict) -> Tuple:
+        return (
+            int(alert["id"]),
+            datetime.fromisoformat(alert["timestamp"]).timestamp(),
+            alert.get("level"),
+            int(bool(alert.get("read", False))),
+            json.dumps(alert)
+        )
+    
+    def _replay(self, journal: Path):
+        """Apply journal records in order, dropping a torn last line."""
+        position = 0
+        with open(journal, 'rb') as f:
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                position += len(raw)
+                try:
+                    self._apply(json.loads(raw))
+                except (ValueError, KeyError, TypeError):
+                    continue
+                self.journal_records += 1
+        
+        if os.path.getsize(journal) != position:
+            os.truncate(journal, position)
+    
+    @staticmethod
+    def _remove_id(ids: List[int], alert_id: int):
+        index = bisect_left(ids, alert_id)
+        if index < len(ids) and ids[index] == alert_id:
+            del ids[index]
+    
+    @staticmethod
+    def _add_id(ids: List[int], alert_id: int):
+        if not ids or ids[-1] < alert_id:
+            ids.append(alert_id)
+        else:
+            insort(ids, alert_id)
+    
+    def _index(self, alert: Dict):
+        alert_id = int(alert["id"])
+        self.alerts[alert_id] = alert
+        self._add_id(self._ids, alert_id)
+        self._add_id(self._by_level.setdefault(alert.get("level", AlertLevel.INFO), []), alert_id)
+        if not alert.get("read", False):
+            self._add_id(self._unread, alert_id)
+        self.next_id = max(self.next_id, alert_id + 1)
+        self._open[self._fingerprint(alert)] = alert_id
+    
+    def _unindex(self, alert_id: int):
+        alert = self.alerts.pop(alert_id)
+        self._remove_id(self._ids, alert_id)
+        self._remove_id(self._by_level[alert.get("level", AlertLevel.INFO)], alert_id)
+        if not alert.get("read", False):
+            self._remove_id(self._unread, alert_id)
+        # Evicted or cleared alerts can no longer absorb repeats
+        fingerprint = self._fingerprint(alert)
+        if self._open.get(fingerprint) == alert_id:
+            del self._open[fingerprint]
+    
+    def _apply(self, record: Dict) -> int:
+        """Apply one journal record to the in-memory state; returns alerts affected."""
+        op = record["op"]
+        
+        if op == "create":
+            while len(self.alerts) >= self.max_alerts:
+                self._unindex(self._ids[0])
+            self._index(record["alert"])
+            return 1
+        
+        marked = 0
+        if op == "read":
+            for key in set(record["ids"]):
+                try:
+                    alert = self.alerts.get(int(key))
+                except ValueError:
+                    continue
+                if alert is not None and not alert.get("read", False):
+                    alert["read"] = True
+                    self._remove_id(self._unread, int(key))
+                    marked += 1
+        
+        elif op == "read_all":
+            for alert_id in self._unread:
+                self.alerts[alert_id]["read"] = True
+            marked = len(self._unread)
+            self._unread = []
+        
+        elif op == "update":
+            alert = self.alerts.get(int(record["id"]))
+            if alert is not None:
+                alert["count"] = record["count"]
+                alert["last_seen"] = record["last_seen"]
+                alert["samples"] = record["samples"]
+                return 1
+        
+        return marked
+    
+    def _append(self, record: Dict):
+        """Journal one record, compacting once the journal is long enough."""
+        if self.storage is not None:
+            self._persist(record)
+            return
+        self._writer.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.journal_records += 1
+        if self.journal_records >= self.compact_every:
+            self._compact()
     
-    def _save_alerts(self):
-        """Save alerts to file."""
+    def _persist(self, record: Dict):
+        """Apply one journal record to the database"""
+        op = record["op"]
+        if op == "create":
+            self.storage.write(self.UPSERT, [self._row(record["alert"])])
+        elif op == "update":
+            alert = self.alerts.get(int(record["id"]))
+            if alert is not None:
+                self.storage.write(self.UPSERT, [self._row(alert)])
+        elif op == "read":
+            self.storage.write(
+                "UPDATE alerts SET read = 1 WHERE id = ?",
+                [(int(key),) for key in record["ids"] if str(key).isdigit()]
+            )
+        elif op == "read_all":
+            self.storage.write("UPDATE alerts SET read = 1 WHERE read = 0", [()])
+    
+    def _compact(self):
+        """Write the state as the next snapshot generation and start an empty journal."""
+        self._writer.close()
+        self._dirty = {}
+        old_journal = self._journal_path(self.generation)
+        generation = self.generation + 1
+        
         try:
-            with open(self.alerts_file, 'w') as f:
+            tmp_path = self.alerts_file.with_name(f".{self.alerts_file.name}.tmp")
+            with open(tmp_path, 'w') as f:
                 json.dump({
-                    'alerts': list(self.alerts),
+                    'generation': generation,
+                    'next_id': self.next_id,
+                    'alerts': list(self.alerts.values()),
                     'unread_count': self.unread_count
-                }, f, indent=2)
-        except Exception:
+                }, f, separators=(",", ":"))
+            os.replace(tmp_path, self.alerts_file)
+        except Exception as e:
+            print(f"Error compacting alerts: {e}")
+            self._writer = BatchedWriter(old_journal)
+            return
+        
+        self.generation = generation
+        self.journal_records = 0
+        self.compactions += 1
+        self._writer = BatchedWriter(self._journal_path(generation))
+        try:
+            old_journal.unlink()
+        except FileNotFoundError:
             pass
     
+    def compact(self):
+        """Fold the journal into a new snapshot now."""
+        if self.storage is not None:
+            return
+        with self._lock:
+            self._compact()
+    
+    def _write_updates(self):
+        """Journal the current count and samples of alerts that absorbed repeats."""
+        dirty, self._dirty = self._dirty, {}
+        self._last_update = time.monotonic()
+        for alert_id in dirty:
+            alert = self.alerts.get(alert_id)
+            if alert is not None:
+                self._append({
+                    "op": "update",
+                    "id": alert["id"],
+                    "count": alert["count"],
+                    "last_seen": alert["last_seen"],
+                    "samples": alert["samples"]
+                })
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until journaled records are on disk."""
+        with self._lock:
+            self._write_updates()
+        if self.storage is not None:
+            return self.storage.flush(timeout)
+        return self._writer.flush(timeout)
+    
+    def close(self):
+        """Write out the journal and stop its writer."""
+        with self._lock:
+            self._write_updates()
+            if self.storage is not None:
+                self.storage.flush()
+            else:
+                self._writer.close()
+    
     def create_alert(
         self,
         title: str,
@@ -56,23 +369,61 @@ class AlertSystem:
         level: str = AlertLevel.INFO,
         data: Optional[Dict] = None
     ) -> Dict:
-        """Create a new alert."""
+        """Create a new alert, or fold it into a matching recent one."""
+        now = datetime.now()
+        timestamp = now.isoformat()
         alert = {
-            "id": str(len(self.alerts)),
+            "id": None,
             "title": title,
             "message": message,
             "level": level,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp,
             "read": False,
-            "data": data or {}
+            "data": data or {},
+            "count": 1,
+            "first_seen": timestamp,
+            "last_seen": timestamp,
+            "samples": [message]
         }
         
-        self.alerts.append(alert)
-        self.unread_count += 1
-        self._save_alerts()
+        with self._lock:
+            existing = self._coalesce_target(alert, now)
+            if existing is not None:
+                existing["count"] = existing.get("count", 1) + 1
+                existing["last_seen"] = timestamp
+                existing["samples"] = (existing.get("samples", []) + [message])[-self.max_samples:]
+                self._dirty[int(existing["id"])] = None
+                self.occurrences_coalesced += 1
+                if time.monotonic() - self._last_update >= self.update_interval:
+                    self._write_updates()
+                return existing
+            
+            alert["id"] = str(self.next_id)
+            record = {"op": "create", "alert": alert}
+            self._apply(record)
+            self._append(record)
+        
+        for listener in self.alert_listeners:
+            try:
+                listener(alert)
+            except Exception as e:
+                print(f"Error in alert listener: {e}")
         
         return alert
     
+    def _coalesce_target(self, alert: Dict, now: datetime) -> Optional[Dict]:
+        """The open alert this one repeats, if it is still within the window"""
+        if self.coalesce_window <= 0:
+            return None
+        alert_id = self._open.get(self._fingerprint(alert))
+        existing = self.alerts.get(alert_id) if alert_id is not None else None
+        if existing is None:
+            return None
+        first_seen = datetime.fromisoformat(existing.get("first_seen", existing["timestamp"]))
+        if (now - first_seen).total_seconds() > self.coalesce_window:
+            return None
+        return existing
+    
     def get_alerts(
         self,
         limit: int = 50,
@@ -80,49 +431,72 @@ class AlertSystem:
         level: Optional[str] = None
     ) -> List[Dict]:
         """Get alerts with optional filtering."""
-        alerts = list(self.alerts)
-        
-        # Filter by unread
-        if unread_only:
-            alerts = [a for a in alerts if not a.get("read", False)]
-        
-        # Filter by level
-        if level:
-            alerts = [a for a in alerts if a.get("level") == level]
-        
-        # Return most recent first
-        alerts.reverse()
+        return self.page_alerts(limit=limit, unread_only=unread_only, level=level)[0]
+    
+    def page_alerts(
+        self,
+        limit: int = 50,
+        unread_only: bool = False,
+        level: Optional[str] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        One page of alerts, most recent first. Pass the returned cursor back
+        to get the next (older) page; it is None after the last page.
+        """
+        with self._lock:
+            if level:
+                ids = self._by_level.get(level, [])
+                other = self._unread if unread_only else None
+            else:
+                ids = self._unread if unread_only else self._ids
+                other = None
+            
+            # Walk the smaller list when both filters apply
+            if other is not None and len(other) < len(ids):
+                ids, other = other, ids
+            
+            end = len(ids) if cursor is None else bisect_left(ids, int(cursor))
+            page: List[Dict] = []
+            for index in range(end - 1, -1, -1):
+                alert_id = ids[index]
+                if other is None or self._contains(other, alert_id):
+                    page.append(self.alerts[alert_id])
+                    if len(page) > limit:
+                        break
         
-        return alerts[:limit]
+        next_cursor = page[limit - 1]["id"] if len(page) > limit else None
+        return page[:limit], next_cursor
+    
+    @staticmethod
+    def _contains(ids: List[int], alert_id: int) -> bool:
+        index = bisect_left(ids, alert_id)
+        return index < len(ids) and ids[index] == alert_id
+    
+    def get_alert(self, alert_id: str) -> Optional[Dict]:
+        """Get one alert by ID."""
+        try:
+            return self.alerts.get(int(alert_id))
+        except ValueError:
+            return None
     
     def mark_as_read(self, alert_ids: List[str]) -> int:
         """Mark alerts as read."""
-        marked = 0
-        
-        for alert in self.alerts:
-            if alert["id"] in alert_ids and not alert.get("read", False):
-                alert["read"] = True
-                self.unread_count = max(0, self.unread_count - 1)
-                marked += 1
-        
-        if marked > 0:
-            self._save_alerts()
+        record = {"op": "read", "ids": list(alert_ids)}
+        with self._lock:
+            marked = self._apply(record)
+            if marked > 0:
+                self._append(record)
         
         return marked
     
     def mark_all_as_read(self) -> int:
         """Mark all alerts as read."""
-        marked = 0
-        
-        for alert in self.alerts:
-            if not alert.get("read", False):
-                alert["read"] = True
-                marked += 1
-        
-        self.unread_count = 0
-        
-        if marked > 0:
-            self._save_alerts()
+        record = {"op": "read_all"}
+        with self._lock:
+            marked = self._apply(record)
+            if marked > 0:
+                self._append(record)
         
         return marked
     
@@ -131,40 +505,27 @@ class AlertSystem:
         from datetime import timedelta
         
         cutoff = datetime.now() - timedelta(days=days)
-        original_count = len(self.alerts)
         
-        # Filter alerts
-        new_alerts = deque(maxlen=self.max_alerts)
-        for alert in self.alerts:
-            timestamp = datetime.fromisoformat(alert["timestamp"])
-            if timestamp >= cutoff:
-                new_alerts.append(alert)
-            elif not alert.get("read", False):
-                self.unread_count = max(0, self.unread_count - 1)
+        with self._lock:
+            # IDs follow creation order, so expired alerts are at the front
+            cleared = 0
+            while self._ids and datetime.fromisoformat(self.alerts[self._ids[0]]["timestamp"]) < cutoff:
+                self._unindex(self._ids[0])
+                cleared += 1
+            if self.storage is not None:
+                self.storage.write("DELETE FROM alerts WHERE ts < ?", [(cutoff.timestamp(),)])
+            else:
+                self._compact()
         
-        self.alerts = new_alerts
-        self._save_alerts()
-        
-        return original_count - len(self.alerts)
+        return cleared
     
     def get_stats(self) -> Dict:
         """Get alert statistics."""
-        if not self.alerts:
-            return {
-                "total": 0,
-                "unread": 0,
-                "by_level": {}
-            }
-        
-        by_level = {}
-        for alert in self.alerts:
-            level = alert.get("level", AlertLevel.INFO)
-            by_level[level] = by_level.get(level, 0) + 1
-        
         return {
             "total": len(self.alerts),
             "unread": self.unread_count,
-            "by_level": by_level
+            "by_level": {level: len(ids) for level, ids in self._by_level.items() if ids},
+            "occurrences_coalesced": self.occurrences_coalesced
         }
     
     # Convenience methods for common alert types
@@ -205,3 +566,17 @@ class AlertSystem:
             level=AlertLevel.CRITICAL if critical else AlertLevel.WARNING,
             data={"type": "system"}
         )
+
+
+def alert_on_violations(engine, alerts: AlertSystem):
+    """Raise an alert for each violation the engine records; repeats of a rule coalesce"""
+    def listener(violations: List[ViolationEvent]):
+        for violation in violations:
+            rule = engine.get_rule(violation.rule_id)
+            alerts.violation_alert(rule.name if rule else violation.rule_id, violation.log_excerpt)
+    
+    engine.add_violation_listener(listener)
+
+
+alert_system = AlertSystem()
+alert_on_violations(guardrails_engine, alert_system)
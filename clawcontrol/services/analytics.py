@@ -1,33 +1,219 @@
 """Analytics - Session tracking and usage history"""
 from datetime import datetime, timedelta
-from typing import List, Dict
-from collections import deque
+from typing import Dict, Iterator, List, Optional
 import json
+import os
+import threading
+import time
 from pathlib import Path
+from clawcontrol.services.batch_writer import BatchedWriter
+from clawcontrol.services.storage import SQLiteStorage, get_storage
 
 ANALYTICS_FILE = Path.home() / ".clawcontrol" / "data" / "analytics.json"
+SESSIONS_FILE = Path.home() / ".clawcontrol" / "data" / "analytics.sessions.jsonl"
+
+# Rollup bucket fields: sessions, actions, violations, duration_seconds
+SESSIONS, ACTIONS, VIOLATIONS, DURATION = range(4)
 
 class AnalyticsTracker:
-    def __init__(self):
-        self.sessions = deque(maxlen=1000)
-        self.analytics_file = ANALYTICS_FILE
+    """
+    Sessions are appended to a JSONL history and folded into hourly and
+    daily rollup buckets as they arrive.
+    
+    get_stats sums at most 24 hourly buckets for the partial first day and
+    one daily bucket per remaining day, so its cost depends on the range,
+    not on how many sessions were tracked. Buckets are keyed by hours and
+    days since the epoch (UTC). The rollups are persisted compactly every
+    `snapshot_every` sessions together with the history offset they
+    cover; sessions appended after that are replayed on load. Hourly
+    buckets older than `hourly_retention_days` are dropped, so ranges
+    beyond that start on a day boundary.
+    
+    With the SQLite storage backend the history is the sessions table and
+    the rollups are rebuilt on load with one GROUP BY over it; the JSON
+    history is imported on the database's first start.
+    """
+    
+    INSERT = "INSERT INTO sessions (ts, duration_seconds, actions, violations) VALUES (?, ?, ?, ?)"
+    
+    def __init__(
+        self,
+        analytics_file: Path = ANALYTICS_FILE,
+        sessions_file: Path = SESSIONS_FILE,
+        snapshot_every: int = 100,
+        hourly_retention_days: int = 35,
+        storage: Optional[SQLiteStorage] = None
+    ):
+        self.analytics_file = Path(analytics_file)
+        self.sessions_file = Path(sessions_file)
         self.analytics_file.parent.mkdir(parents=True, exist_ok=True)
-        self._load()
+        self.snapshot_every = snapshot_every
+        self.hourly_retention_days = hourly_retention_days
+        
+        self.hourly: Dict[int, List] = {}
+        self.daily: Dict[int, List] = {}
+        self.sessions_total = 0
+        self._journal_size = 0
+        self._since_snapshot = 0
+        self._lock = threading.Lock()
+        self._writer: Optional[BatchedWriter] = None
+        
+        self.storage = storage if storage is not None else get_storage()
+        if self.storage is not None:
+            self._load_from_storage()
+        else:
+            self._load()
+            self._writer = BatchedWriter(self.sessions_file)
     
     def _load(self):
+        data = {}
         if self.analytics_file.exists():
             try:
                 with open(self.analytics_file, 'r') as f:
                     data = json.load(f)
-                    for session in data.get('sessions', [])[-1000:]:
-                        self.sessions.append(session)
-            except: pass
+            except Exception as e:
+                print(f"Error loading {self.analytics_file}: {e}")
+        
+        if "sessions" in data and "hourly" not in data:
+            self._migrate(data["sessions"])
+            return
+        
+        for key, bucket in data.get("hourly", {}).items():
+            self.hourly[int(key)] = bucket
+        for key, bucket in data.get("daily", {}).items():
+            self.daily[int(key)] = bucket
+        self.sessions_total = data.get("sessions_total", 0)
+        offset = data.get("journal_offset", 0)
+        
+        size = self.sessions_file.stat().st_size if self.sessions_file.exists() else 0
+        if size < offset:
+            # History lost its tail after the snapshot; the rollups already count it
+            self._journal_size = size
+            self._save_snapshot()
+            return
+        
+        self._journal_size = offset
+        if size > offset:
+            self._replay(offset)
+    
+    def _replay(self, offset: int):
+        """Fold sessions appended after the snapshot, dropping a torn last line"""
+        position = offset
+        with open(self.sessions_file, 'rb') as f:
+            f.seek(offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                position += len(raw)
+                try:
+                    self._fold(json.loads(raw))
+                except (ValueError, KeyError, TypeError):
+                    continue
+                self._since_snapshot += 1
+        
+        self._journal_size = position
+        if os.path.getsize(self.sessions_file) != position:
+            os.truncate(self.sessions_file, position)
+    
+    def _migrate(self, sessions: List[Dict]):
+        """Move a pretty-printed session list into the history and rollups"""
+        lines = []
+        for session in sessions:
+            try:
+                self._fold(session)
+            except (ValueError, KeyError, TypeError):
+                continue
+            lines.append(json.dumps(session, separators=(",", ":")) + "\n")
+        
+        with open(self.sessions_file, 'a') as f:
+            f.writelines(lines)
+        self._journal_size = self.sessions_file.stat().st_size
+        self._save_snapshot()
     
-    def _save(self):
+    def _load_from_storage(self):
+        if not self.storage.get_meta("sessions_imported"):
+            imported = self._import_json()
+            self.storage.set_meta("sessions_imported", str(imported))
+            self.storage.flush()
+        
+        cutoff = int(time.time() // 3600) - self.hourly_retention_days * 24
+        rows = self.storage.query(
+            "SELECT CAST(ts / 3600 AS INTEGER) AS hour, COUNT(*), SUM(actions), SUM(violations), SUM(duration_seconds) "
+            "FROM sessions GROUP BY hour"
+        )
+        for hour, *values in rows:
+            self._add(hour, values, hourly=hour >= cutoff)
+    
+    def _import_json(self) -> int:
+        """Copy the JSON session history (or a legacy session list) into the database"""
+        sessions: List[Dict] = []
         try:
-            with open(self.analytics_file, 'w') as f:
-                json.dump({'sessions': list(self.sessions)}, f, indent=2)
-        except: pass
+            with open(self.analytics_file, 'r') as f:
+                sessions = json.load(f).get("sessions", [])
+        except (OSError, ValueError):
+            pass
+        
+        if not sessions and self.sessions_file.exists():
+            with open(self.sessions_file, 'r') as f:
+                for line in f:
+                    try:
+                        sessions.append(json.loads(line))
+                    except ValueError:
+                        continue
+        
+        rows = []
+        for session in sessions:
+            try:
+                rows.append(self._row(session))
+            except (ValueError, KeyError, TypeError):
+                continue
+        self.storage.write(self.INSERT, rows)
+        return len(rows)
+    
+    @staticmethod
+    def _row(session: Dict):
+        return (
+            datetime.fromisoformat(session["timestamp"]).timestamp(),
+            session["duration_seconds"],
+            session["actions"],
+            session["violations"]
+        )
+    
+    def _fold(self, session: Dict):
+        """Add one session to its hourly and daily buckets"""
+        hour = int(datetime.fromisoformat(session["timestamp"]).timestamp() // 3600)
+        self._add(hour, (1, session["actions"], session["violations"], session["duration_seconds"]))
+    
+    def _add(self, hour: int, values, hourly: bool = True):
+        targets = ((self.hourly, hour), (self.daily, hour // 24)) if hourly else ((self.daily, hour // 24),)
+        for buckets, key in targets:
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = list(values)
+            else:
+                for field, value in enumerate(values):
+                    bucket[field] += value
+        self.sessions_total += values[SESSIONS]
+    
+    def _save_snapshot(self):
+        cutoff = int(time.time() // 3600) - self.hourly_retention_days * 24
+        for hour in [hour for hour in self.hourly if hour < cutoff]:
+            del self.hourly[hour]
+        
+        try:
+            tmp_path = self.analytics_file.with_name(f".{self.analytics_file.name}.tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump({
+                    "version": 2,
+                    "journal_offset": self._journal_size,
+                    "sessions_total": self.sessions_total,
+                    "hourly": self.hourly,
+                    "daily": self.daily
+                }, f, separators=(",", ":"))
+            os.replace(tmp_path, self.analytics_file)
+            self._since_snapshot = 0
+        except Exception as e:
+            print(f"Error saving analytics: {e}")
     
     def track_session(self, duration: int, actions: int, violations: int):
         session = {
@@ -36,23 +222,81 @@ class AnalyticsTracker:
             "actions": actions,
             "violations": violations
         }
-        self.sessions.append(session)
-        self._save()
+        with self._lock:
+            self._fold(session)
+            if self.storage is not None:
+                self.storage.write(self.INSERT, [self._row(session)])
+                return session
+            
+            line = json.dumps(session, separators=(",", ":")) + "\n"
+            self._writer.write(line)
+            self._journal_size += len(line.encode("utf-8"))
+            self._since_snapshot += 1
+            if self._since_snapshot >= self.snapshot_every:
+                self._save_snapshot()
         return session
     
     def get_stats(self, days: int = 30) -> Dict:
         cutoff = datetime.now() - timedelta(days=days)
-        recent = [s for s in self.sessions 
-                  if datetime.fromisoformat(s["timestamp"]) >= cutoff]
+        first_hour = int(cutoff.timestamp() // 3600)
+        first_day = -(-first_hour // 24)
+        today = int(time.time() // 86400)
+        
+        totals = [0, 0, 0, 0]
+        with self._lock:
+            buckets = [self.hourly.get(hour) for hour in range(first_hour, first_day * 24)]
+            buckets += [self.daily.get(day) for day in range(first_day, today + 1)]
+            for bucket in buckets:
+                if bucket is not None:
+                    for field in range(4):
+                        totals[field] += bucket[field]
         
-        if not recent:
+        if not totals[SESSIONS]:
             return {"total_sessions": 0}
         
         return {
-            "total_sessions": len(recent),
-            "total_actions": sum(s["actions"] for s in recent),
-            "total_violations": sum(s["violations"] for s in recent),
-            "avg_duration": sum(s["duration_seconds"] for s in recent) / len(recent)
+            "total_sessions": totals[SESSIONS],
+            "total_actions": totals[ACTIONS],
+            "total_violations": totals[VIOLATIONS],
+            "avg_duration": totals[DURATION] / totals[SESSIONS]
         }
+    
+    def history(self, since: Optional[datetime] = None) -> Iterator[Dict]:
+        """Every tracked session (optionally from `since` on), oldest first"""
+        if self.storage is not None:
+            self.storage.flush()
+            rows = self.storage.query(
+                "SELECT ts, duration_seconds, actions, violations FROM sessions WHERE ts >= ? ORDER BY ts, id",
+                (since.timestamp() if since else 0,)
+            )
+            for ts, duration, actions, violations in rows:
+                yield {
+                    "timestamp": datetime.fromtimestamp(ts).isoformat(),
+                    "duration_seconds": duration,
+                    "actions": actions,
+                    "violations": violations
+                }
+            return
+        
+        self._writer.flush()
+        if not self.sessions_file.exists():
+            return
+        with open(self.sessions_file, 'r') as f:
+            for line in f:
+                try:
+                    session = json.loads(line)
+                except ValueError:
+                    continue
+                if since is None or datetime.fromisoformat(session["timestamp"]) >= since:
+                    yield session
+    
+    def close(self):
+        """Write out pending sessions and the rollups"""
+        with self._lock:
+            if self.storage is not None:
+                self.storage.flush()
+                return
+            self._writer.close()
+            self._save_snapshot()
 
 analytics_tracker = AnalyticsTracker()
@@ -0,0 +1,210 @@
+"""
+Batched Writer - Group-commit background appends to a log file
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+FSYNC_NONE = "none"
+FSYNC_INTERVAL = "interval"
+FSYNC_ALWAYS = "always"
+FSYNC_POLICIES = (FSYNC_NONE, FSYNC_INTERVAL, FSYNC_ALWAYS)
+
+PUT_RETRY_INTERVAL = 0.5
+
+_STOP = object()
+
+
+class BatchedWriter:
+    """
+    Appends lines to a file from a dedicated thread.
+    
+    Callers enqueue into a bounded queue and return immediately; the
+    writer keeps the file open and groups everything that arrives within
+    `flush_interval` (or up to `max_batch_bytes`) into a single write.
+    If the writer thread has died (e.g. the file could not be opened),
+    lines are dropped and counted instead of blocking callers.
+    
+    fsync policy:
+      none     - leave durability to the OS
+      interval - fsync at most once every `fsync_interval` seconds
+      always   - fsync after every batch
+    """
+    
+    def __init__(
+        self,
+        path: Path,
+        fsync_policy: str = FSYNC_INTERVAL,
+        flush_interval: float = 0.05,
+        fsync_interval: float = 1.0,
+        max_batch_bytes: int = 256 * 1024,
+        max_queue: int = 10000
+    ):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Invalid fsync policy: {fsync_policy} (expected one of {FSYNC_POLICIES})")
+        
+        self.path = Path(path)
+        self.fsync_policy = fsync_policy
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.max_batch_bytes = max_batch_bytes
+        
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+        self._last_fsync = time.monotonic()
+        self._dirty = False
+        
+        self.batches_written = 0
+        self.lines_written = 0
+        self.bytes_written = 0
+        self.lines_dropped = 0
+    
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=f"writer-{self.path.name}", daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.close)
+    
+    def write(self, line: str):
+        """Queue one line (including its newline) for appending"""
+        self.write_many([line])
+    
+    def write_many(self, lines: List[str]):
+        """Queue several lines as one entry; blocks only while a live writer's queue is full"""
+        if not lines:
+            return
+        if self._closed:
+            raise RuntimeError(f"Writer for {self.path} is closed")
+        self._ensure_started()
+        while self._thread.is_alive():
+            try:
+                self._queue.put(lines, timeout=PUT_RETRY_INTERVAL)
+                return
+            except queue.Full:
+                continue
+        self.lines_dropped += len(lines)
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything queued so far has been written"""
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+    
+    def close(self):
+        """Write everything still queued, fsync and stop the thread"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        # Writers are replaced on every roll or compaction; release the exit hook
+        atexit.unregister(self.close)
+    
+    def _run(self):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            handle = open(self.path, 'a', encoding='utf-8')
+        except Exception as e:
+            print(f"Error opening {self.path}, dropping its writes: {e}")
+            return
+        
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=self.fsync_interval if self._dirty else None)
+                except queue.Empty:
+                    # Idle with unsynced data: honour the interval policy
+                    self._sync(handle)
+                    continue
+                
+                pending: List[str] = []
+                waiters: List[threading.Event] = []
+                size = 0
+                stop = False
+                deadline = time.monotonic() + self.flush_interval
+                
+                while True:
+                    if item is _STOP:
+                        stop = True
+                    elif isinstance(item, threading.Event):
+                        waiters.append(item)
+                    else:
+                        pending.extend(item)
+                        size += sum(len(line) for line in item)
+                    
+                    if stop or waiters or size >= self.max_batch_bytes:
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                
+                if pending:
+                    self._write_batch(handle, pending, size)
+                
+                if stop:
+                    self._sync(handle)
+                    for waiter in waiters:
+                        waiter.set()
+                    return
+                
+                for waiter in waiters:
+                    waiter.set()
+        finally:
+            handle.close()
+    
+    def _write_batch(self, handle, pending: List[str], size: int):
+        try:
+            handle.write("".join(pending))
+            handle.flush()
+            
+            self._dirty = self.fsync_policy != FSYNC_NONE
+            if self.fsync_policy == FSYNC_ALWAYS or (
+                self.fsync_policy == FSYNC_INTERVAL
+                and time.monotonic() - self._last_fsync >= self.fsync_interval
+            ):
+                self._sync(handle)
+            
+            self.batches_written += 1
+            self.lines_written += len(pending)
+            self.bytes_written += size
+        except Exception as e:
+            print(f"Error writing {self.path}: {e}")
+    
+    def _sync(self, handle):
+        if not self._dirty:
+            return
+        try:
+            os.fsync(handle.fileno())
+        except Exception as e:
+            print(f"Error syncing {self.path}: {e}")
+        self._last_fsync = time.monotonic()
+        self._dirty = False
+    
+    def stats(self) -> Dict:
+        """Writer throughput and current backlog"""
+        return {
+            "queued": self._queue.qsize(),
+            "batches_written": self.batches_written,
+            "lines_written": self.lines_written,
+            "bytes_written": self.bytes_written,
+            "lines_dropped": self.lines_dropped,
+            "fsync_policy": self.fsync_policy
+        }
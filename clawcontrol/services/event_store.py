@@ -0,0 +1,268 @@
+"""
+Event Store - Columnar, dictionary-encoded parsed log events
+"""
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from clawcontrol.core.config import config
+from clawcontrol.services.log_follower import log_follower
+from clawcontrol.services.log_parser import LineParser, get_parser
+from clawcontrol.services.log_rotator import LogRotator, log_rotator
+
+LEVELS = ("", "DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+OTHER = "(other)"
+
+
+class _Dictionary:
+    """
+    String <-> int code mapping; code 0 is the empty string.
+    
+    With `max_size`, code 1 is OTHER and values seen once the dictionary
+    is full are encoded as it.
+    """
+    
+    def __init__(self, values=("",), max_size: Optional[int] = None):
+        self.max_size = max_size
+        self.values: List[str] = list(values)
+        if max_size is not None and OTHER not in self.values:
+            self.values.insert(1, OTHER)
+        self.codes: Dict[str, int] = {value: code for code, value in enumerate(self.values)}
+    
+    def encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            if self.max_size is not None and len(self.values) >= self.max_size:
+                return 1
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+    
+    def compact(self, column: np.ndarray) -> "_Dictionary":
+        """Recode `column` in place to a new dictionary holding only the values it uses"""
+        used = np.union1d(np.unique(column), np.arange(2 if self.max_size is not None else 1))
+        mapping = np.zeros(len(self.values), dtype=column.dtype)
+        mapping[used] = np.arange(len(used), dtype=column.dtype)
+        column[:] = mapping[column]
+        return _Dictionary([self.values[code] for code in used], self.max_size)
+    
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class EventStore:
+    """
+    Parsed log events stored as parallel numpy columns.
+    
+    Each line is parsed once by the configured LineParser. Timestamps go
+    into a float64 column, level/tool/command into small integer codes
+    against per-column dictionaries, and the line's global log position
+    into an int64 column so full arguments can be read back on demand.
+    Filters and aggregations are numpy operations over whole columns.
+    When `max_events` is reached the oldest quarter is dropped and the
+    tool and command dictionaries are rebuilt from the rows kept. Each
+    holds at most `max_dictionary_size` values; later new values count
+    as OTHER.
+    """
+    
+    def __init__(
+        self,
+        parser: LineParser,
+        rotator: LogRotator = log_rotator,
+        max_events: int = 2_000_000,
+        initial_capacity: int = 65536,
+        max_dictionary_size: int = 65536
+    ):
+        self.parser = parser
+        self.rotator = rotator
+        self.max_events = max_events
+        
+        self.levels = _Dictionary(LEVELS)
+        self.tools = _Dictionary(max_size=max_dictionary_size)
+        self.commands = _Dictionary(max_size=max_dictionary_size)
+        
+        self._lock = threading.Lock()
+        self._size = 0
+        self._columns = self._allocate(min(initial_capacity, max_events))
+        self.events_evicted = 0
+    
+    @staticmethod
+    def _allocate(capacity: int) -> Dict[str, np.ndarray]:
+        return {
+            "ts": np.empty(capacity, dtype=np.float64),
+            "level": np.empty(capacity, dtype=np.uint8),
+            "tool": np.empty(capacity, dtype=np.int32),
+            "command": np.empty(capacity, dtype=np.int32),
+            "position": np.empty(capacity, dtype=np.int64)
+        }
+    
+    def add_lines(self, lines: List[str], offsets: List[int]):
+        """Log follower handler: parse lines and append them as events"""
+        live_base = self.rotator.live_base
+        rows = []
+        for line, offset in zip(lines, offsets):
+            parsed = self.parser.parse(line)
+            if parsed is not None:
+                rows.append((parsed, live_base + offset))
+        if not rows:
+            return
+        
+        with self._lock:
+            self._reserve(len(rows))
+            start = self._size
+            end = start + len(rows)
+            columns = self._columns
+            columns["ts"][start:end] = [parsed.ts for parsed, _ in rows]
+            columns["level"][start:end] = [self.levels.encode(parsed.level) for parsed, _ in rows]
+            columns["tool"][start:end] = [self.tools.encode(parsed.tool) for parsed, _ in rows]
+            columns["command"][start:end] = [self.commands.encode(parsed.command) for parsed, _ in rows]
+            columns["position"][start:end] = [position for _, position in rows]
+            self._size = end
+    
+    def _reserve(self, count: int):
+        """Make room for `count` more rows, growing or evicting into new arrays"""
+        capacity = len(self._columns["ts"])
+        needed = self._size + count
+        if needed <= capacity:
+            return
+        
+        keep_from = 0
+        if needed > self.max_events:
+            keep_from = min(self._size, max(needed - self.max_events, self.max_events // 4))
+            self.events_evicted += keep_from
+        
+        kept = self._size - keep_from
+        new_capacity = min(max(capacity * 2, kept + count), max(self.max_events, kept + count))
+        columns = self._allocate(new_capacity)
+        for name, column in self._columns.items():
+            columns[name][:kept] = column[keep_from:self._size]
+        
+        if keep_from:
+            self.tools = self.tools.compact(columns["tool"][:kept])
+            self.commands = self.commands.compact(columns["command"][:kept])
+        
+        # Readers may still hold views of the old arrays and dictionaries; they stay valid
+        self._columns = columns
+        self._size = kept
+    
+    def _view(self) -> Tuple[Dict[str, np.ndarray], _Dictionary, _Dictionary]:
+        """Current rows with the tool and command dictionaries that decode them"""
+        with self._lock:
+            columns = {name: column[:self._size] for name, column in self._columns.items()}
+            return columns, self.tools, self.commands
+    
+    def _mask(
+        self,
+        columns: Dict[str, np.ndarray],
+        tools: _Dictionary,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        tool: Optional[str] = None,
+        level: Optional[str] = None
+    ) -> Optional[np.ndarray]:
+        """Boolean row mask, or None when a filter value was never seen"""
+        mask = np.ones(len(columns["ts"]), dtype=bool)
+        if since is not None:
+            mask &= columns["ts"] >= since.timestamp()
+        if until is not None:
+            mask &= columns["ts"] <= until.timestamp()
+        if tool is not None:
+            code = tools.codes.get(tool)
+            if code is None:
+                return None
+            mask &= columns["tool"] == code
+        if level is not None:
+            code = self.levels.codes.get(level.upper())
+            if code is None:
+                return None
+            mask &= columns["level"] == code
+        return mask
+    
+    def actions_per_minute(
+        self,
+        tool: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[Dict]:
+        """Tool actions counted per minute and tool, oldest minute first"""
+        columns, tools, _ = self._view()
+        mask = self._mask(columns, tools, since, until, tool)
+        if mask is None:
+            return []
+        mask &= columns["tool"] != 0
+        
+        tool_count = max(len(tools), 1)
+        minutes = (columns["ts"][mask] // 60).astype(np.int64)
+        keys = minutes * tool_count + columns["tool"][mask]
+        unique, counts = np.unique(keys, return_counts=True)
+        
+        return [
+            {
+                "minute": datetime.fromtimestamp(int(key // tool_count) * 60),
+                "tool": tools.values[int(key % tool_count)],
+                "count": int(count)
+            }
+            for key, count in zip(unique, counts)
+        ]
+    
+    def top_commands(
+        self,
+        limit: int = 10,
+        tool: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[Dict]:
+        """Most frequent commands (first word of the arguments)"""
+        columns, tools, commands = self._view()
+        mask = self._mask(columns, tools, since, until, tool)
+        if mask is None:
+            return []
+        
+        counts = np.bincount(columns["command"][mask], minlength=len(commands))
+        counts[0] = 0
+        top = np.argsort(counts, kind="stable")[::-1][:limit]
+        return [
+            {"command": commands.values[int(code)], "count": int(counts[code])}
+            for code in top if counts[code] > 0
+        ]
+    
+    def events(
+        self,
+        level: Optional[str] = None,
+        tool: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 100
+    ) -> List[Dict]:
+        """Most recent matching events with their full arguments, oldest first"""
+        columns, tools, commands = self._view()
+        mask = self._mask(columns, tools, since, until, tool, level)
+        if mask is None:
+            return []
+        
+        events = []
+        for row in np.flatnonzero(mask)[-limit:]:
+            line = self.rotator.read_line(int(columns["position"][row]))
+            parsed = self.parser.parse(line) if line is not None else None
+            events.append({
+                "ts": datetime.fromtimestamp(float(columns["ts"][row])),
+                "level": self.levels.values[columns["level"][row]],
+                "tool": tools.values[columns["tool"][row]],
+                "command": commands.values[columns["command"][row]],
+                "args": parsed.args if parsed is not None else ""
+            })
+        return events
+    
+    def stats(self) -> Dict:
+        columns, tools, commands = self._view()
+        return {
+            "events": len(columns["ts"]),
+            "events_evicted": self.events_evicted,
+            "tools": len(tools) - 2,
+            "commands": len(commands) - 2,
+            "bytes": sum(column.nbytes for column in columns.values())
+        }
+
+
+event_store = EventStore(get_parser(config.log_parser), max_events=config.event_store_max_events)
+log_follower.add_handler(event_store.add_lines)
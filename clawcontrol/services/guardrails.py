@@ -1,14 +1,66 @@
 """
 Guardrails Engine - Soft alert mode
 """
-import uuid
 import json
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+import os
+import uuid
+import threading
+import time
+from datetime import datetime
+from types import MappingProxyType
+from typing import Callable, List, Dict, Iterable, Mapping, Optional, Tuple
 from collections import deque
 from clawcontrol.core.config import config
-from clawcontrol.core.constants import VIOLATIONS_LOG_FILE
+from clawcontrol.core.constants import VIOLATIONS_LOG_FILE, VIOLATIONS_DIR
 from clawcontrol.api.models import GuardRule, ViolationEvent, GuardRuleCreate
+from clawcontrol.services.pattern_matcher import PatternMatcher
+from clawcontrol.services.path_trie import PathPrefixTrie, extract_paths
+from clawcontrol.services.sequence_rules import SequenceEngine, SequenceStream
+from clawcontrol.services.rate_limiter import TokenBucketLimiter
+from clawcontrol.services.violation_store import SQLiteViolationStore, ViolationStore
+from clawcontrol.services.storage import get_storage
+
+
+class CompiledRules:
+    """
+    Immutable snapshot of the rule set and everything compiled from it.
+    
+    Evaluation reads the engine's current snapshot once per line and never
+    sees a half-applied change; rule edits build a new snapshot and swap
+    the reference in a single assignment.
+    """
+    
+    __slots__ = (
+        "rules", "matcher", "matcher_rules", "step_offset",
+        "path_trie", "path_rules", "path_mask", "sequences"
+    )
+    
+    def __init__(self, rules: Dict[str, GuardRule]):
+        self.rules: Mapping[str, GuardRule] = MappingProxyType(dict(rules))
+        
+        enabled_rules = tuple(rule for rule in self.rules.values() if rule.enabled)
+        patterns = [
+            (pattern, priority)
+            for priority, rule in enumerate(enabled_rules)
+            for pattern in rule.block_patterns
+        ]
+        
+        # Sequence steps share the automaton, numbered after the rules
+        self.sequences = SequenceEngine(enabled_rules)
+        self.step_offset = len(enabled_rules)
+        patterns.extend(
+            (pattern, self.step_offset + step_id)
+            for pattern, step_id in self.sequences.patterns
+        )
+        self.matcher = PatternMatcher(patterns)
+        self.matcher_rules = enabled_rules
+        
+        self.path_rules = tuple(rule for rule in enabled_rules if rule.allowed_paths)
+        self.path_trie = PathPrefixTrie()
+        for index, rule in enumerate(self.path_rules):
+            for prefix in rule.allowed_paths:
+                self.path_trie.add(prefix, 1 << index)
+        self.path_mask = (1 << len(self.path_rules)) - 1
 
 
 class GuardrailsEngine:
@@ -20,45 +72,165 @@ class GuardrailsEngine:
     """
     
     def __init__(self):
-        self.rules: Dict[str, GuardRule] = {}
         self.violations: deque = deque(maxlen=1000)
-        self.action_timestamps: deque = deque(maxlen=1000)
+        self.rate_limiter = TokenBucketLimiter()
         self.violations_log = VIOLATIONS_LOG_FILE
         self.violations_log.parent.mkdir(parents=True, exist_ok=True)
-        self._load_rules()
+        storage = get_storage()
+        if storage is not None:
+            self.violation_store = SQLiteViolationStore(storage, retention_days=config.violations_retention_days)
+            # Prefer JSONL segments; the legacy log was already imported into them if they exist
+            segments = sorted(VIOLATIONS_DIR.glob("segment-*.jsonl"))
+            self.violation_store.import_files(segments or [self.violations_log])
+        else:
+            self.violation_store = ViolationStore(
+                VIOLATIONS_DIR,
+                retention_days=config.violations_retention_days,
+                fsync_policy=config.violations_fsync,
+                flush_interval=config.violations_flush_interval
+            )
+            self.violation_store.import_jsonl(self.violations_log)
+        self.check_paths = config.enforce_allowed_paths
+        
+        self._sequence_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._rules_signature: Optional[Tuple] = None
+        self._watch_stop = threading.Event()
+        self._watch_thread: Optional[threading.Thread] = None
+        
+        self.violation_listeners: List[Callable[[List[ViolationEvent]], None]] = []
+        
+        self._snapshot = CompiledRules({})
+        self._swap_rules(self._load_rules())
+    
+    def add_violation_listener(self, listener: Callable[[List[ViolationEvent]], None]):
+        """Register a callback receiving each batch of new violations"""
+        self.violation_listeners.append(listener)
+    
+    @property
+    def rules(self) -> Mapping[str, GuardRule]:
+        """Read-only view of the current rule set"""
+        return self._snapshot.rules
     
-    def _load_rules(self):
+    def _rules_file_signature(self) -> Optional[Tuple]:
+        try:
+            stat = os.stat(config.rules_file)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    
+    def _load_rules(self) -> Dict[str, GuardRule]:
         """Load rules from config file"""
-        rules_data = config.load_json_file(config.rules_file, default={"rules": []})
-        
+        self._rules_signature = self._rules_file_signature()
+        return self._parse_rules(config.load_json_file(config.rules_file, default={"rules": []}))
+    
+    def _parse_rules(self, rules_data: dict) -> Dict[str, GuardRule]:
+        rules = {}
         for rule_data in rules_data.get("rules", []):
             try:
                 rule = GuardRule(**rule_data)
-                self.rules[rule.id] = rule
+                rules[rule.id] = rule
             except Exception as e:
                 print(f"Error loading rule: {e}")
+        return rules
     
-    def _save_rules(self):
+    def _save_rules(self, rules: Mapping[str, GuardRule]):
         """Save rules to config file"""
         rules_data = {
-            "rules": [rule.model_dump() for rule in self.rules.values()]
+            "rules": [rule.model_dump() for rule in rules.values()]
         }
         config.save_json_file(config.rules_file, rules_data)
+        self._rules_signature = self._rules_file_signature()
+    
+    def _swap_rules(self, rules: Dict[str, GuardRule]):
+        """Compile a new snapshot and publish it atomically"""
+        # Compile outside the lock so evaluation keeps running meanwhile
+        snapshot = CompiledRules(rules)
+        with self._sequence_lock:
+            previous = self._snapshot
+            snapshot.sequences.carry_over(previous.sequences)
+            self._snapshot = snapshot
+        
+        for rule_id, rule in previous.rules.items():
+            if rules.get(rule_id) != rule:
+                self.rate_limiter.forget(rule_id)
+    
+    def reload_rules_if_changed(self) -> bool:
+        """Reload rules.json if it was edited outside the API"""
+        signature = self._rules_file_signature()
+        if signature == self._rules_signature:
+            return False
+        
+        with self._write_lock:
+            if signature == self._rules_signature:
+                return False
+            self._rules_signature = signature
+            
+            # Keep the current snapshot if the edit is incomplete or invalid
+            try:
+                with open(config.rules_file, 'r') as f:
+                    rules_data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Error reloading {config.rules_file}: {e}")
+                return False
+            
+            self._swap_rules(self._parse_rules(rules_data))
+        return True
+    
+    def _watch_rules(self, interval: float):
+        while not self._watch_stop.wait(interval):
+            try:
+                self.reload_rules_if_changed()
+            except Exception as e:
+                print(f"Error reloading rules: {e}")
+    
+    def start_watching(self, interval: float = 1.0):
+        """Poll rules.json (inode, mtime, size) and hot-reload on change"""
+        if self._watch_thread and self._watch_thread.is_alive():
+            return
+        self._watch_stop.clear()
+        self._watch_thread = threading.Thread(
+            target=self._watch_rules, args=(interval,), name="rules-watcher", daemon=True
+        )
+        self._watch_thread.start()
+    
+    def stop_watching(self):
+        self._watch_stop.set()
+        if self._watch_thread:
+            self._watch_thread.join(timeout=5)
+            self._watch_thread = None
     
     def _log_violation(self, violation: ViolationEvent):
         """Persist violation to log file"""
+        self._log_violations([violation])
+    
+    def _log_violations(self, violations: List[ViolationEvent]):
+        """Queue a batch of violations for the violation store"""
+        if not violations:
+            return
+        
         try:
-            with open(self.violations_log, 'a') as f:
-                log_entry = {
+            self.violation_store.append(
+                {
                     "ts": violation.ts.isoformat(),
                     "rule_id": violation.rule_id,
                     "log_excerpt": violation.log_excerpt,
                     "severity": violation.severity
                 }
-                f.write(json.dumps(log_entry) + "\n")
+                for violation in violations
+            )
         except Exception as e:
             print(f"Error logging violation: {e}")
     
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until queued violations are written to disk"""
+        return self.violation_store.flush(timeout)
+    
+    def close(self):
+        """Stop watching rules, flush queued violations and stop the writer"""
+        self.stop_watching()
+        self.violation_store.close()
+    
     def get_all_rules(self) -> List[GuardRule]:
         """Get all guardrail rules"""
         return list(self.rules.values())
@@ -75,75 +247,164 @@ class GuardrailsEngine:
             **rule_create.model_dump()
         )
         
-        self.rules[rule_id] = rule
-        self._save_rules()
+        with self._write_lock:
+            rules = dict(self.rules)
+            rules[rule_id] = rule
+            self._swap_rules(rules)
+            self._save_rules(rules)
         
         return rule
     
     def update_rule(self, rule_id: str, rule_data: dict) -> Optional[GuardRule]:
         """Update existing rule"""
-        if rule_id not in self.rules:
-            return None
-        
-        current_rule = self.rules[rule_id]
-        updated_data = current_rule.model_dump()
-        updated_data.update(rule_data)
-        
-        self.rules[rule_id] = GuardRule(**updated_data)
-        self._save_rules()
+        with self._write_lock:
+            if rule_id not in self.rules:
+                return None
+            
+            current_rule = self.rules[rule_id]
+            updated_data = current_rule.model_dump()
+            updated_data.update(rule_data)
+            
+            rules = dict(self.rules)
+            rules[rule_id] = GuardRule(**updated_data)
+            self._swap_rules(rules)
+            self._save_rules(rules)
         
-        return self.rules[rule_id]
+        return rules[rule_id]
     
     def delete_rule(self, rule_id: str) -> bool:
         """Delete rule by ID"""
-        if rule_id in self.rules:
-            del self.rules[rule_id]
-            self._save_rules()
-            return True
-        return False
+        with self._write_lock:
+            if rule_id not in self.rules:
+                return False
+            
+            rules = dict(self.rules)
+            del rules[rule_id]
+            self._swap_rules(rules)
+            self._save_rules(rules)
+        return True
     
-    def evaluate_log_line(self, log_line: str) -> Optional[ViolationEvent]:
+    def evaluate_log_line(self, log_line: str, source: Optional[str] = None) -> Optional[ViolationEvent]:
         """
         Evaluate log line against rules (SOFT ALERT MODE)
         
         Violations are logged and returned but do NOT trigger
-        automatic process termination.
+        automatic process termination. All enabled block patterns
+        are matched in a single pass over the line; absolute paths
+        outside a rule's allowed_paths are flagged next. Sequence
+        rules advance on every line of the `source` stream and fire
+        when their last step is seen inside the window; without a
+        source a single line cannot complete a sequence.
         """
-        for rule in self.rules.values():
-            if not rule.enabled:
-                continue
-            
-            for pattern in rule.block_patterns:
-                if pattern.lower() in log_line.lower():
-                    violation = ViolationEvent(
-                        ts=datetime.now(),
-                        rule_id=rule.id,
-                        log_excerpt=log_line[:200],
-                        severity="warning"
-                    )
-                    self.violations.append(violation)
-                    self._log_violation(violation)
-                    return violation
+        snapshot = self._snapshot
+        violations = self._match_line(log_line, snapshot, self._sequence_stream(snapshot, source))
+        if not violations:
+            return None
         
+        self._record(violations)
+        return violations[0]
+    
+    def evaluate_log_lines(self, log_lines: Iterable[str], source: Optional[str] = None) -> List[ViolationEvent]:
+        """
+        Evaluate a chunk of log lines in one pass (SOFT ALERT MODE)
+        
+        Returns every violation found; they are handed to the
+        violation store as one batch instead of one entry per line.
+        Sequence state is kept per `source`; without one the chunk is
+        its own stream.
+        """
+        match_line = self._match_line
+        snapshot = self._snapshot
+        stream = self._sequence_stream(snapshot, source)
+        violations = []
+        
+        for log_line in log_lines:
+            violations.extend(match_line(log_line, snapshot, stream))
+        
+        self._record(violations)
+        return violations
+    
+    def _record(self, violations: List[ViolationEvent]):
+        """Keep, persist and announce new violations"""
+        if not violations:
+            return
+        
+        self.violations.extend(violations)
+        self._log_violations(violations)
+        for listener in self.violation_listeners:
+            try:
+                listener(violations)
+            except Exception as e:
+                print(f"Error in violation listener: {e}")
+    
+    def _sequence_stream(self, snapshot: CompiledRules, source: Optional[str]) -> Optional[SequenceStream]:
+        if not snapshot.sequences.rules:
+            return None
+        with self._sequence_lock:
+            return snapshot.sequences.stream(source)
+    
+    def _match_line(
+        self,
+        log_line: str,
+        snapshot: Optional[CompiledRules] = None,
+        stream: Optional[SequenceStream] = None
+    ) -> List[ViolationEvent]:
+        """Build violations for the first matching rule and sequences completed in `stream`"""
+        if snapshot is None:
+            snapshot = self._snapshot
+        
+        if snapshot.sequences.rules:
+            step_offset = snapshot.step_offset
+            matched = snapshot.matcher.all_matches(log_line)
+            priority = min((p for p in matched if p < step_offset), default=None)
+            steps = [p - step_offset for p in matched if p >= step_offset]
+        else:
+            priority = snapshot.matcher.first_match(log_line)
+            steps = None
+        
+        rule = None
+        if priority is not None:
+            rule = snapshot.matcher_rules[priority]
+        elif self.check_paths and snapshot.path_mask:
+            rule = self._match_paths(snapshot, log_line)
+        
+        violations = [] if rule is None else [self._violation(rule, log_line)]
+        
+        if stream is not None:
+            with self._sequence_lock:
+                fired = snapshot.sequences.feed(stream, steps, time.monotonic())
+            violations.extend(self._violation(fired_rule, log_line) for fired_rule in fired)
+        
+        return violations
+    
+    def _violation(self, rule: GuardRule, log_line: str) -> ViolationEvent:
+        return ViolationEvent(
+            ts=datetime.now(),
+            rule_id=rule.id,
+            log_excerpt=log_line[:200],
+            severity="warning"
+        )
+    
+    def _match_paths(self, snapshot: CompiledRules, log_line: str) -> Optional[GuardRule]:
+        """First rule whose allowed_paths do not cover a path in the line"""
+        for path in extract_paths(log_line):
+            denied = snapshot.path_mask & ~snapshot.path_trie.allowed_mask(path)
+            if denied:
+                return snapshot.path_rules[(denied & -denied).bit_length() - 1]
         return None
     
-    def check_rate_limit(self, rule_id: str) -> bool:
-        """Check if rate limit is exceeded"""
+    def check_rate_limit(self, rule_id: str, source: Optional[str] = None) -> bool:
+        """
+        Check if rate limit is exceeded
+        
+        Each rule has its own token bucket, optionally split further
+        by action source or instance id. Cost is O(1) per check.
+        """
         rule = self.rules.get(rule_id)
         if not rule:
             return False
         
-        one_minute_ago = datetime.now() - timedelta(minutes=1)
-        self.action_timestamps = deque(
-            [ts for ts in self.action_timestamps if ts > one_minute_ago],
-            maxlen=1000
-        )
-        
-        if len(self.action_timestamps) >= rule.rate_limit_per_min:
-            return True
-        
-        self.action_timestamps.append(datetime.now())
-        return False
+        return not self.rate_limiter.acquire(rule_id, rule.rate_limit_per_min, source)
     
     def get_violations(self, since: Optional[datetime] = None, limit: int = 100) -> List[ViolationEvent]:
         """Get violations with optional filtering"""
@@ -153,6 +414,26 @@ class GuardrailsEngine:
             violations = [v for v in violations if v.ts >= since]
         
         return violations[-limit:]
+    
+    def query_violations(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        rule_id: Optional[str] = None,
+        severity: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[ViolationEvent], Optional[str]]:
+        """Page through the full violation history in time order"""
+        entries, next_cursor = self.violation_store.query(
+            since=since,
+            until=until,
+            rule_id=rule_id,
+            severity=severity,
+            limit=limit,
+            cursor=cursor
+        )
+        return [ViolationEvent(**entry) for entry in entries], next_cursor
 
 
 guardrails_engine = GuardrailsEngine()
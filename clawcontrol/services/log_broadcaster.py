@@ -0,0 +1,99 @@
+"""
+Log Broadcaster - Fan out followed log lines to streaming clients
+"""
+import asyncio
+from typing import Dict, List, Optional, Set
+from clawcontrol.services.log_follower import log_follower
+
+
+class Subscriber:
+    """One streaming client: a bounded queue of encoded chunks"""
+    
+    __slots__ = ("queue", "dropped")
+    
+    def __init__(self, max_queue: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+
+class LogBroadcaster:
+    """
+    Shares each batch of followed lines with every subscriber.
+    
+    The log follower reads the file once; each batch is encoded as SSE
+    events once and the same bytes are queued for every client. Queues
+    are bounded: a client that falls behind loses chunks (and is told how
+    many) instead of holding up the follower or other clients.
+    """
+    
+    def __init__(self, max_queue: int = 256):
+        self.max_queue = max_queue
+        self._subscribers: Set[Subscriber] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        self.chunks_published = 0
+        self.chunks_dropped = 0
+    
+    def subscribe(self) -> Subscriber:
+        """Register a client; must be called from the server's event loop"""
+        self._loop = asyncio.get_running_loop()
+        subscriber = Subscriber(self.max_queue)
+        self._subscribers.add(subscriber)
+        return subscriber
+    
+    def unsubscribe(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+    
+    def publish(self, lines: List[str], offsets: List[int]):
+        """Log follower handler: encode once and hand off to the event loop"""
+        if not self._subscribers or self._loop is None:
+            return
+        
+        payload = "".join(
+            f"id: {offset}\ndata: {line}\n\n" for line, offset in zip(lines, offsets)
+        ).encode("utf-8")
+        
+        try:
+            self._loop.call_soon_threadsafe(self._fan_out, payload)
+        except RuntimeError:
+            # Event loop already closed
+            self._loop = None
+    
+    def _fan_out(self, payload: bytes):
+        self.chunks_published += 1
+        for subscriber in self._subscribers:
+            try:
+                subscriber.queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                subscriber.dropped += 1
+                self.chunks_dropped += 1
+    
+    async def stream(self, keepalive: float = 15.0):
+        """Yield SSE bytes for a new subscriber until the client disconnects"""
+        subscriber = self.subscribe()
+        try:
+            yield b": connected\n\n"
+            while True:
+                try:
+                    payload = await asyncio.wait_for(subscriber.queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                
+                if subscriber.dropped:
+                    yield f"event: dropped\ndata: {subscriber.dropped}\n\n".encode("utf-8")
+                    subscriber.dropped = 0
+                yield payload
+        finally:
+            self.unsubscribe(subscriber)
+    
+    def stats(self) -> Dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "chunks_published": self.chunks_published,
+            "chunks_dropped": self.chunks_dropped
+        }
+
+
+log_broadcaster = LogBroadcaster()
+log_follower.add_handler(log_broadcaster.publish)
@@ -0,0 +1,260 @@
+"""
+Log Follower - Incremental live tail of openclaw.log
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from clawcontrol.core.config import config
+from clawcontrol.core.constants import OPENCLAW_LOG_FILE, LOG_FOLLOWER_CHECKPOINT_FILE
+
+LineHandler = Callable[[List[str], List[int]], None]
+
+
+class LogFollower:
+    """
+    Follows a log file and hands newly appended lines to handlers.
+    
+    Only new bytes are read on each poll. Incomplete trailing lines are
+    held back until their newline arrives, truncation restarts from the
+    beginning, and rotation (new inode) drains the old file first.
+    The byte offset is checkpointed so a restart resumes where it stopped.
+    """
+    
+    def __init__(
+        self,
+        log_file: Path = OPENCLAW_LOG_FILE,
+        checkpoint_file: Path = LOG_FOLLOWER_CHECKPOINT_FILE,
+        poll_interval: float = 0.05,
+        read_size: int = 1024 * 1024,
+        checkpoint_interval: float = 1.0
+    ):
+        self.log_file = log_file
+        self.checkpoint_file = checkpoint_file
+        self.poll_interval = poll_interval
+        self.read_size = read_size
+        self.checkpoint_interval = checkpoint_interval
+        self.handlers: List[LineHandler] = []
+        
+        self.offset = 0
+        self._inode: Optional[int] = None
+        self._resumed = False
+        self._handle = None
+        self._partial = b""
+        self._last_checkpoint = 0.0
+        
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        
+        self.lines_processed = 0
+        self.last_latency_ms: Optional[float] = None
+        self.max_latency_ms = 0.0
+    
+    def add_handler(self, handler: LineHandler):
+        """Register a callback receiving (lines, line_start_offsets)"""
+        self.handlers.append(handler)
+    
+    def _load_checkpoint(self) -> Dict:
+        return config.load_json_file(self.checkpoint_file, default={})
+    
+    def _save_checkpoint(self):
+        """Persist offset of the last fully processed line"""
+        try:
+            config.save_json_file(self.checkpoint_file, {
+                "inode": self._inode,
+                "offset": self.offset - len(self._partial)
+            })
+            self._last_checkpoint = time.monotonic()
+        except Exception as e:
+            print(f"Error saving log follower checkpoint: {e}")
+    
+    def _open(self, resume: bool):
+        """Open the log file, resuming from the checkpoint when it still applies"""
+        self._resumed = True
+        try:
+            self._handle = open(self.log_file, 'rb')
+        except FileNotFoundError:
+            self._handle = None
+            return
+        
+        stat = os.fstat(self._handle.fileno())
+        self._inode = stat.st_ino
+        self._partial = b""
+        self.offset = 0
+        
+        if resume:
+            checkpoint = self._load_checkpoint()
+            if checkpoint.get("inode") == stat.st_ino and checkpoint.get("offset", 0) <= stat.st_size:
+                self.offset = checkpoint.get("offset", 0)
+            elif not checkpoint:
+                # First run: only follow output written from now on
+                self.offset = stat.st_size
+        
+        self._handle.seek(self.offset)
+    
+    def _close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+    
+    def _read_available(self) -> int:
+        """Read everything appended since the last poll and dispatch it"""
+        processed = 0
+        
+        while True:
+            chunk = self._handle.read(self.read_size)
+            if not chunk:
+                break
+            
+            chunk_start = self.offset - len(self._partial)
+            self.offset += len(chunk)
+            data = self._partial + chunk
+            
+            last_newline = data.rfind(b"\n")
+            if last_newline == -1:
+                self._partial = data
+                continue
+            
+            self._partial = data[last_newline + 1:]
+            raw_lines = data[:last_newline].split(b"\n")
+            
+            lines = []
+            offsets = []
+            position = chunk_start
+            for raw in raw_lines:
+                offsets.append(position)
+                position += len(raw) + 1
+                lines.append(raw.rstrip(b"\r").decode("utf-8", errors="replace"))
+            
+            self.dispatch(lines, offsets)
+            processed += len(lines)
+        
+        return processed
+    
+    def dispatch(self, lines: List[str], offsets: List[int]):
+        """Hand lines to every handler; also used for lines captured from the pipe"""
+        for handler in self.handlers:
+            try:
+                handler(lines, offsets)
+            except Exception as e:
+                print(f"Error in log follower handler: {e}")
+    
+    def poll(self) -> int:
+        """Process newly appended lines once, returning how many were handled"""
+        with self._lock:
+            if self._handle is None:
+                self._open(resume=not self._resumed)
+                if self._handle is None:
+                    return 0
+            
+            try:
+                stat = os.stat(self.log_file)
+            except FileNotFoundError:
+                stat = None
+            
+            processed = 0
+            if stat is not None and stat.st_ino != self._inode:
+                # Rotated: finish the old file, then start the new one from the top
+                processed += self._read_available()
+                self._close()
+                self._open(resume=False)
+                if self._handle is None:
+                    return processed
+            elif stat is not None and stat.st_size < self.offset:
+                # Truncated in place
+                self._partial = b""
+                self.offset = 0
+                self._handle.seek(0)
+            
+            processed += self._read_available()
+            
+            if processed:
+                self.lines_processed += processed
+                if stat is not None:
+                    latency = max(0.0, (time.time() - stat.st_mtime) * 1000)
+                    self.last_latency_ms = latency
+                    self.max_latency_ms = max(self.max_latency_ms, latency)
+            
+            if processed and time.monotonic() - self._last_checkpoint >= self.checkpoint_interval:
+                self._save_checkpoint()
+            
+            return processed
+    
+    @contextmanager
+    def truncating(self):
+        """
+        Hold off polling while the log is truncated in place.
+        
+        Everything already appended is dispatched first; afterwards
+        reading restarts at offset 0 of the emptied file.
+        """
+        with self._lock:
+            if self._handle is not None:
+                self.lines_processed += self._read_available()
+            yield
+            self._partial = b""
+            self.offset = 0
+            if self._handle is not None:
+                self._handle.seek(0)
+    
+    @contextmanager
+    def appending(self):
+        """
+        Hold off truncation while lines captured from the pipe are
+        appended and dispatched, so their offsets and the rotator's
+        live_base always describe the same file.
+        """
+        with self._lock:
+            yield
+    
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Error following log: {e}")
+            self._stop_event.wait(self.poll_interval)
+    
+    def start(self):
+        """Start following in a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="log-follower", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop following and persist the checkpoint"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        
+        with self._lock:
+            if self._handle is not None:
+                self._save_checkpoint()
+            self._close()
+            self._resumed = False
+    
+    def stats(self) -> Dict:
+        """Follower progress and write-to-detection latency"""
+        return {
+            "running": bool(self._thread and self._thread.is_alive()),
+            "offset": self.offset - len(self._partial),
+            "lines_processed": self.lines_processed,
+            "last_latency_ms": self.last_latency_ms,
+            "max_latency_ms": self.max_latency_ms
+        }
+
+
+def _evaluate_lines(lines: List[str], offsets: List[int]):
+    from clawcontrol.services.guardrails import guardrails_engine
+    guardrails_engine.evaluate_log_lines(lines, source="openclaw")
+
+
+log_follower = LogFollower(poll_interval=config.log_follow_interval)
+log_follower.add_handler(_evaluate_lines)
@@ -0,0 +1,342 @@
+"""
+Log Index - Incremental inverted index over OpenClaw log lines
+"""
+import json
+import os
+import re
+import threading
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from clawcontrol.core.constants import OPENCLAW_INDEX_DIR
+from clawcontrol.services.log_follower import log_follower
+from clawcontrol.services.log_rotator import LogRotator, log_rotator
+
+TOKEN_PATTERN = re.compile(r"\w+")
+MAX_TOKEN_LENGTH = 64
+CATCH_UP_CHUNK_BYTES = 4 * 1024 * 1024
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens; paths and flags split on punctuation"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if len(token) <= MAX_TOKEN_LENGTH]
+
+
+class _IndexSegment:
+    """
+    One sealed run of postings on disk: a term dictionary (kept in memory)
+    mapping each term to a slice of a flat array of global line positions.
+    """
+    
+    __slots__ = ("seq", "path", "terms", "min_position", "max_position")
+    
+    def __init__(self, seq: int, path: Path, terms: Dict[str, List[int]], min_position: int, max_position: int):
+        self.seq = seq
+        self.path = path
+        self.terms = terms
+        self.min_position = min_position
+        self.max_position = max_position
+    
+    def postings(self, term: str) -> array:
+        entry = self.terms.get(term)
+        result = array("q")
+        if entry is None:
+            return result
+        start, count = entry
+        with open(self.path, 'rb') as f:
+            f.seek(start * result.itemsize)
+            result.frombytes(f.read(count * result.itemsize))
+        return result
+
+
+class LogIndex:
+    """
+    Maps tokens to the global positions of the lines containing them.
+    
+    New lines arrive through the log follower and go into an in-memory
+    run; once it covers `flush_lines` lines it is written next to
+    the log as an immutable segment. Positions only grow, so every
+    posting list is sorted and a query intersects lists with binary
+    search, starting from the rarest term. Phrase queries (in double
+    quotes) are verified against the line text, which is read back from
+    the live log or the rotated segment that now holds it.
+    """
+    
+    def __init__(
+        self,
+        directory: Path = OPENCLAW_INDEX_DIR,
+        rotator: LogRotator = log_rotator,
+        flush_lines: int = 200_000
+    ):
+        self.directory = Path(directory)
+        self.rotator = rotator
+        self.flush_lines = flush_lines
+        
+        self._lock = threading.Lock()
+        self._segments: List[_IndexSegment] = []
+        self._active: Dict[str, array] = {}
+        self._active_lines = 0
+        self._active_min: Optional[int] = None
+        self._pending: Optional[List[Tuple]] = None
+        self.last_position = -1
+        self.next_position = 0
+        self.lines_indexed = 0
+        self._load()
+    
+    def _data_path(self, seq: int) -> Path:
+        return self.directory / f"postings-{seq:08d}.bin"
+    
+    def _terms_path(self, seq: int) -> Path:
+        return self.directory / f"postings-{seq:08d}.terms.json"
+    
+    def _load(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for path in sorted(self.directory.glob("postings-*.terms.json")):
+            seq = int(path.name.split("-")[1].split(".")[0])
+            try:
+                with open(path, 'r') as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            segment = _IndexSegment(seq, self._data_path(seq), meta["terms"], meta["min_position"], meta["max_position"])
+            self._segments.append(segment)
+            self.last_position = max(self.last_position, segment.max_position)
+        
+        # End of the last persisted line is unknown; the first batch re-checks from its start
+        self.next_position = self.last_position + 1
+    
+    def add_lines(self, lines: List[str], offsets: List[int]):
+        """Log follower handler: index lines by their global position"""
+        with self._lock:
+            if not lines:
+                return
+            live_base = self.rotator.live_base
+            if self._pending is not None:
+                # A catch-up is running; these lines go in after it, in order
+                self._pending.append((live_base, lines, offsets))
+                return
+            
+            first = live_base + offsets[0]
+            if first > self.next_position:
+                if first - max(self.last_position, live_base) > CATCH_UP_CHUNK_BYTES:
+                    self._pending = [(live_base, lines, offsets)]
+                    self._start_thread(self._catch_up_chunks)
+                    return
+                self._catch_up(live_base, first)
+            self._add_batch(live_base, lines, offsets)
+    
+    def _add_batch(self, live_base: int, lines: List[str], offsets: List[int]):
+        for index, (line, offset) in enumerate(zip(lines, offsets)):
+            if index + 1 < len(offsets):
+                size = offsets[index + 1] - offset
+            else:
+                size = len(line.encode("utf-8")) + 1
+            self._add(live_base + offset, set(tokenize(line)), size)
+        
+        if self._active_lines >= self.flush_lines:
+            self._flush()
+    
+    def _add(self, position: int, tokens: Set[str], size: int):
+        if position <= self.last_position:
+            return
+        for token in tokens:
+            postings = self._active.get(token)
+            if postings is None:
+                postings = self._active[token] = array("q")
+            postings.append(position)
+        self._active_lines += 1
+        if self._active_min is None:
+            self._active_min = position
+        self.last_position = position
+        self.next_position = position + size
+        self.lines_indexed += 1
+    
+    def _read_lines(self, live_base: int, start: int, until: float, max_bytes: float) -> Tuple[List[Tuple], bool]:
+        """Tokenized (position, tokens, size) of complete live-log lines from `start`, and whether the end was reached"""
+        rows = []
+        read = 0
+        try:
+            with open(self.rotator.log_file, 'rb') as f:
+                f.seek(start - live_base)
+                position = start
+                for raw in f:
+                    if position >= until or not raw.endswith(b"\n"):
+                        return rows, True
+                    rows.append((position, set(tokenize(raw.rstrip(b"\r\n").decode("utf-8", errors="replace"))), len(raw)))
+                    position += len(raw)
+                    read += len(raw)
+                    if read >= max_bytes:
+                        return rows, False
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Error reading {self.rotator.log_file}: {e}")
+        return rows, True
+    
+    def _catch_up(self, live_base: int, until: int):
+        """Index the live-log lines between the last indexed line and `until`"""
+        rows, _ = self._read_lines(live_base, max(self.last_position, live_base), until, float("inf"))
+        for row in rows:
+            self._add(*row)
+    
+    def _catch_up_chunks(self):
+        """
+        Index the live log up to the first queued batch, a chunk at a time.
+        
+        Chunks are read and tokenized without the lock, which is only held
+        to merge each one, so follower batches keep flowing into the queue.
+        """
+        while True:
+            with self._lock:
+                live_base = self.rotator.live_base
+                start = max(self.last_position, live_base)
+                until = self._pending[0][0] + self._pending[0][2][0] if self._pending else float("inf")
+            
+            rows, done = self._read_lines(live_base, start, until, CATCH_UP_CHUNK_BYTES)
+            
+            with self._lock:
+                if self.rotator.live_base != live_base:
+                    # Rotated while reading; the offsets read are stale
+                    continue
+                for row in rows:
+                    self._add(*row)
+                if self._active_lines >= self.flush_lines:
+                    self._flush()
+                if not done:
+                    continue
+                
+                pending, self._pending = self._pending, None
+                for batch in pending:
+                    self._add_batch(*batch)
+                return
+    
+    def catch_up(self):
+        """Index everything already in the live log"""
+        with self._lock:
+            if self._pending is not None:
+                return
+            self._pending = []
+        self._catch_up_chunks()
+    
+    def _start_thread(self, target):
+        threading.Thread(target=target, name="log-index-catch-up", daemon=True).start()
+    
+    def start(self):
+        """Catch up with the live log in the background"""
+        self._start_thread(self.catch_up)
+    
+    def _flush(self):
+        if not self._active:
+            return
+        
+        seq = self._segments[-1].seq + 1 if self._segments else 1
+        terms: Dict[str, List[int]] = {}
+        data = array("q")
+        for term in sorted(self._active):
+            postings = self._active[term]
+            terms[term] = [len(data), len(postings)]
+            data.extend(postings)
+        
+        try:
+            with open(self._data_path(seq), 'wb') as f:
+                data.tofile(f)
+            tmp_path = self._terms_path(seq).with_suffix(".tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump({
+                    "terms": terms,
+                    "min_position": self._active_min,
+                    "max_position": self.last_position
+                }, f)
+            os.replace(tmp_path, self._terms_path(seq))
+        except Exception as e:
+            print(f"Error writing log index segment: {e}")
+            return
+        
+        self._segments.append(_IndexSegment(seq, self._data_path(seq), terms, self._active_min, self.last_position))
+        self._active = {}
+        self._active_lines = 0
+        self._active_min = None
+        self._prune()
+    
+    def _prune(self):
+        """Drop index segments whose lines have all been pruned from the archive"""
+        oldest = self.rotator.oldest_position()
+        while self._segments and self._segments[0].max_position < oldest:
+            segment = self._segments.pop(0)
+            for path in (segment.path, self._terms_path(segment.seq)):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+    
+    def flush(self):
+        """Persist the in-memory run as a segment"""
+        with self._lock:
+            self._flush()
+    
+    def search(self, query: str, limit: int = 50, cursor: Optional[int] = None) -> Tuple[List[Dict], Optional[int]]:
+        """
+        Lines matching every term of `query`, oldest first. Quoted text
+        must appear verbatim (case-insensitive). Returns the hits and a
+        cursor for the next page, or None when there are no more.
+        """
+        phrases = [phrase.lower() for phrase in re.findall(r'"([^"]+)"', query)]
+        terms = sorted(set(tokenize(query)))
+        if not terms:
+            return [], None
+        
+        after = -1 if cursor is None else cursor
+        with self._lock:
+            segments = list(self._segments)
+            active = {term: array("q", self._active.get(term, ())) for term in terms}
+        
+        hits: List[Dict] = []
+        for segment in segments + [None]:
+            if segment is None:
+                lists = [active[term] for term in terms]
+            elif segment.max_position > after:
+                lists = [segment.postings(term) for term in terms]
+            else:
+                continue
+            
+            for position in self._intersect(lists, after):
+                line = self.rotator.read_line(position)
+                if line is None:
+                    continue
+                if phrases and not all(phrase in line.lower() for phrase in phrases):
+                    continue
+                if len(hits) >= limit:
+                    return hits, hits[-1]["position"]
+                hits.append({"position": position, "line": line})
+        
+        return hits, None
+    
+    def _intersect(self, lists: List[array], after: int):
+        """Positions greater than `after` present in every sorted list"""
+        if not lists or any(len(postings) == 0 for postings in lists):
+            return
+        lists.sort(key=len)
+        rarest, others = lists[0], lists[1:]
+        for position in rarest[bisect_right(rarest, after):]:
+            if all(self._contains(postings, position) for postings in others):
+                yield position
+    
+    @staticmethod
+    def _contains(postings: array, position: int) -> bool:
+        index = bisect_right(postings, position) - 1
+        return index >= 0 and postings[index] == position
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "segments": len(self._segments),
+                "active_lines": self._active_lines,
+                "lines_indexed": self.lines_indexed,
+                "last_position": self.last_position,
+                "catching_up": self._pending is not None
+            }
+
+
+log_index = LogIndex()
+log_follower.add_handler(log_index.add_lines)
@@ -0,0 +1,79 @@
+"""
+Log Parser - Pluggable structured parsing of OpenClaw log lines
+"""
+import re
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, NamedTuple, Optional
+
+
+class ParsedLine(NamedTuple):
+    """Structured fields of one log line"""
+    ts: float
+    level: str
+    tool: str
+    command: str
+    args: str
+
+
+class LineParser(ABC):
+    """Base parser; subclasses turn a raw line into a ParsedLine (or None to skip it)"""
+    
+    @abstractmethod
+    def parse(self, line: str) -> Optional[ParsedLine]:
+        ...
+
+
+class DefaultLineParser(LineParser):
+    """
+    Parses `[TIMESTAMP] LEVEL [tool:NAME] ARGS`, every part optional.
+    Lines without a timestamp are stamped with the time they were seen.
+    """
+    
+    PATTERN = re.compile(
+        r"^(?:\[?(?P<ts>\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?)\]?\s*)?"
+        r"(?:\[?(?P<level>DEBUG|INFO|WARN|WARNING|ERROR|CRITICAL)\b\]?:?\s*)?"
+        r"(?:\[tool:(?P<tool>[\w.-]+)\]\s*)?"
+        r"(?P<args>.*)$"
+    )
+    
+    def parse(self, line: str) -> Optional[ParsedLine]:
+        match = self.PATTERN.match(line)
+        if match is None:
+            return None
+        
+        ts = time.time()
+        if match.group("ts"):
+            try:
+                ts = datetime.fromisoformat(match.group("ts")).timestamp()
+            except ValueError:
+                pass
+        
+        level = match.group("level") or ""
+        if level == "WARN":
+            level = "WARNING"
+        args = match.group("args").strip()
+        return ParsedLine(
+            ts=ts,
+            level=level,
+            tool=match.group("tool") or "",
+            command=args.split(None, 1)[0] if args else "",
+            args=args
+        )
+
+
+PARSERS: Dict[str, LineParser] = {
+    "default": DefaultLineParser()
+}
+
+
+def register_parser(name: str, parser: LineParser):
+    """Make a parser selectable through LOG_PARSER"""
+    PARSERS[name] = parser
+
+
+def get_parser(name: str) -> LineParser:
+    if name not in PARSERS:
+        raise ValueError(f"Unknown log parser: {name} (expected one of {sorted(PARSERS)})")
+    return PARSERS[name]
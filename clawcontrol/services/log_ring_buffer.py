@@ -0,0 +1,60 @@
+"""
+Log Ring Buffer - Most recent OpenClaw output kept in memory
+"""
+import threading
+from collections import deque
+from itertools import islice
+from typing import Deque, Dict, List
+
+
+class LogRingBuffer:
+    """
+    Holds the most recent lines up to `max_bytes` of text.
+    
+    Appending evicts the oldest lines once the budget is exceeded, so
+    memory stays bounded however much OpenClaw writes. Sizes are counted
+    in characters, which equals bytes for ASCII output.
+    """
+    
+    def __init__(self, max_bytes: int = 8 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._lines: Deque[str] = deque()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.lines_appended = 0
+        self.lines_evicted = 0
+    
+    def extend(self, lines: List[str]):
+        """Append lines (including their newline), evicting the oldest as needed"""
+        with self._lock:
+            self._lines.extend(lines)
+            self._size += sum(len(line) for line in lines)
+            self.lines_appended += len(lines)
+            
+            while self._size > self.max_bytes and self._lines:
+                self._size -= len(self._lines.popleft())
+                self.lines_evicted += 1
+    
+    def tail(self, count: int) -> List[str]:
+        """Last `count` lines, oldest first"""
+        with self._lock:
+            lines = list(islice(reversed(self._lines), count))
+        lines.reverse()
+        return lines
+    
+    def __len__(self) -> int:
+        return len(self._lines)
+    
+    def clear(self):
+        with self._lock:
+            self._lines.clear()
+            self._size = 0
+    
+    def stats(self) -> Dict:
+        return {
+            "lines": len(self._lines),
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "lines_appended": self.lines_appended,
+            "lines_evicted": self.lines_evicted
+        }
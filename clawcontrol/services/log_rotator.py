@@ -0,0 +1,450 @@
+"""
+Log Rotator - Seal openclaw.log into compressed, time-indexed segments
+"""
+import gzip
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from bisect import bisect_left
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from clawcontrol.core.config import config
+from clawcontrol.core.constants import OPENCLAW_LOG_FILE, OPENCLAW_ARCHIVE_DIR
+from clawcontrol.services.log_follower import LogFollower, log_follower
+
+# Leading ISO-8601 timestamp, optionally in brackets
+TIMESTAMP_PATTERN = re.compile(rb"^\[?(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?)")
+
+
+def parse_line_ts(raw: bytes) -> Optional[float]:
+    """Timestamp at the start of a log line, if it has one"""
+    match = TIMESTAMP_PATTERN.match(raw)
+    if match is None:
+        return None
+    try:
+        return datetime.fromisoformat(match.group(1).decode("ascii")).timestamp()
+    except ValueError:
+        return None
+
+
+class _SegmentWriter:
+    """
+    Builds one sealed segment: a multi-member gzip file where each member
+    is an independently decompressible block of whole lines, plus the
+    (first_ts, last_ts, offset, length, lines, raw_offset) of every block.
+    """
+    
+    def __init__(self, path: Path, fallback_ts: float, block_bytes: int):
+        self.path = path
+        self.tmp_path = path.with_suffix(".tmp")
+        self.block_bytes = block_bytes
+        self.blocks: List[List] = []
+        self.lines = 0
+        self.raw_bytes = 0
+        
+        self._handle = open(self.tmp_path, 'wb')
+        self._partial = b""
+        self._block: List[bytes] = []
+        self._block_size = 0
+        self._block_first: Optional[float] = None
+        self._block_raw_start = 0
+        self._ts = fallback_ts
+    
+    def feed(self, data: bytes):
+        data = self._partial + data
+        last_newline = data.rfind(b"\n")
+        if last_newline == -1:
+            self._partial = data
+            return
+        self._partial = data[last_newline + 1:]
+        for raw in data[:last_newline + 1].splitlines(keepends=True):
+            self._add_line(raw)
+    
+    def _add_line(self, raw: bytes):
+        # Lines without a timestamp inherit the previous line's
+        ts = parse_line_ts(raw)
+        if ts is not None:
+            self._ts = ts
+        if self._block_first is None:
+            self._block_first = self._ts
+            self._block_raw_start = self.raw_bytes
+        
+        self._block.append(raw)
+        self._block_size += len(raw)
+        self.lines += 1
+        self.raw_bytes += len(raw)
+        if self._block_size >= self.block_bytes:
+            self._flush_block()
+    
+    def _flush_block(self):
+        if not self._block:
+            return
+        member = gzip.compress(b"".join(self._block), mtime=0)
+        offset = self._handle.tell()
+        self._handle.write(member)
+        self.blocks.append([
+            self._block_first, self._ts, offset, len(member), len(self._block), self._block_raw_start
+        ])
+        self._block = []
+        self._block_size = 0
+        self._block_first = None
+    
+    @property
+    def sealed_bytes(self) -> int:
+        """Uncompressed size once finished (a trailing partial line gains a newline)"""
+        return self.raw_bytes + len(self._partial) + (1 if self._partial else 0)
+    
+    def finish(self, raw_start: int) -> Dict:
+        """Write the last block, move the segment into place and return its index"""
+        if self._partial:
+            self._add_line(self._partial + b"\n")
+            self._partial = b""
+        self._flush_block()
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self._handle.close()
+        os.replace(self.tmp_path, self.path)
+        
+        return {
+            "first_ts": self.blocks[0][0] if self.blocks else None,
+            "last_ts": self.blocks[-1][1] if self.blocks else None,
+            "lines": self.lines,
+            "raw_bytes": self.raw_bytes,
+            "raw_start": raw_start,
+            "size": os.path.getsize(self.path),
+            "rotated_at": time.time(),
+            "blocks": self.blocks
+        }
+    
+    def abort(self):
+        self._handle.close()
+        try:
+            self.tmp_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class LogRotator:
+    """
+    Rotates the OpenClaw log once it exceeds `max_bytes`.
+    
+    OpenClaw holds the log open in append mode, so rotation copies the
+    file into a sealed segment and truncates it in place. The bulk copy
+    runs without locks; only the bytes appended during the copy are read
+    while the log follower is paused, so it can drain first and restart
+    at offset 0 afterwards without losing lines.
+    
+    Each segment keeps an index of block time ranges and byte offsets,
+    so a time-range query decompresses only the blocks that overlap it.
+    Segments past `retention_days` or beyond `max_archive_bytes` in total
+    are pruned oldest first.
+    
+    Every byte ever written to the log has a stable global position:
+    archived segments record where their raw bytes start, and the live
+    file begins at `live_base`. `read_line` resolves a position wherever
+    the line now lives.
+    """
+    
+    def __init__(
+        self,
+        log_file: Path = OPENCLAW_LOG_FILE,
+        archive_dir: Path = OPENCLAW_ARCHIVE_DIR,
+        max_bytes: int = 64 * 1024 * 1024,
+        retention_days: float = 7,
+        max_archive_bytes: int = 1024 * 1024 * 1024,
+        block_bytes: int = 256 * 1024,
+        check_interval: float = 10.0,
+        follower: Optional[LogFollower] = None
+    ):
+        self.log_file = Path(log_file)
+        self.archive_dir = Path(archive_dir)
+        self.max_bytes = max_bytes
+        self.retention_days = retention_days
+        self.max_archive_bytes = max_archive_bytes
+        self.block_bytes = block_bytes
+        self.check_interval = check_interval
+        self.follower = follower
+        
+        self._lock = threading.Lock()
+        self._segments: List[Tuple[int, Dict]] = []
+        self._block_cache: Tuple = (None, b"")
+        self.live_base = 0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.rotations = 0
+        self._load()
+    
+    def _segment_path(self, seq: int) -> Path:
+        return self.archive_dir / f"segment-{seq:08d}.log.gz"
+    
+    def _index_path(self, seq: int) -> Path:
+        return self.archive_dir / f"segment-{seq:08d}.idx.json"
+    
+    def _load(self):
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        for path in sorted(self.archive_dir.glob("segment-*.log.gz")):
+            seq = int(path.name.split("-")[1].split(".")[0])
+            try:
+                with open(self._index_path(seq), 'r') as f:
+                    index = json.load(f)
+            except (OSError, ValueError):
+                index = self._rebuild_index(path, self.live_base)
+                self._write_index(seq, index)
+            self._segments.append((seq, index))
+            self.live_base = index.get("raw_start", self.live_base) + index["raw_bytes"]
+    
+    def _rebuild_index(self, path: Path, raw_start: int) -> Dict:
+        """Recover a lost index by walking the gzip members of a segment"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        
+        blocks = []
+        lines = 0
+        raw_bytes = 0
+        offset = 0
+        ts = 0.0
+        while offset < len(data):
+            decompressor = zlib.decompressobj(wbits=31)
+            block = decompressor.decompress(data[offset:]) + decompressor.flush()
+            length = len(data) - offset - len(decompressor.unused_data)
+            
+            first = None
+            count = 0
+            for raw in block.splitlines():
+                ts = parse_line_ts(raw) or ts
+                first = ts if first is None else first
+                count += 1
+            blocks.append([first if first is not None else ts, ts, offset, length, count, raw_bytes])
+            lines += count
+            raw_bytes += len(block)
+            offset += length
+        
+        return {
+            "first_ts": blocks[0][0] if blocks else None,
+            "last_ts": blocks[-1][1] if blocks else None,
+            "lines": lines,
+            "raw_bytes": raw_bytes,
+            "raw_start": raw_start,
+            "size": len(data),
+            "rotated_at": os.path.getmtime(path),
+            "blocks": blocks
+        }
+    
+    def _write_index(self, seq: int, index: Dict):
+        try:
+            tmp_path = self._index_path(seq).with_suffix(".tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump(index, f)
+            os.replace(tmp_path, self._index_path(seq))
+        except Exception as e:
+            print(f"Error writing log segment index: {e}")
+    
+    def _last_ts(self) -> float:
+        if self._segments and self._segments[-1][1].get("last_ts") is not None:
+            return self._segments[-1][1]["last_ts"]
+        return 0.0
+    
+    def rotate(self, force: bool = False) -> bool:
+        """Seal the current log into a segment if it is over the size limit"""
+        with self._lock:
+            try:
+                size = os.path.getsize(self.log_file)
+            except FileNotFoundError:
+                return False
+            if size == 0 or (size < self.max_bytes and not force):
+                return False
+            
+            seq = self._segments[-1][0] + 1 if self._segments else 1
+            writer = _SegmentWriter(self._segment_path(seq), self._last_ts(), self.block_bytes)
+            try:
+                with open(self.log_file, 'rb') as f:
+                    copied = 0
+                    while copied < size:
+                        chunk = f.read(min(1024 * 1024, size - copied))
+                        if not chunk:
+                            break
+                        writer.feed(chunk)
+                        copied += len(chunk)
+                    
+                    raw_start = self.live_base
+                    if self.follower is not None:
+                        with self.follower.truncating():
+                            writer.feed(f.read())
+                            os.truncate(self.log_file, 0)
+                            self.live_base = raw_start + writer.sealed_bytes
+                    else:
+                        writer.feed(f.read())
+                        os.truncate(self.log_file, 0)
+                        self.live_base = raw_start + writer.sealed_bytes
+                
+                index = writer.finish(raw_start)
+            except Exception as e:
+                writer.abort()
+                print(f"Error rotating {self.log_file}: {e}")
+                return False
+            
+            self._write_index(seq, index)
+            self._segments.append((seq, index))
+            self.rotations += 1
+            self._prune()
+            return True
+    
+    def _prune(self):
+        cutoff = time.time() - self.retention_days * 86400
+        total = sum(index["size"] for _, index in self._segments)
+        
+        while self._segments:
+            seq, index = self._segments[0]
+            expired = index.get("rotated_at", 0) < cutoff
+            if not expired and total <= self.max_archive_bytes:
+                break
+            
+            self._segments.pop(0)
+            total -= index["size"]
+            for path in (self._segment_path(seq), self._index_path(seq)):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+    
+    def query(self, start: datetime, end: datetime, limit: int = 1000) -> Tuple[List[str], int]:
+        """
+        Lines timestamped within [start, end], oldest first, and the number
+        of segment blocks that had to be decompressed.
+        """
+        start_ts = start.timestamp()
+        end_ts = end.timestamp()
+        
+        with self._lock:
+            segments = list(self._segments)
+            fallback = self._last_ts()
+        
+        lines: List[str] = []
+        blocks_read = 0
+        for seq, index in segments:
+            if index.get("first_ts") is None or index["last_ts"] < start_ts or index["first_ts"] > end_ts:
+                continue
+            
+            blocks = index["blocks"]
+            first = bisect_left([block[1] for block in blocks], start_ts)
+            with open(self._segment_path(seq), 'rb') as f:
+                for block_first, block_last, offset, length, *_ in blocks[first:]:
+                    if block_first > end_ts:
+                        return lines, blocks_read
+                    f.seek(offset)
+                    data = gzip.decompress(f.read(length))
+                    blocks_read += 1
+                    if self._collect(data, block_first, start_ts, end_ts, lines, limit):
+                        return lines, blocks_read
+        
+        # The live log is bounded by max_bytes, so scanning it is cheap
+        try:
+            with open(self.log_file, 'rb') as f:
+                self._collect(f.read(), fallback, start_ts, end_ts, lines, limit)
+        except FileNotFoundError:
+            pass
+        return lines, blocks_read
+    
+    def oldest_position(self) -> int:
+        """Global position of the oldest byte still available"""
+        with self._lock:
+            if self._segments:
+                return self._segments[0][1].get("raw_start", 0)
+            return self.live_base
+    
+    def read_line(self, position: int) -> Optional[str]:
+        """The line starting at a global position, from the live log or a segment"""
+        with self._lock:
+            live_base = self.live_base
+            segments = list(self._segments)
+        
+        if position >= live_base:
+            try:
+                with open(self.log_file, 'rb') as f:
+                    f.seek(position - live_base)
+                    raw = f.readline()
+            except FileNotFoundError:
+                return None
+            return raw.rstrip(b"\r\n").decode("utf-8", errors="replace") if raw else None
+        
+        starts = [index.get("raw_start", 0) for _, index in segments]
+        slot = bisect_left(starts, position + 1) - 1
+        if slot < 0:
+            return None
+        seq, index = segments[slot]
+        relative = position - starts[slot]
+        if relative >= index["raw_bytes"]:
+            return None
+        
+        blocks = index["blocks"]
+        block_slot = bisect_left([block[5] for block in blocks], relative + 1) - 1
+        block = blocks[block_slot]
+        
+        key = (seq, block_slot)
+        if self._block_cache[0] == key:
+            data = self._block_cache[1]
+        else:
+            with open(self._segment_path(seq), 'rb') as f:
+                f.seek(block[2])
+                data = gzip.decompress(f.read(block[3]))
+            self._block_cache = (key, data)
+        
+        start = relative - block[5]
+        end = data.find(b"\n", start)
+        return data[start:end if end != -1 else len(data)].decode("utf-8", errors="replace")
+    
+    def _collect(self, data: bytes, ts: float, start_ts: float, end_ts: float,
+                 lines: List[str], limit: int) -> bool:
+        """Append lines in range to `lines`; True once the limit is reached or the range is passed"""
+        for raw in data.splitlines():
+            ts = parse_line_ts(raw) or ts
+            if ts > end_ts:
+                return True
+            if ts >= start_ts:
+                lines.append(raw.decode("utf-8", errors="replace"))
+                if len(lines) >= limit:
+                    return True
+        return False
+    
+    def _run(self):
+        while not self._stop_event.wait(self.check_interval):
+            try:
+                self.rotate()
+            except Exception as e:
+                print(f"Error in log rotator: {e}")
+    
+    def start(self):
+        """Check the log size periodically in a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="log-rotator", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "segments": len(self._segments),
+                "archived_lines": sum(index["lines"] for _, index in self._segments),
+                "archived_bytes": sum(index["size"] for _, index in self._segments),
+                "raw_bytes": sum(index["raw_bytes"] for _, index in self._segments),
+                "rotations": self.rotations
+            }
+
+
+log_rotator = LogRotator(
+    max_bytes=int(config.openclaw_log_max_mb * 1024 * 1024),
+    retention_days=config.openclaw_log_retention_days,
+    max_archive_bytes=int(config.openclaw_log_archive_max_mb * 1024 * 1024),
+    follower=log_follower
+)
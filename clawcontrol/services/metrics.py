@@ -2,27 +2,56 @@
 Metrics System - CPU, RAM, Thread tracking
 """
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Optional
 from collections import deque
 import psutil
+import threading
 import time
+from clawcontrol.core.config import config
 
 class MetricsCollector:
-    def __init__(self, history_size: int = 300):
+    """
+    Samples CPU, memory and thread count from a background thread every
+    `sample_interval` seconds into the history buffers.
+    
+    Sampling never sleeps: CPU usage is measured since the previous sample
+    (`cpu_percent(interval=None)`), memory is read once and the thread
+    count comes from `num_threads()`. Readers get the latest sample
+    without touching psutil. The time spent sampling is tracked so the
+    sampler's own overhead can be reported.
+    """
+    
+    def __init__(self, history_size: int = 300, sample_interval: float = 1.0):
         self.history_size = history_size  # 5 minutes at 1s intervals
+        self.sample_interval = sample_interval
         self.cpu_history = deque(maxlen=history_size)
         self.memory_history = deque(maxlen=history_size)
         self.thread_history = deque(maxlen=history_size)
         self.last_collection = None
+        self.latest: Optional[Dict] = None
+        
+        self._process = psutil.Process()
+        # The first interval=None reading is meaningless; prime the counter
+        psutil.cpu_percent(interval=None)
+        
+        self.samples = 0
+        self.sample_time_total = 0.0
+        self.sample_time_max = 0.0
+        self.last_sample_ms = 0.0
+        
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
     
-    def collect_system_metrics(self) -> Dict:
-        """Collect current system metrics."""
+    def sample(self) -> Dict:
+        """Take one sample and append it to the history."""
+        started = time.perf_counter()
+        memory = psutil.virtual_memory()
         metrics = {
             "timestamp": datetime.now().isoformat(),
-            "cpu_percent": psutil.cpu_percent(interval=0.1),
-            "memory_mb": psutil.virtual_memory().used / (1024 * 1024),
-            "memory_percent": psutil.virtual_memory().percent,
-            "thread_count": len(psutil.Process().threads())
+            "cpu_percent": psutil.cpu_percent(interval=None),
+            "memory_mb": memory.used / (1024 * 1024),
+            "memory_percent": memory.percent,
+            "thread_count": self._process.num_threads()
         }
         
         # Add to history
@@ -30,34 +59,77 @@ class MetricsCollector:
         self.memory_history.append(metrics["memory_mb"])
         self.thread_history.append(metrics["thread_count"])
         
+        self.latest = metrics
         self.last_collection = datetime.now()
         
+        elapsed = time.perf_counter() - started
+        self.samples += 1
+        self.sample_time_total += elapsed
+        self.sample_time_max = max(self.sample_time_max, elapsed)
+        self.last_sample_ms = elapsed * 1000
+        
         return metrics
     
+    def collect_system_metrics(self) -> Dict:
+        """Latest system metrics; samples now only if the sampler has not run yet."""
+        if self.latest is not None and self._thread is not None:
+            return self.latest
+        return self.sample()
+    
+    def _run(self):
+        while not self._stop_event.wait(self.sample_interval):
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"Error sampling metrics: {e}")
+    
+    def start(self):
+        """Sample periodically in a background thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self.sample()
+        self._thread = threading.Thread(target=self._run, name="metrics-sampler", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+    
+    def sampler_stats(self) -> Dict:
+        """Cost of sampling itself."""
+        avg = self.sample_time_total / self.samples if self.samples else 0.0
+        return {
+            "running": self._thread is not None,
+            "interval": self.sample_interval,
+            "samples": self.samples,
+            "last_ms": round(self.last_sample_ms, 3),
+            "avg_ms": round(avg * 1000, 3),
+            "max_ms": round(self.sample_time_max * 1000, 3),
+            "overhead_percent": round(avg / self.sample_interval * 100, 4) if self.sample_interval > 0 else 0.0
+        }
+    
     def get_stats(self) -> Dict:
         """Get statistical analysis of metrics."""
-        if not self.cpu_history:
+        # Copy first; the sampler thread keeps appending
+        histories = {
+            "cpu": list(self.cpu_history),
+            "memory_mb": list(self.memory_history),
+            "threads": list(self.thread_history)
+        }
+        if not histories["cpu"]:
             return {}
         
         return {
-            "cpu": {
-                "current": self.cpu_history[-1] if self.cpu_history else 0,
-                "min": min(self.cpu_history),
-                "max": max(self.cpu_history),
-                "avg": sum(self.cpu_history) / len(self.cpu_history)
-            },
-            "memory_mb": {
-                "current": self.memory_history[-1] if self.memory_history else 0,
-                "min": min(self.memory_history),
-                "max": max(self.memory_history),
-                "avg": sum(self.memory_history) / len(self.memory_history)
-            },
-            "threads": {
-                "current": self.thread_history[-1] if self.thread_history else 0,
-                "min": min(self.thread_history),
-                "max": max(self.thread_history),
-                "avg": sum(self.thread_history) / len(self.thread_history)
+            name: {
+                "current": history[-1],
+                "min": min(history),
+                "max": max(history),
+                "avg": sum(history) / len(history)
             }
+            for name, history in histories.items()
         }
     
     def get_history(self, metric: str = "cpu", limit: int = 60) -> List[float]:
@@ -71,4 +143,4 @@ class MetricsCollector:
         history = histories.get(metric, self.cpu_history)
         return list(history)[-limit:]
 
-metrics_collector = MetricsCollector()
+metrics_collector = MetricsCollector(sample_interval=config.metrics_sample_interval or 1.0)
@@ -1,22 +1,81 @@
 """
 OpenClaw Adapter - Non-destructive wrapper
 """
+import asyncio
+import os
+import queue
 import subprocess
+import threading
+import time
 import psutil
 from datetime import datetime
-from typing import Optional, List
+from typing import Callable, Optional, List, Tuple
+from clawcontrol.core.config import config
 from clawcontrol.core.constants import OPENCLAW_LOG_FILE
 from clawcontrol.api.models import OpenClawStatus
+from clawcontrol.services.log_follower import log_follower
+from clawcontrol.services.log_ring_buffer import LogRingBuffer
+
+
+TAIL_BLOCK_SIZE = 64 * 1024
+READ_SINCE_MAX_BYTES = 1024 * 1024
+CAPTURE_READ_SIZE = 64 * 1024
+MAX_RESTART_DELAY = 30.0
+
+RESTART_NEVER = "never"
+RESTART_ON_FAILURE = "on-failure"
+RESTART_ALWAYS = "always"
+RESTART_POLICIES = (RESTART_NEVER, RESTART_ON_FAILURE, RESTART_ALWAYS)
+
+ExitListener = Callable[[Optional[int]], None]
 
 
 class OpenClawAdapter:
-    """Non-intrusive, mockable wrapper around OpenClaw"""
+    """
+    Non-intrusive, mockable wrapper around OpenClaw
+    
+    `start`/`stop` manage a blocking subprocess.Popen. The API uses
+    `astart`/`astop` instead, built on asyncio subprocesses: stopping
+    waits for the exit without blocking the event loop (escalating to
+    SIGKILL), the exit code is captured as soon as the child exits, and
+    a restart policy can bring OpenClaw back up with backoff.
+    
+    In capture mode the asyncio child's stdout is a pipe read by the
+    adapter: lines go into an in-memory ring buffer that serves `logs()`,
+    and a capture thread appends them to disk and hands them to the log
+    follower's handlers (guardrails evaluation, streaming, indexing).
+    """
     
     def __init__(self):
         self.process: Optional[subprocess.Popen] = None
         self.pid: Optional[int] = None
         self.log_file = OPENCLAW_LOG_FILE
         self.log_file.parent.mkdir(parents=True, exist_ok=True)
+        
+        self.restart_policy = config.openclaw_restart_policy
+        self.max_restarts = config.openclaw_max_restarts
+        self.restart_backoff = config.openclaw_restart_backoff
+        self.returncode: Optional[int] = None
+        self.restarts = 0
+        self.exit_listeners: List[ExitListener] = []
+        
+        self.capture_mode = config.openclaw_capture_mode
+        self.buffer = LogRingBuffer(int(config.openclaw_capture_buffer_mb * 1024 * 1024))
+        self.follower = log_follower
+        self.lines_captured = 0
+        self.last_capture_latency_ms: Optional[float] = None
+        
+        self._aprocess: Optional[asyncio.subprocess.Process] = None
+        self._psutil_process: Optional[psutil.Process] = None
+        self._watcher: Optional[asyncio.Task] = None
+        self._capture_task: Optional[asyncio.Task] = None
+        self._openclaw_path = "openclaw"
+        self._stopping = False
+        self._restart_pending = False
+    
+    def add_exit_listener(self, listener: ExitListener):
+        """Register a callback receiving the exit code whenever OpenClaw exits"""
+        self.exit_listeners.append(listener)
     
     def start(self, openclaw_path: str = "openclaw") -> OpenClawStatus:
         """Start OpenClaw process (non-destructive)"""
@@ -70,6 +129,208 @@ class OpenClawAdapter:
         except Exception as e:
             raise RuntimeError(f"Failed to stop OpenClaw: {str(e)}")
     
+    async def astart(self, openclaw_path: str = "openclaw", restart_policy: Optional[str] = None) -> OpenClawStatus:
+        """Start OpenClaw as an asyncio subprocess (non-destructive)"""
+        if self.is_running():
+            return self.status()
+        
+        if restart_policy is not None:
+            if restart_policy not in RESTART_POLICIES:
+                raise ValueError(f"Invalid restart policy: {restart_policy} (expected one of {RESTART_POLICIES})")
+            self.restart_policy = restart_policy
+        
+        # A previous run may still be draining output or waiting to restart
+        await self._end_watch()
+        
+        self._openclaw_path = openclaw_path
+        self._stopping = False
+        self.restarts = 0
+        await self._spawn()
+        return self.status()
+    
+    async def _spawn(self):
+        try:
+            if self.capture_mode:
+                process = await asyncio.create_subprocess_exec(
+                    self._openclaw_path,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    stdin=subprocess.PIPE
+                )
+            else:
+                with open(self.log_file, 'a') as log_handle:
+                    process = await asyncio.create_subprocess_exec(
+                        self._openclaw_path,
+                        stdout=log_handle,
+                        stderr=subprocess.STDOUT,
+                        stdin=subprocess.PIPE
+                    )
+        except FileNotFoundError:
+            raise FileNotFoundError(f"OpenClaw executable not found: {self._openclaw_path}")
+        except Exception as e:
+            raise RuntimeError(f"Failed to start OpenClaw: {str(e)}")
+        
+        self._aprocess = process
+        self.pid = process.pid
+        self.returncode = None
+        if self.capture_mode:
+            self._capture_task = asyncio.create_task(self._capture(process))
+        self._watcher = asyncio.create_task(self._watch(process))
+    
+    async def _capture(self, process: asyncio.subprocess.Process):
+        """Read the child's output pipe until EOF and hand lines to the capture thread"""
+        pending: queue.Queue = queue.Queue()
+        worker = threading.Thread(target=self._capture_worker, args=(pending,), name="openclaw-capture", daemon=True)
+        worker.start()
+        partial = b""
+        
+        try:
+            while True:
+                chunk = await process.stdout.read(CAPTURE_READ_SIZE)
+                if not chunk:
+                    break
+                received = time.perf_counter()
+                
+                data = partial + chunk
+                last_newline = data.rfind(b"\n")
+                if last_newline == -1:
+                    partial = data
+                    continue
+                partial = data[last_newline + 1:]
+                self._queue_lines(pending, data[:last_newline].split(b"\n"), received)
+            
+            if partial:
+                self._queue_lines(pending, [partial], time.perf_counter())
+        except Exception as e:
+            print(f"Error capturing OpenClaw output: {e}")
+        finally:
+            pending.put(None)
+            await asyncio.to_thread(worker.join)
+    
+    def _queue_lines(self, pending: queue.Queue, raw_lines: List[bytes], received: float):
+        lines = [raw.rstrip(b"\r").decode("utf-8", errors="replace") for raw in raw_lines]
+        self.buffer.extend([line + "\n" for line in lines])
+        self.lines_captured += len(lines)
+        pending.put((lines, received))
+    
+    def _capture_worker(self, pending: queue.Queue):
+        """
+        Append captured lines to the log and dispatch them to the follower's
+        handlers, off the event loop.
+        
+        Each batch is written and dispatched while the follower holds off
+        rotation, with offsets taken from the file's actual size, so they
+        stay correct after the rotator truncates the log.
+        """
+        with open(self.log_file, 'ab') as log_handle:
+            done = False
+            while not done:
+                batches = [pending.get()]
+                while True:
+                    try:
+                        batches.append(pending.get_nowait())
+                    except queue.Empty:
+                        break
+                if batches[-1] is None:
+                    batches.pop()
+                    done = True
+                if not batches:
+                    continue
+                
+                lines = [line for batch_lines, _ in batches for line in batch_lines]
+                encoded = [(line + "\n").encode("utf-8") for line in lines]
+                try:
+                    with self.follower.appending():
+                        offset = os.fstat(log_handle.fileno()).st_size
+                        log_handle.write(b"".join(encoded))
+                        log_handle.flush()
+                        
+                        offsets = []
+                        for raw in encoded:
+                            offsets.append(offset)
+                            offset += len(raw)
+                        self.follower.dispatch(lines, offsets)
+                except Exception as e:
+                    print(f"Error writing captured OpenClaw output: {e}")
+                self.last_capture_latency_ms = (time.perf_counter() - batches[0][1]) * 1000
+    
+    async def _watch(self, process: asyncio.subprocess.Process):
+        """Capture the exit code, notify listeners and apply the restart policy"""
+        returncode = await process.wait()
+        if self._capture_task is not None:
+            # Drain remaining output before reporting the exit
+            await self._capture_task
+            self._capture_task = None
+        self.returncode = returncode
+        
+        for listener in self.exit_listeners:
+            try:
+                listener(returncode)
+            except Exception as e:
+                print(f"Error in OpenClaw exit listener: {e}")
+        
+        if self._stopping or not self._should_restart(returncode):
+            return
+        
+        delay = min(self.restart_backoff * 2 ** self.restarts, MAX_RESTART_DELAY)
+        self.restarts += 1
+        self._restart_pending = True
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self._restart_pending = False
+        if self._stopping or self._watcher is not asyncio.current_task():
+            return
+        
+        try:
+            await self._spawn()
+        except Exception as e:
+            print(f"Error restarting OpenClaw: {e}")
+    
+    async def _end_watch(self):
+        """Wait for the watcher to report the exit, cancelling a pending restart"""
+        self._stopping = True
+        watcher = self._watcher
+        if watcher is not None and not watcher.done():
+            if self._restart_pending:
+                watcher.cancel()
+            await asyncio.wait([watcher])
+        self._watcher = None
+    
+    def _should_restart(self, returncode: int) -> bool:
+        if self.restarts >= self.max_restarts:
+            return False
+        if self.restart_policy == RESTART_ALWAYS:
+            return True
+        return self.restart_policy == RESTART_ON_FAILURE and returncode != 0
+    
+    async def astop(self, timeout: float = 5.0) -> OpenClawStatus:
+        """Stop OpenClaw gracefully without blocking the event loop"""
+        if self.process is not None:
+            return await asyncio.to_thread(self.stop)
+        
+        self._stopping = True
+        process = self._aprocess
+        if process is not None and process.returncode is None:
+            try:
+                process.terminate()
+                try:
+                    await asyncio.wait_for(process.wait(), timeout)
+                except asyncio.TimeoutError:
+                    process.kill()
+                    await process.wait()
+            except ProcessLookupError:
+                pass
+            except Exception as e:
+                raise RuntimeError(f"Failed to stop OpenClaw: {str(e)}")
+        
+        # Let the watcher record the exit code and notify listeners
+        await self._end_watch()
+        
+        self._aprocess = None
+        self.pid = None
+        return self.status()
+    
     def status(self) -> OpenClawStatus:
         """Get current OpenClaw status"""
         running = self.is_running()
@@ -77,32 +338,109 @@ class OpenClawAdapter:
         return OpenClawStatus(
             running=running,
             pid=self.pid if running else None,
-            last_seen=datetime.now() if running else None
+            last_seen=datetime.now() if running else None,
+            exit_code=None if running else self.returncode,
+            restarts=self.restarts
         )
     
     def is_running(self) -> bool:
         """Check if OpenClaw process is running"""
+        if self._aprocess is not None:
+            return self._aprocess.returncode is None
+        
         if self.process is None or self.pid is None:
             return False
         
         try:
-            process = psutil.Process(self.pid)
-            return process.is_running()
+            # psutil.Process checks the create time, so caching it is safe against pid reuse
+            if self._psutil_process is None or self._psutil_process.pid != self.pid:
+                self._psutil_process = psutil.Process(self.pid)
+            return self._psutil_process.is_running()
         except (psutil.NoSuchProcess, psutil.AccessDenied):
             return False
     
     def logs(self, tail: int = 100) -> List[str]:
         """Get last N lines from OpenClaw log (read-only)"""
+        return self.tail(tail)[0]
+    
+    def capture_stats(self) -> dict:
+        """Pipe capture counters and ring buffer usage"""
+        return {
+            "enabled": self.capture_mode,
+            "lines_captured": self.lines_captured,
+            "last_latency_ms": self.last_capture_latency_ms,
+            "buffer": self.buffer.stats()
+        }
+    
+    def tail(self, count: int = 100) -> Tuple[List[str], int]:
+        """
+        Last `count` lines plus the offset just past the last complete line.
+        
+        Reads backwards from the end in blocks, so the cost depends on the
+        lines returned rather than the size of the log. A trailing partial
+        line is included; reading from the returned offset yields it again
+        once it is complete.
+        
+        In capture mode the lines come from the in-memory ring buffer and
+        the offset is the current size on disk; lines still queued for
+        the writer may be returned again by a later `read_since`.
+        """
+        if self.capture_mode and len(self.buffer):
+            size = os.path.getsize(self.log_file) if self.log_file.exists() else 0
+            return self.buffer.tail(count), size
+        
         if not self.log_file.exists():
-            return []
+            return [], 0
         
         try:
-            with open(self.log_file, 'r') as f:
-                lines = f.readlines()
-                return lines[-tail:] if len(lines) > tail else lines
+            with open(self.log_file, 'rb') as f:
+                end = f.seek(0, os.SEEK_END)
+                position = end
+                data = b""
+                
+                # One newline more than requested marks the start of the first line
+                while position > 0 and data.count(b"\n") <= count:
+                    step = min(TAIL_BLOCK_SIZE, position)
+                    position -= step
+                    f.seek(position)
+                    data = f.read(step) + data
+            
+            complete_end = position + data.rfind(b"\n") + 1 if b"\n" in data else position
+            lines = data.decode('utf-8', errors='replace').splitlines(keepends=True)
+            if position > 0:
+                lines = lines[1:]
+            return lines[-count:], complete_end
         except Exception as e:
             print(f"Error reading logs: {e}")
-            return []
-
+            return [], 0
+    
+    def read_since(self, offset: int, max_bytes: int = READ_SINCE_MAX_BYTES) -> Tuple[List[str], int]:
+        """
+        Complete lines appended after byte `offset` and the offset to resume from.
+        
+        At most `max_bytes` are read per call. An offset past the end of the
+        file means it was truncated or rotated, and reading restarts at 0.
+        """
+        if not self.log_file.exists():
+            return [], 0
+        
+        try:
+            with open(self.log_file, 'rb') as f:
+                size = f.seek(0, os.SEEK_END)
+                if offset > size:
+                    offset = 0
+                f.seek(offset)
+                data = f.read(min(max_bytes, size - offset))
+        except Exception as e:
+            print(f"Error reading logs: {e}")
+            return [], offset
+        
+        end = data.rfind(b"\n") + 1
+        if end == 0 and len(data) >= max_bytes:
+            # A single line longer than max_bytes: hand it out in pieces
+            end = len(data)
+        
+        lines = data[:end].decode('utf-8', errors='replace').splitlines(keepends=True)
+        return lines, offset + end
 
 openclaw_adapter = OpenClawAdapter()
@@ -0,0 +1,60 @@
+"""
+Path Trie - Allowed-path prefix matching for guardrail rules
+"""
+import posixpath
+import re
+from typing import Dict, List
+
+# Absolute paths not glued to a word, URL scheme or another path
+PATH_PATTERN = re.compile(r"(?<![\w:/.~-])/[^\s'\"`;|&<>(){}\[\],]+")
+# Sentence punctuation after a file name, but not `.`/`..` components
+TRAILING_PUNCTUATION = re.compile(r"(?<=[^/.])[.:]+$")
+
+
+def normalize_path(path: str) -> str:
+    """Collapse `..`, `.` and duplicate slashes so prefixes cannot be escaped"""
+    return posixpath.normpath(TRAILING_PUNCTUATION.sub("", path))
+
+
+def extract_paths(log_line: str) -> List[str]:
+    """Find absolute file paths mentioned in a log line; a bare `/` is not one"""
+    if "/" not in log_line:
+        return []
+    # `//`, `/.` and `/..` name no segment either
+    return [normalize_path(match) for match in PATH_PATTERN.findall(log_line) if match.strip("/.")]
+
+
+class PathPrefixTrie:
+    """
+    Trie over path components. Every allowed prefix marks its node with a
+    rule bit, so a lookup walks the path once and collects the bits of all
+    rules that allow it, independent of how many prefixes are registered.
+    """
+    
+    def __init__(self):
+        self._root: List = [{}, 0]
+    
+    def add(self, prefix: str, rule_bit: int):
+        """Allow everything under `prefix` for the rule owning `rule_bit`"""
+        node = self._root
+        for part in normalize_path(prefix).split("/"):
+            if not part:
+                continue
+            children: Dict = node[0]
+            if part not in children:
+                children[part] = [{}, 0]
+            node = children[part]
+        node[1] |= rule_bit
+    
+    def allowed_mask(self, path: str) -> int:
+        """Bitmask of rules with an allowed prefix covering `path`"""
+        node = self._root
+        mask = node[1]
+        for part in path.split("/"):
+            if not part:
+                continue
+            node = node[0].get(part)
+            if node is None:
+                break
+            mask |= node[1]
+        return mask
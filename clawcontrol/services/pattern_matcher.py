@@ -0,0 +1,129 @@
+"""
+Pattern Matcher - Case-insensitive multi-pattern automaton (Aho-Corasick)
+"""
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+
+
+class PatternMatcher:
+    """
+    Compiles many substring patterns into a single automaton so a line
+    is scanned once, regardless of how many patterns are registered.
+    
+    Every pattern carries an integer priority. `first_match` returns the
+    lowest priority among all patterns found in the text, which lets the
+    caller reproduce "first rule, first pattern" semantics of a nested loop;
+    `all_matches` returns the priorities of every pattern found.
+    """
+    
+    def __init__(self, patterns: Optional[List[Tuple[str, int]]] = None):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._best: List[Optional[int]] = [None]
+        self._outputs: List[Tuple[int, ...]] = [()]
+        self._compiled = False
+        self.pattern_count = 0
+        
+        for pattern, priority in patterns or []:
+            self.add(pattern, priority)
+        self.compile()
+    
+    def add(self, pattern: str, priority: int) -> None:
+        """Register a pattern (matched case-insensitively)"""
+        state = 0
+        for char in pattern.lower():
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._best.append(None)
+                self._outputs.append(())
+            state = next_state
+        
+        current = self._best[state]
+        if current is None or priority < current:
+            self._best[state] = priority
+        if priority not in self._outputs[state]:
+            self._outputs[state] += (priority,)
+        
+        self.pattern_count += 1
+        self._compiled = False
+    
+    def compile(self) -> None:
+        """Build failure links and propagate outputs along them"""
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+        
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                
+                inherited = self._best[self._fail[next_state]]
+                own = self._best[next_state]
+                if inherited is not None and (own is None or inherited < own):
+                    self._best[next_state] = inherited
+                
+                extra = [p for p in self._outputs[self._fail[next_state]] if p not in self._outputs[next_state]]
+                if extra:
+                    self._outputs[next_state] += tuple(extra)
+        
+        self._compiled = True
+    
+    def first_match(self, text: str) -> Optional[int]:
+        """Return the lowest priority of any pattern contained in text"""
+        if not self._compiled:
+            self.compile()
+        
+        best = self._best[0]  # Empty patterns match everything
+        if best == 0:
+            return best
+        
+        goto = self._goto
+        fail = self._fail
+        outputs = self._best
+        state = 0
+        
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            
+            found = outputs[state]
+            if found is not None and (best is None or found < best):
+                best = found
+                if best == 0:
+                    break
+        
+        return best
+    
+    def all_matches(self, text: str) -> Set[int]:
+        """Return the priorities of every pattern contained in text"""
+        if not self._compiled:
+            self.compile()
+        
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        found = set(outputs[0])
+        state = 0
+        
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            
+            if outputs[state]:
+                found.update(outputs[state])
+        
+        return found
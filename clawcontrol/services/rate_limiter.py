@@ -0,0 +1,62 @@
+"""
+Rate Limiter - O(1) per-rule token buckets
+"""
+import time
+from typing import Callable, Dict, List, Optional
+
+
+class TokenBucketLimiter:
+    """
+    Token buckets keyed by rule id and optional source (action origin,
+    instance id, ...).
+    
+    Each bucket holds up to `rate_per_min` tokens and refills continuously
+    at `rate_per_min / 60` tokens per second, so a check is constant work
+    no matter how many actions were seen in the last minute.
+    """
+    
+    def __init__(self, clock: Callable[[], float] = time.monotonic, max_buckets: int = 10000):
+        self.clock = clock
+        self.max_buckets = max_buckets
+        self._buckets: Dict[str, Dict[Optional[str], List[float]]] = {}
+        self._bucket_count = 0
+    
+    def acquire(self, rule_id: str, rate_per_min: int, source: Optional[str] = None) -> bool:
+        """Take one token; returns False when the bucket is empty"""
+        now = self.clock()
+        rule_buckets = self._buckets.get(rule_id)
+        if rule_buckets is None:
+            rule_buckets = self._buckets[rule_id] = {}
+        
+        bucket = rule_buckets.get(source)
+        if bucket is None:
+            if self._bucket_count >= self.max_buckets:
+                self._prune(now)
+                rule_buckets = self._buckets.setdefault(rule_id, {})
+            bucket = rule_buckets[source] = [float(rate_per_min), now]
+            self._bucket_count += 1
+        else:
+            elapsed = now - bucket[1]
+            bucket[0] = min(float(rate_per_min), bucket[0] + elapsed * rate_per_min / 60.0)
+            bucket[1] = now
+        
+        if bucket[0] >= 1.0:
+            bucket[0] -= 1.0
+            return True
+        return False
+    
+    def forget(self, rule_id: str):
+        """Drop all buckets of a rule (e.g. after its limit changed)"""
+        rule_buckets = self._buckets.pop(rule_id, None)
+        if rule_buckets:
+            self._bucket_count -= len(rule_buckets)
+    
+    def _prune(self, now: float):
+        """Drop buckets idle for over a minute; they would be full anyway"""
+        for rule_id in list(self._buckets):
+            rule_buckets = self._buckets[rule_id]
+            for source in [s for s, b in rule_buckets.items() if now - b[1] >= 60.0]:
+                del rule_buckets[source]
+                self._bucket_count -= 1
+            if not rule_buckets:
+                del self._buckets[rule_id]
@@ -0,0 +1,139 @@
+"""
+Sequence Rules - Streaming multi-line detection with constant-memory state
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+from clawcontrol.api.models import GuardRule
+
+
+class SequenceTracker:
+    """
+    State machine for one sequence rule.
+    
+    `_starts[k]` holds (line number, time) of the most recent partial match
+    that has completed steps 0..k-1 and is waiting for step k. Keeping only
+    the most recent start per step is enough: a later start always has at
+    least as much window left. Memory is O(steps) however long the log runs.
+    """
+    
+    def __init__(self, rule: GuardRule):
+        self.rule = rule
+        self.steps = len(rule.sequence_patterns)
+        self.window_lines = rule.sequence_window_lines
+        self.window_seconds = rule.sequence_window_seconds
+        self._starts: List[Optional[Tuple[int, float]]] = [None] * (self.steps + 1)
+    
+    @property
+    def signature(self) -> Tuple:
+        return (tuple(self.rule.sequence_patterns), self.window_lines, self.window_seconds)
+    
+    def _expired(self, start: Tuple[int, float], line_no: int, now: float) -> bool:
+        if self.window_lines is not None and line_no - start[0] > self.window_lines:
+            return True
+        if self.window_seconds is not None and now - start[1] > self.window_seconds:
+            return True
+        return False
+    
+    def advance(self, matched_steps: Iterable[int], line_no: int, now: float) -> bool:
+        """Feed the steps matched by one line; returns True when the sequence completes"""
+        starts = self._starts
+        
+        # Highest step first, so one line cannot satisfy two consecutive steps
+        for step in sorted(matched_steps, reverse=True):
+            start = (line_no, now) if step == 0 else starts[step]
+            if start is None:
+                continue
+            if step and self._expired(start, line_no, now):
+                starts[step] = None
+                continue
+            
+            if step == self.steps - 1:
+                self._starts = [None] * (self.steps + 1)
+                return True
+            
+            waiting = starts[step + 1]
+            if waiting is None or start[0] >= waiting[0]:
+                starts[step + 1] = start
+        
+        return False
+
+
+class SequenceStream:
+    """
+    Sequence state for one log stream: a tracker per sequence rule and the
+    stream's own line counter, so steps seen in unrelated streams never
+    combine.
+    """
+    
+    def __init__(self, rules: List[GuardRule], previous: Optional["SequenceStream"] = None):
+        kept = {tracker.rule.id: tracker for tracker in previous.trackers} if previous else {}
+        
+        self.trackers: List[SequenceTracker] = []
+        for rule in rules:
+            tracker = SequenceTracker(rule)
+            old = kept.get(rule.id)
+            if old is not None and old.signature == tracker.signature:
+                old.rule = rule
+                tracker = old
+            self.trackers.append(tracker)
+        
+        self.line_no = previous.line_no if previous else 0
+
+
+class SequenceEngine:
+    """
+    Routes matched sequence steps to their rule's tracker.
+    
+    Step patterns are exposed via `patterns` as (pattern, step_id) so the
+    caller can compile them into the same automaton as block patterns and
+    scan each line once. Tracker state lives in SequenceStreams keyed by
+    source; named streams are carried over when rules are recompiled.
+    """
+    
+    def __init__(self, rules: Iterable[GuardRule]):
+        self.rules: List[GuardRule] = []
+        self._step_owner: List[Tuple[int, int]] = []
+        self.patterns: List[Tuple[str, int]] = []
+        
+        for rule in rules:
+            if rule.rule_type != "sequence" or not rule.sequence_patterns:
+                continue
+            
+            rule_index = len(self.rules)
+            self.rules.append(rule)
+            for step, pattern in enumerate(rule.sequence_patterns):
+                self.patterns.append((pattern, len(self._step_owner)))
+                self._step_owner.append((rule_index, step))
+        
+        self._streams: Dict[str, SequenceStream] = {}
+    
+    def carry_over(self, previous: "SequenceEngine"):
+        """Take over the named streams of the engine this one replaces"""
+        for source, stream in previous._streams.items():
+            self._streams[source] = SequenceStream(self.rules, previous=stream)
+    
+    def stream(self, source: Optional[str] = None) -> SequenceStream:
+        """State for `source`; None gives a fresh stream that is not kept"""
+        if source is None:
+            return SequenceStream(self.rules)
+        stream = self._streams.get(source)
+        if stream is None:
+            stream = self._streams[source] = SequenceStream(self.rules)
+        return stream
+    
+    def feed(self, stream: SequenceStream, matched: Iterable[int], now: float) -> List[GuardRule]:
+        """Advance a stream with the step ids matched by one line; returns completed rules"""
+        stream.line_no += 1
+        if not matched:
+            return []
+        
+        by_tracker = {}
+        for step_id in matched:
+            tracker_index, step = self._step_owner[step_id]
+            by_tracker.setdefault(tracker_index, []).append(step)
+        
+        fired = []
+        for tracker_index, steps in sorted(by_tracker.items()):
+            tracker = stream.trackers[tracker_index]
+            if tracker.advance(steps, stream.line_no, now):
+                fired.append(tracker.rule)
+        return fired
@@ -0,0 +1,151 @@
+"""
+Status Snapshot - Prebuilt /api/status responses kept current by events
+"""
+import threading
+from datetime import datetime
+from typing import List, Optional, Tuple
+from pydantic_core import to_json
+from clawcontrol.core.config import config
+from clawcontrol.api.models import StatusResponse, ViolationEvent
+from clawcontrol.services.guardrails import GuardrailsEngine, guardrails_engine
+from clawcontrol.services.openclaw_adapter import OpenClawAdapter, openclaw_adapter
+
+LAST_SEEN_NULL = b'"last_seen":null'
+
+
+class StatusSnapshot:
+    """
+    Serves status as already-serialized JSON.
+    
+    New violations and OpenClaw exits update the snapshot's fields as
+    they happen; a background refresh re-checks process liveness every
+    `refresh_interval` seconds. Events only bump a change counter, so a
+    burst of violations costs one rebuild on the next read, and reads
+    between changes return the same bytes. The refresh counts as a change
+    only when running, pid, exit_code or restarts differ; otherwise it just
+    splices the new last_seen into the prebuilt bytes.
+    """
+    
+    def __init__(
+        self,
+        adapter: OpenClawAdapter,
+        engine: GuardrailsEngine,
+        refresh_interval: float = 1.0
+    ):
+        self.adapter = adapter
+        self.engine = engine
+        self.refresh_interval = refresh_interval
+        
+        self.last_violation: Optional[ViolationEvent] = None
+        self.violations_total = 0
+        self.openclaw_exits = 0
+        self._openclaw = adapter.status()
+        
+        self._lock = threading.Lock()
+        self._changes = 0
+        self._built = -1
+        self._status_json = b""
+        self._openclaw_json = b""
+        self._status_parts: Tuple[bytes, bytes] = (b"", b"")
+        self._openclaw_parts: Tuple[bytes, bytes] = (b"", b"")
+        
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        
+        engine.add_violation_listener(self._on_violations)
+        adapter.add_exit_listener(self._on_exit)
+    
+    def _on_violations(self, violations: List[ViolationEvent]):
+        with self._lock:
+            self.last_violation = violations[-1]
+            self.violations_total += len(violations)
+            self._changes += 1
+    
+    def _on_exit(self, returncode: Optional[int]):
+        self.openclaw_exits += 1
+        self.refresh()
+    
+    def refresh(self):
+        """Re-check OpenClaw liveness; call after starting or stopping it"""
+        openclaw = self.adapter.status()
+        previous = self._openclaw
+        if (openclaw.running, openclaw.pid, openclaw.exit_code, openclaw.restarts) == (
+            previous.running, previous.pid, previous.exit_code, previous.restarts
+        ):
+            if openclaw.last_seen != previous.last_seen:
+                with self._lock:
+                    self._openclaw = openclaw
+                    if self._built == self._changes:
+                        self._stamp()
+            return
+        with self._lock:
+            self._openclaw = openclaw
+            self._changes += 1
+    
+    def _rebuild(self):
+        """Serialize the current fields, then publish the bytes"""
+        with self._lock:
+            changes = self._changes
+            if self._built == changes:
+                return
+            # last_seen is left out here and spliced in by _stamp
+            openclaw = self._openclaw.model_copy(update={"last_seen": None})
+            openclaw_json = openclaw.model_dump_json().encode("utf-8")
+            status_json = StatusResponse(
+                health="ok",
+                openclaw_status=openclaw,
+                last_violation=self.last_violation,
+                violations_total=self.violations_total,
+                updated_at=datetime.now()
+            ).model_dump_json().encode("utf-8")
+            
+            self._openclaw_parts = openclaw_json.partition(LAST_SEEN_NULL)[::2]
+            self._status_parts = status_json.partition(LAST_SEEN_NULL)[::2]
+            self._stamp()
+            self._built = changes
+    
+    def _stamp(self):
+        """Publish the prebuilt bytes with the current last_seen; call under the lock"""
+        field = b'"last_seen":' + to_json(self._openclaw.last_seen)
+        self._openclaw_json = field.join(self._openclaw_parts)
+        self._status_json = field.join(self._status_parts)
+    
+    def status_json(self) -> bytes:
+        """Serialized StatusResponse"""
+        if self._built != self._changes:
+            self._rebuild()
+        return self._status_json
+    
+    def openclaw_json(self) -> bytes:
+        """Serialized OpenClawStatus"""
+        if self._built != self._changes:
+            self._rebuild()
+        return self._openclaw_json
+    
+    def _run(self):
+        while not self._stop_event.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error refreshing status: {e}")
+    
+    def start(self):
+        """Refresh process liveness periodically in a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="status-refresh", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+status_snapshot = StatusSnapshot(
+    openclaw_adapter,
+    guardrails_engine,
+    refresh_interval=config.status_refresh_interval
+)
@@ -0,0 +1,212 @@
+"""
+Storage - Embedded SQLite persistence shared by alerts, analytics and violations
+"""
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+from clawcontrol.core.config import config
+
+STORAGE_JSON = "json"
+STORAGE_SQLITE = "sqlite"
+STORAGE_BACKENDS = (STORAGE_JSON, STORAGE_SQLITE)
+
+# Schema versions, applied in order and recorded in PRAGMA user_version
+MIGRATIONS: List[str] = [
+    """
+    CREATE TABLE meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+    CREATE TABLE violations (
+        id INTEGER PRIMARY KEY,
+        ts REAL NOT NULL,
+        rule_id TEXT,
+        severity TEXT,
+        entry TEXT NOT NULL
+    );
+    CREATE INDEX violations_ts ON violations (ts, id);
+    CREATE INDEX violations_rule_ts ON violations (rule_id, ts);
+    CREATE TABLE alerts (
+        id INTEGER PRIMARY KEY,
+        ts REAL NOT NULL,
+        level TEXT,
+        read INTEGER NOT NULL DEFAULT 0,
+        alert TEXT NOT NULL
+    );
+    CREATE INDEX alerts_ts ON alerts (ts);
+    CREATE INDEX alerts_level ON alerts (level, id);
+    CREATE TABLE sessions (
+        id INTEGER PRIMARY KEY,
+        ts REAL NOT NULL,
+        duration_seconds REAL NOT NULL,
+        actions INTEGER NOT NULL,
+        violations INTEGER NOT NULL
+    );
+    CREATE INDEX sessions_ts ON sessions (ts);
+    """
+]
+
+_STOP = object()
+
+
+class SQLiteStorage:
+    """
+    One SQLite database in WAL mode.
+    
+    Writes are queued and committed by a background thread, grouping
+    whatever arrives within `flush_interval` (up to `batch_size`
+    statements) into one transaction with executemany, so callers never
+    wait on disk. Reads use their own connection, which WAL lets run
+    alongside the writer. SQL is kept in constant strings so sqlite3's
+    statement cache reuses the prepared statements.
+    """
+    
+    def __init__(self, path: Path, batch_size: int = 1000, flush_interval: float = 0.05):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        
+        self._write_conn = self._connect()
+        self._read_conn = self._connect()
+        self._read_lock = threading.Lock()
+        self._migrate()
+        
+        self.transactions = 0
+        self.rows_written = 0
+        
+        self._queue: queue.Queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+    
+    def _migrate(self):
+        version = self._write_conn.execute("PRAGMA user_version").fetchone()[0]
+        for number, script in enumerate(MIGRATIONS[version:], start=version + 1):
+            with self._write_conn:
+                self._write_conn.executescript(f"BEGIN; {script}; PRAGMA user_version = {number}; COMMIT;")
+    
+    @property
+    def schema_version(self) -> int:
+        return self.query("PRAGMA user_version")[0][0]
+    
+    def write(self, sql: str, rows: Iterable[Sequence]):
+        """Queue a statement for each parameter row"""
+        rows = list(rows)
+        if not rows:
+            return
+        if self._closed:
+            raise RuntimeError(f"Storage {self.path} is closed")
+        self._queue.put((sql, rows))
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything queued so far is committed"""
+        if not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+    
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._write_conn.close()
+        with self._read_lock:
+            self._read_conn.close()
+    
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            pending: List[Tuple[str, list]] = []
+            waiters: List[threading.Event] = []
+            stop = False
+            count = 0
+            deadline = time.monotonic() + self.flush_interval
+            
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    pending.append(item)
+                    count += len(item[1])
+                
+                if stop or waiters or count >= self.batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            
+            if pending:
+                self._commit(pending, count)
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                return
+    
+    def _commit(self, pending: List[Tuple[str, list]], count: int):
+        try:
+            with self._write_conn:
+                for sql, rows in pending:
+                    self._write_conn.executemany(sql, rows)
+            self.transactions += 1
+            self.rows_written += count
+        except Exception as e:
+            print(f"Error writing {self.path}: {e}")
+    
+    def query(self, sql: str, params: Sequence = ()) -> List[tuple]:
+        with self._read_lock:
+            return self._read_conn.execute(sql, params).fetchall()
+    
+    def get_meta(self, key: str) -> Optional[str]:
+        rows = self.query("SELECT value FROM meta WHERE key = ?", (key,))
+        return rows[0][0] if rows else None
+    
+    def set_meta(self, key: str, value: str):
+        self.write("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", [(key, value)])
+    
+    def stats(self) -> dict:
+        return {
+            "path": str(self.path),
+            "schema_version": self.schema_version,
+            "queued": self._queue.qsize(),
+            "transactions": self.transactions,
+            "rows_written": self.rows_written
+        }
+
+
+_storage: Optional[SQLiteStorage] = None
+_storage_lock = threading.Lock()
+
+
+def get_storage() -> Optional[SQLiteStorage]:
+    """The shared database when STORAGE_BACKEND is sqlite, else None (JSON files)"""
+    global _storage
+    if config.storage_backend not in STORAGE_BACKENDS:
+        raise ValueError(f"Invalid storage backend: {config.storage_backend} (expected one of {STORAGE_BACKENDS})")
+    if config.storage_backend == STORAGE_JSON:
+        return None
+    with _storage_lock:
+        if _storage is None:
+            _storage = SQLiteStorage(config.storage_db_file)
+        return _storage
@@ -0,0 +1,426 @@
+"""
+Violation Store - Time-ordered JSONL segments with a sparse in-memory index
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from clawcontrol.services.batch_writer import BatchedWriter, FSYNC_INTERVAL
+
+
+class _Segment:
+    """One JSONL segment file and its sparse (ts, offset) index"""
+    
+    __slots__ = ("seq", "path", "first_ts", "last_ts", "count", "size", "sparse_ts", "sparse_pos")
+    
+    def __init__(self, seq: int, path: Path):
+        self.seq = seq
+        self.path = path
+        self.first_ts: Optional[float] = None
+        self.last_ts: Optional[float] = None
+        self.count = 0
+        self.size = 0
+        self.sparse_ts: List[float] = []
+        self.sparse_pos: List[int] = []
+    
+    @property
+    def index_path(self) -> Path:
+        return self.path.with_suffix(".idx.json")
+    
+    def to_index(self) -> Dict:
+        return {
+            "first_ts": self.first_ts,
+            "last_ts": self.last_ts,
+            "count": self.count,
+            "size": self.size,
+            "sparse": list(zip(self.sparse_ts, self.sparse_pos))
+        }
+
+
+def _parse_ts(value) -> float:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return datetime.fromisoformat(value).timestamp()
+
+
+class ViolationStore:
+    """
+    Append-only violation history split into size-bounded segments.
+    
+    Every `index_interval`-th entry of a segment is recorded in a sparse
+    index of (timestamp, byte offset), so a `since` lookup is a bisect over
+    segments plus a bisect inside one segment, followed by a short scan.
+    Sealed segments persist their index next to the data file; segments
+    older than the retention window are pruned when a new one is opened.
+    """
+    
+    def __init__(
+        self,
+        directory: Path,
+        segment_max_bytes: int = 8 * 1024 * 1024,
+        index_interval: int = 64,
+        retention_days: float = 30,
+        fsync_policy: str = FSYNC_INTERVAL,
+        flush_interval: float = 0.05
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_max_bytes = segment_max_bytes
+        self.index_interval = index_interval
+        self.retention_days = retention_days
+        self.fsync_policy = fsync_policy
+        self.flush_interval = flush_interval
+        
+        self._lock = threading.Lock()
+        self._segments: List[_Segment] = []
+        self._writer: Optional[BatchedWriter] = None
+        self._load()
+    
+    def _segment_path(self, seq: int) -> Path:
+        return self.directory / f"segment-{seq:08d}.jsonl"
+    
+    def _load(self):
+        paths = sorted(self.directory.glob("segment-*.jsonl"))
+        for position, path in enumerate(paths):
+            segment = _Segment(int(path.stem.split("-")[1]), path)
+            is_active = position == len(paths) - 1
+            
+            if not is_active and self._load_index(segment):
+                self._segments.append(segment)
+                continue
+            
+            self._scan_segment(segment, repair=is_active)
+            if not is_active:
+                self._write_index(segment)
+            self._segments.append(segment)
+        
+        if not self._segments:
+            self._segments.append(_Segment(1, self._segment_path(1)))
+        self._prune()
+        self._open_writer()
+    
+    def _load_index(self, segment: _Segment) -> bool:
+        try:
+            with open(segment.index_path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        
+        segment.first_ts = data.get("first_ts")
+        segment.last_ts = data.get("last_ts")
+        segment.count = data.get("count", 0)
+        segment.size = data.get("size", 0)
+        for ts, pos in data.get("sparse", []):
+            segment.sparse_ts.append(ts)
+            segment.sparse_pos.append(pos)
+        return True
+    
+    def _scan_segment(self, segment: _Segment, repair: bool):
+        """Rebuild a segment's index from its data, dropping a torn last line"""
+        position = 0
+        with open(segment.path, 'rb') as f:
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                try:
+                    ts = _parse_ts(json.loads(raw)["ts"])
+                except (ValueError, KeyError, TypeError):
+                    position += len(raw)
+                    continue
+                self._index_entry(segment, ts, position)
+                position += len(raw)
+        
+        segment.size = position
+        if repair and os.path.getsize(segment.path) != position:
+            os.truncate(segment.path, position)
+    
+    def _write_index(self, segment: _Segment):
+        try:
+            tmp_path = segment.index_path.with_suffix(".tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump(segment.to_index(), f)
+            os.replace(tmp_path, segment.index_path)
+        except Exception as e:
+            print(f"Error writing violation index: {e}")
+    
+    def _index_entry(self, segment: _Segment, ts: float, position: int):
+        if segment.count % self.index_interval == 0:
+            segment.sparse_ts.append(ts)
+            segment.sparse_pos.append(position)
+        if segment.first_ts is None:
+            segment.first_ts = ts
+        segment.last_ts = ts
+        segment.count += 1
+    
+    def _open_writer(self):
+        self._writer = BatchedWriter(
+            self._segments[-1].path,
+            fsync_policy=self.fsync_policy,
+            flush_interval=self.flush_interval
+        )
+    
+    def _roll(self):
+        """Seal the active segment and start a new one"""
+        active = self._segments[-1]
+        self._writer.close()
+        self._write_index(active)
+        
+        self._segments.append(_Segment(active.seq + 1, self._segment_path(active.seq + 1)))
+        self._open_writer()
+        self._prune()
+    
+    def _prune(self):
+        cutoff = time.time() - self.retention_days * 86400
+        while len(self._segments) > 1 and (self._segments[0].last_ts or 0) < cutoff:
+            segment = self._segments.pop(0)
+            for path in (segment.path, segment.index_path):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+    
+    def append(self, entries: Iterable[Dict]):
+        """Append entries (dicts with an ISO `ts`) in time order"""
+        with self._lock:
+            pending: List[str] = []
+            for entry in entries:
+                line = json.dumps(entry) + "\n"
+                size = len(line.encode("utf-8"))
+                active = self._segments[-1]
+                
+                if active.count and active.size + size > self.segment_max_bytes:
+                    self._writer.write_many(pending)
+                    pending = []
+                    self._roll()
+                    active = self._segments[-1]
+                
+                self._index_entry(active, _parse_ts(entry["ts"]), active.size)
+                active.size += size
+                pending.append(line)
+            
+            self._writer.write_many(pending)
+    
+    def import_jsonl(self, path: Path, batch_size: int = 1000) -> int:
+        """Import a legacy violations.log into an empty store"""
+        if not path.exists() or any(segment.count for segment in self._segments):
+            return 0
+        
+        imported = 0
+        batch: List[Dict] = []
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    _parse_ts(entry["ts"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+                batch.append(entry)
+                if len(batch) >= batch_size:
+                    self.append(batch)
+                    imported += len(batch)
+                    batch = []
+        
+        self.append(batch)
+        return imported + len(batch)
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until appended entries are on disk"""
+        return self._writer.flush(timeout)
+    
+    def close(self):
+        """Flush pending entries and persist the active segment's index"""
+        with self._lock:
+            self._writer.close()
+            self._write_index(self._segments[-1])
+    
+    def query(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        rule_id: Optional[str] = None,
+        severity: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Return up to `limit` entries in time order plus a cursor for the
+        next page (None when there is nothing more to read).
+        """
+        since_ts = since.timestamp() if since else None
+        until_ts = until.timestamp() if until else None
+        
+        self.flush()
+        with self._lock:
+            segments = list(self._segments)
+            sizes = {segment.seq: segment.size for segment in segments}
+        
+        if cursor:
+            seq, position = (int(part) for part in cursor.split(":"))
+            start = bisect_left([segment.seq for segment in segments], seq)
+        else:
+            seq, position = None, 0
+            start = 0
+            if since_ts is not None:
+                last_ts = [segment.last_ts if segment.last_ts is not None else float("inf") for segment in segments]
+                start = bisect_left(last_ts, since_ts)
+        
+        results: List[Dict] = []
+        for segment in segments[start:]:
+            if until_ts is not None and segment.first_ts is not None and segment.first_ts > until_ts:
+                return results, None
+            
+            if segment.seq != seq:
+                position = 0
+                if since_ts is not None and segment.sparse_ts:
+                    slot = bisect_left(segment.sparse_ts, since_ts) - 1
+                    position = segment.sparse_pos[max(slot, 0)]
+            
+            end = sizes[segment.seq]
+            with open(segment.path, 'rb') as f:
+                f.seek(position)
+                while position < end:
+                    raw = f.readline()
+                    if not raw:
+                        break
+                    line_start = position
+                    position += len(raw)
+                    
+                    try:
+                        entry = json.loads(raw)
+                        ts = _parse_ts(entry["ts"])
+                    except (ValueError, KeyError, TypeError):
+                        continue
+                    if since_ts is not None and ts < since_ts:
+                        continue
+                    if until_ts is not None and ts > until_ts:
+                        return results, None
+                    if rule_id is not None and entry.get("rule_id") != rule_id:
+                        continue
+                    if severity is not None and entry.get("severity") != severity:
+                        continue
+                    
+                    if len(results) >= limit:
+                        return results, f"{segment.seq}:{line_start}"
+                    results.append(entry)
+        
+        return results, None
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "segments": len(self._segments),
+                "entries": sum(segment.count for segment in self._segments),
+                "bytes": sum(segment.size for segment in self._segments),
+                "oldest": self._segments[0].first_ts
+            }
+
+
+class SQLiteViolationStore:
+    """
+    Violation history in the shared SQLite database, with the same
+    interface as ViolationStore. Rows are indexed by time and by rule;
+    entries older than the retention window are deleted on start.
+    """
+    
+    INSERT = "INSERT INTO violations (ts, rule_id, severity, entry) VALUES (?, ?, ?, ?)"
+    
+    def __init__(self, storage, retention_days: float = 30):
+        self.storage = storage
+        self.retention_days = retention_days
+        self.storage.write("DELETE FROM violations WHERE ts < ?", [(time.time() - retention_days * 86400,)])
+    
+    @staticmethod
+    def _row(entry: Dict) -> Tuple:
+        return (_parse_ts(entry["ts"]), entry.get("rule_id"), entry.get("severity"), json.dumps(entry))
+    
+    def append(self, entries: Iterable[Dict]):
+        """Queue entries (dicts with an ISO `ts`) for a batched insert"""
+        self.storage.write(self.INSERT, [self._row(entry) for entry in entries])
+    
+    def import_files(self, paths: List[Path], batch_size: int = 1000) -> int:
+        """Import JSONL violation files once, on the database's first start"""
+        if self.storage.get_meta("violations_imported"):
+            return 0
+        
+        imported = 0
+        for path in paths:
+            if not path.exists():
+                continue
+            batch: List[Tuple] = []
+            with open(path, 'r') as f:
+                for line in f:
+                    try:
+                        batch.append(self._row(json.loads(line)))
+                    except (ValueError, KeyError, TypeError):
+                        continue
+                    if len(batch) >= batch_size:
+                        self.storage.write(self.INSERT, batch)
+                        imported += len(batch)
+                        batch = []
+            self.storage.write(self.INSERT, batch)
+            imported += len(batch)
+        
+        self.storage.set_meta("violations_imported", str(imported))
+        self.storage.flush()
+        return imported
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        return self.storage.flush(timeout)
+    
+    def close(self):
+        self.storage.flush()
+    
+    def query(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        rule_id: Optional[str] = None,
+        severity: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """Same contract as ViolationStore.query; the cursor is `ts:id` of the last entry"""
+        conditions: List[str] = []
+        params: List = []
+        if since is not None:
+            conditions.append("ts >= ?")
+            params.append(since.timestamp())
+        if until is not None:
+            conditions.append("ts <= ?")
+            params.append(until.timestamp())
+        if rule_id is not None:
+            conditions.append("rule_id = ?")
+            params.append(rule_id)
+        if severity is not None:
+            conditions.append("severity = ?")
+            params.append(severity)
+        if cursor:
+            ts, row_id = cursor.split(":")
+            conditions.append("(ts > ? OR (ts = ? AND id > ?))")
+            params.extend((float(ts), float(ts), int(row_id)))
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        self.storage.flush()
+        rows = self.storage.query(
+            f"SELECT id, ts, entry FROM violations {where} ORDER BY ts, id LIMIT ?",
+            (*params, limit + 1)
+        )
+        
+        next_cursor = None
+        if len(rows) > limit:
+            row_id, ts, _ = rows[limit - 1]
+            next_cursor = f"{ts!r}:{row_id}"
+            rows = rows[:limit]
+        return [json.loads(entry) for _, _, entry in rows], next_cursor
+    
+    def stats(self) -> Dict:
+        count, oldest = self.storage.query("SELECT COUNT(*), MIN(ts) FROM violations")[0]
+        return {
+            "backend": "sqlite",
+            "entries": count,
+            "oldest": oldest
+        }
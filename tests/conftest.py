@@ -0,0 +1,15 @@
+"""Shared test fixtures"""
+import pytest
+from clawcontrol.services import guardrails as guardrails_module
+from clawcontrol.services.guardrails import GuardrailsEngine
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    """Create engine with isolated rules and violations files"""
+    monkeypatch.setattr(guardrails_module.config, "rules_file", tmp_path / "rules.json")
+    monkeypatch.setattr(guardrails_module, "VIOLATIONS_LOG_FILE", tmp_path / "violations.log")
+    monkeypatch.setattr(guardrails_module, "VIOLATIONS_DIR", tmp_path / "violations")
+    engine = GuardrailsEngine()
+    yield engine
+    engine.close()
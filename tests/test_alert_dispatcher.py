@@ -0,0 +1,153 @@
+"""Tests for batched alert delivery against a local stub webhook"""
+import json
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from clawcontrol.services.alerts import AlertSystem
+from clawcontrol.services.alert_dispatcher import AlertDispatcher, AlertSink
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        server.batches.append(body["alerts"])
+        status = server.statuses.pop(0) if server.statuses else 200
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+    
+    def log_message(self, *args):
+        pass
+
+
+class UnixStubServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class UnixStubHandler(StubHandler):
+    def address_string(self):
+        return "uds"
+
+
+def serve(server, statuses=()):
+    server.batches = []
+    server.statuses = list(statuses)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def stub():
+    server = serve(ThreadingHTTPServer(("127.0.0.1", 0), StubHandler))
+    yield server
+    server.shutdown()
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_batches_alerts_without_blocking_creation(stub, tmp_path):
+    """Alerts created in a burst arrive in batches; creation never waits on delivery"""
+    url = f"http://127.0.0.1:{stub.server_address[1]}/hook"
+    sink = AlertSink("stub", url, batch_size=20, batch_interval=0.2, dead_letter_file=tmp_path / "dead.jsonl")
+    dispatcher = AlertDispatcher([sink])
+    alerts = AlertSystem(alerts_file=tmp_path / "alerts.json")
+    dispatcher.attach(alerts)
+    dispatcher.start()
+    
+    started = time.perf_counter()
+    for i in range(50):
+        alerts.system_alert(f"Alert {i}", "details")
+    assert time.perf_counter() - started < 1.0
+    
+    assert wait_for(lambda: sink.alerts_delivered == 50)
+    assert len(stub.batches) < 50
+    assert [a["title"] for batch in stub.batches for a in batch] == [f"Alert {i}" for i in range(50)]
+    
+    stats = dispatcher.stats()
+    assert stats["alerts_submitted"] == 50
+    assert stats["queue_depth"] == 0
+    dispatcher.stop()
+    alerts.close()
+
+
+def test_retries_then_dead_letters(stub, tmp_path):
+    """5xx is retried with backoff; a batch that keeps failing goes to the dead-letter file"""
+    url = f"http://127.0.0.1:{stub.server_address[1]}/hook"
+    dead_letter = tmp_path / "dead.jsonl"
+    stub.statuses = [503, 200, 500, 500, 500]
+    sink = AlertSink("stub", url, batch_interval=0.05, max_retries=2, retry_backoff=0.01, dead_letter_file=dead_letter)
+    sink.start()
+    
+    sink.submit({"id": "1"})
+    assert wait_for(lambda: sink.alerts_delivered == 1)
+    assert sink.attempts_failed == 1
+    
+    sink.submit({"id": "2"})
+    assert wait_for(lambda: sink.alerts_dead_lettered == 1)
+    entry = json.loads(dead_letter.read_text())
+    assert entry["sink"] == "stub"
+    assert entry["error"] == "HTTP 500"
+    assert entry["alerts"] == [{"id": "2"}]
+    sink.stop()
+
+
+def test_unix_socket_sink(tmp_path):
+    """Sinks can post to a local service listening on a unix socket"""
+    path = str(tmp_path / "hook.sock")
+    server = serve(UnixStubServer(path, UnixStubHandler))
+    sink = AlertSink("uds", "http://localhost/hook", uds=path, batch_interval=0.05,
+                     dead_letter_file=tmp_path / "dead.jsonl")
+    sink.start()
+    sink.submit({"id": "1"})
+    assert wait_for(lambda: sink.alerts_delivered == 1)
+    assert server.batches == [[{"id": "1"}]]
+    sink.stop()
+    server.shutdown()
+
+
+def test_sinks_from_config(tmp_path):
+    """alert_sinks.json defines sinks; unknown keys are reported and skipped"""
+    sinks_file = tmp_path / "alert_sinks.json"
+    sinks_file.write_text(json.dumps({"sinks": [
+        {"name": "oncall", "url": "http://127.0.0.1:9/hook", "batch_size": 10},
+        {"name": "broken", "url": "http://127.0.0.1:9/hook", "colour": "red"}
+    ]}))
+    dispatcher = AlertDispatcher.from_config(sinks_file, tmp_path / "dead.jsonl")
+    assert [sink.name for sink in dispatcher.sinks] == ["oncall"]
+    assert dispatcher.sinks[0].batch_size == 10
+
+
+def test_guardrail_violations_reach_sinks(stub, engine, tmp_path):
+    """Violations become alerts that the dispatcher delivers, wired as the app does"""
+    from clawcontrol.api.models import GuardRuleCreate
+    from clawcontrol.services.alerts import alert_on_violations
+    alert_system = AlertSystem(alerts_file=tmp_path / "alerts.json", coalesce_window=0)
+    alert_on_violations(engine, alert_system)
+    
+    url = f"http://127.0.0.1:{stub.server_address[1]}/hook"
+    sink = AlertSink("stub", url, batch_interval=0.1, dead_letter_file=tmp_path / "dead.jsonl")
+    dispatcher = AlertDispatcher([sink])
+    dispatcher.attach(alert_system)
+    dispatcher.start()
+    
+    engine.create_rule(GuardRuleCreate(name="Dispatch e2e", block_patterns=["dispatch-e2e-7f3"]))
+    try:
+        engine.evaluate_log_lines(["run dispatch-e2e-7f3"])
+        assert wait_for(lambda: sink.alerts_delivered == 1)
+    finally:
+        dispatcher.stop()
+        alert_system.close()
+    
+    delivered = [a for batch in stub.batches for a in batch]
+    assert [a["title"] for a in delivered] == ["Guardrail Violation: Dispatch e2e"]
+    assert delivered[0]["data"]["type"] == "violation"
@@ -0,0 +1,151 @@
+"""Tests for alert journaling and compaction"""
+import json
+from clawcontrol.services.alerts import AlertSystem, AlertLevel
+
+
+def test_journal_replays_creates_and_reads(tmp_path):
+    """State survives a restart through the journal alone"""
+    alerts_file = tmp_path / "alerts.json"
+    alerts = AlertSystem(alerts_file=alerts_file, compact_every=100)
+    for i in range(5):
+        alerts.create_alert(f"Alert {i}", "details", level=AlertLevel.ERROR)
+    alerts.mark_as_read(["0", "1"])
+    alerts.close()
+    
+    assert not alerts_file.exists()
+    journal = alerts._journal_path(0)
+    assert len(journal.read_text().splitlines()) == 6
+    
+    reloaded = AlertSystem(alerts_file=alerts_file, compact_every=100)
+    assert [a["title"] for a in reloaded.get_alerts()] == [f"Alert {i}" for i in reversed(range(5))]
+    assert reloaded.unread_count == 3
+    assert reloaded.get_stats()["by_level"] == {"error": 5}
+    
+    reloaded.mark_all_as_read()
+    reloaded.close()
+    assert AlertSystem(alerts_file=alerts_file, compact_every=100).unread_count == 0
+
+
+def test_compaction_writes_snapshot_and_truncates_journal(tmp_path):
+    """Every compact_every records the journal is folded into a new snapshot"""
+    alerts_file = tmp_path / "alerts.json"
+    alerts = AlertSystem(max_alerts=20, alerts_file=alerts_file, compact_every=10)
+    for i in range(25):
+        alerts.create_alert(f"Alert {i}", "details")
+    alerts.close()
+    
+    assert alerts.compactions == 2
+    snapshot = json.loads(alerts_file.read_text())
+    assert snapshot["generation"] == 2
+    assert len(snapshot["alerts"]) == 20
+    assert sorted(p.name for p in tmp_path.glob("alerts.journal-*")) == ["alerts.journal-00000002.jsonl"]
+    
+    reloaded = AlertSystem(max_alerts=20, alerts_file=alerts_file, compact_every=10)
+    assert len(reloaded.alerts) == 20
+    assert reloaded.get_alerts(limit=1)[0]["title"] == "Alert 24"
+    assert reloaded.unread_count == 20
+
+
+def test_legacy_file_and_torn_journal_line(tmp_path):
+    """A pretty-printed alerts.json loads as generation 0; a torn record is dropped"""
+    alerts_file = tmp_path / "alerts.json"
+    legacy = {"alerts": [{"id": "0", "title": "old", "message": "", "level": "info",
+                          "timestamp": "2026-01-01T00:00:00", "read": False, "data": {}}],
+              "unread_count": 1}
+    alerts_file.write_text(json.dumps(legacy, indent=2))
+    journal = tmp_path / "alerts.journal-00000000.jsonl"
+    journal.write_text('{"op":"read","ids":["0"]}\n{"op":"crea')
+    
+    alerts = AlertSystem(alerts_file=alerts_file)
+    assert alerts.unread_count == 0
+    assert alerts.alerts[0]["read"] is True
+    assert journal.read_text() == '{"op":"read","ids":["0"]}\n'
+    alerts.close()
+
+
+def test_ids_stay_unique_past_capacity(tmp_path):
+    """IDs keep increasing after the oldest alerts are evicted"""
+    alerts = AlertSystem(max_alerts=3, alerts_file=tmp_path / "alerts.json")
+    created = [alerts.create_alert(f"Alert {i}", "") for i in range(5)]
+    assert [a["id"] for a in created] == ["0", "1", "2", "3", "4"]
+    assert sorted(alerts.alerts) == [2, 3, 4]
+    assert alerts.get_alert("1") is None
+    
+    assert alerts.mark_as_read(["4", "4", "0", "bogus"]) == 1
+    assert alerts.get_stats() == {"total": 3, "unread": 2, "by_level": {"info": 3}, "occurrences_coalesced": 0}
+    alerts.close()
+    
+    reloaded = AlertSystem(max_alerts=3, alerts_file=tmp_path / "alerts.json")
+    assert reloaded.create_alert("next", "")["id"] == "5"
+    reloaded.close()
+
+
+def test_cursor_pagination_with_filters(tmp_path):
+    """Pages walk backwards through level and unread indexes"""
+    alerts = AlertSystem(alerts_file=tmp_path / "alerts.json")
+    for i in range(10):
+        alerts.create_alert(f"Alert {i}", "", level=AlertLevel.ERROR if i % 2 else AlertLevel.INFO)
+    alerts.mark_as_read(["9", "7"])
+    
+    page, cursor = alerts.page_alerts(limit=4)
+    assert [a["id"] for a in page] == ["9", "8", "7", "6"]
+    page, cursor = alerts.page_alerts(limit=4, cursor=cursor)
+    assert [a["id"] for a in page] == ["5", "4", "3", "2"]
+    page, cursor = alerts.page_alerts(limit=4, cursor=cursor)
+    assert [a["id"] for a in page] == ["1", "0"]
+    assert cursor is None
+    
+    page, cursor = alerts.page_alerts(limit=2, level=AlertLevel.ERROR, unread_only=True)
+    assert [a["id"] for a in page] == ["5", "3"]
+    page, cursor = alerts.page_alerts(limit=2, level=AlertLevel.ERROR, unread_only=True, cursor=cursor)
+    assert [a["id"] for a in page] == ["1"]
+    assert cursor is None
+    
+    assert alerts.get_stats()["by_level"] == {"info": 5, "error": 5}
+    assert alerts.mark_all_as_read() == 8
+    assert alerts.get_alerts(unread_only=True) == []
+    alerts.close()
+
+
+def test_storm_coalesces_into_one_alert(tmp_path):
+    """Repeats within the window update one alert; a new window starts a new one"""
+    alerts_file = tmp_path / "alerts.json"
+    alerts = AlertSystem(alerts_file=alerts_file, max_samples=3, update_interval=3600)
+    for i in range(1000):
+        alerts.violation_alert("dangerous_command", f"rm -rf /tmp/{i}", instance_id="a")
+    alerts.violation_alert("dangerous_command", "other instance", instance_id="b")
+    alerts.violation_alert("secret_access", "cat .env", instance_id="a")
+    
+    assert len(alerts.alerts) == 3
+    storm = alerts.get_alert("0")
+    assert storm["count"] == 1000
+    assert storm["samples"] == ["rm -rf /tmp/997", "rm -rf /tmp/998", "rm -rf /tmp/999"]
+    assert storm["first_seen"] <= storm["last_seen"]
+    assert alerts.get_stats()["occurrences_coalesced"] == 999
+    alerts.close()
+    
+    # Three creates plus one update record, not a thousand
+    assert len(alerts._journal_path(0).read_text().splitlines()) == 4
+    reloaded = AlertSystem(alerts_file=alerts_file)
+    assert reloaded.get_alert("0")["count"] == 1000
+    assert reloaded.violation_alert("dangerous_command", "again", instance_id="a")["id"] == "0"
+    reloaded.close()
+    
+    expired = AlertSystem(alerts_file=tmp_path / "expired.json", coalesce_window=0)
+    first = expired.violation_alert("dangerous_command", "one")
+    second = expired.violation_alert("dangerous_command", "two")
+    assert first["id"] != second["id"]
+    expired.close()
+
+
+def test_fingerprints_follow_evicted_and_cleared_alerts(tmp_path):
+    """Evicted or cleared alerts drop out of the coalescing map"""
+    alerts = AlertSystem(max_alerts=3, alerts_file=tmp_path / "alerts.json")
+    for i in range(10):
+        alerts.violation_alert(f"rule_{i}", "details")
+    assert len(alerts._open) == 3
+    
+    assert alerts.violation_alert("rule_0", "again")["id"] == "10"
+    assert alerts.clear_old_alerts(days=0) == 3
+    assert alerts._open == {}
+    alerts.close()
@@ -0,0 +1,58 @@
+"""Tests for allowed_paths enforcement"""
+import pytest
+from clawcontrol.services.path_trie import PathPrefixTrie, extract_paths
+from clawcontrol.api.models import GuardRuleCreate
+
+
+@pytest.fixture
+def engine(engine):
+    """Shared isolated engine with path checks on"""
+    engine.check_paths = True
+    return engine
+
+
+def test_trie_component_boundaries():
+    """Prefixes match whole components only"""
+    trie = PathPrefixTrie()
+    trie.add("/tmp", 1)
+    trie.add("/home/user/", 2)
+    
+    assert trie.allowed_mask("/tmp") == 1
+    assert trie.allowed_mask("/tmp/a/b") == 1
+    assert trie.allowed_mask("/tmpfoo") == 0
+    assert trie.allowed_mask("/home/user/x") == 2
+    assert trie.allowed_mask("/home/other") == 0
+
+
+def test_paths_outside_allowed_prefixes(engine):
+    """Paths outside a rule's allowed prefixes are violations"""
+    rule = engine.create_rule(GuardRuleCreate(name="Sandbox", allowed_paths=["/tmp", "/var/tmp"]))
+    
+    assert engine.evaluate_log_line("wrote /tmp/out.txt") is None
+    assert engine.evaluate_log_line("fetched http://example.com/etc/passwd") is None
+    
+    violation = engine.evaluate_log_line("read /tmp/../etc/shadow")
+    assert violation is not None
+    assert violation.rule_id == rule.id
+    
+    engine.check_paths = False
+    assert engine.evaluate_log_line("read /etc/shadow") is None
+
+
+def test_block_patterns_take_precedence(engine):
+    """Rules without allowed_paths never flag paths"""
+    blocker = engine.create_rule(GuardRuleCreate(name="Block", block_patterns=["sudo"]))
+    engine.create_rule(GuardRuleCreate(name="Sandbox", allowed_paths=["/tmp"]))
+    
+    assert engine.evaluate_log_line("sudo cat /etc/hosts").rule_id == blocker.id
+    assert engine.evaluate_log_line("cat /tmp/hosts") is None
+
+
+def test_lone_slash_is_not_a_path(engine):
+    """Arithmetic and prose with a spaced-out slash never trip allowed_paths"""
+    assert extract_paths("ratio 3 / 4, and/or 10 // 2") == []
+    assert extract_paths("cd /tmp/.. then /.") == ["/"]
+    
+    engine.create_rule(GuardRuleCreate(name="Sandbox", allowed_paths=["/tmp"]))
+    assert engine.evaluate_log_line("throughput 120 req / s") is None
+    assert engine.evaluate_log_line("progress: 3 / 4 done") is None
@@ -0,0 +1,63 @@
+"""Tests for session history and rollup-based analytics"""
+import json
+from datetime import datetime, timedelta
+from clawcontrol.services.analytics import AnalyticsTracker
+
+
+def make_tracker(tmp_path, **kwargs):
+    return AnalyticsTracker(
+        analytics_file=tmp_path / "analytics.json",
+        sessions_file=tmp_path / "sessions.jsonl",
+        **kwargs
+    )
+
+
+def test_rollups_match_sessions_and_survive_restart(tmp_path):
+    """Stats come from buckets; sessions after the last snapshot are replayed"""
+    tracker = make_tracker(tmp_path, snapshot_every=4)
+    for i in range(1500):
+        tracker.track_session(duration=10 + i % 3, actions=2, violations=i % 2)
+    
+    expected = {
+        "total_sessions": 1500,
+        "total_actions": 3000,
+        "total_violations": 750,
+        "avg_duration": 11.0
+    }
+    assert tracker.get_stats(days=30) == expected
+    assert tracker.get_stats(days=365) == expected
+    tracker._writer.close()
+    
+    snapshot = json.loads((tmp_path / "analytics.json").read_text())
+    assert snapshot["sessions_total"] == 1500 - 1500 % 4
+    
+    reloaded = make_tracker(tmp_path, snapshot_every=4)
+    assert reloaded.get_stats() == expected
+    assert len(list(reloaded.history())) == 1500
+    reloaded.close()
+
+
+def test_buckets_limit_the_range(tmp_path):
+    """Sessions older than the range are excluded"""
+    tracker = make_tracker(tmp_path)
+    old = (datetime.now() - timedelta(days=40)).isoformat()
+    tracker._fold({"timestamp": old, "duration_seconds": 100, "actions": 5, "violations": 1})
+    tracker.track_session(duration=20, actions=1, violations=0)
+    
+    assert tracker.get_stats(days=30)["total_sessions"] == 1
+    assert tracker.get_stats(days=365)["total_sessions"] == 2
+    assert tracker.get_stats(days=365)["avg_duration"] == 60
+    tracker.close()
+
+
+def test_migrates_legacy_session_list(tmp_path):
+    """A v1 analytics.json becomes history plus rollups"""
+    now = datetime.now().isoformat()
+    legacy = {"sessions": [{"timestamp": now, "duration_seconds": 30, "actions": 3, "violations": 1}] * 3}
+    (tmp_path / "analytics.json").write_text(json.dumps(legacy, indent=2))
+    
+    tracker = make_tracker(tmp_path)
+    assert tracker.get_stats()["total_sessions"] == 3
+    assert len((tmp_path / "sessions.jsonl").read_text().splitlines()) == 3
+    assert json.loads((tmp_path / "analytics.json").read_text())["version"] == 2
+    tracker.close()
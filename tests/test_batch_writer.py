@@ -0,0 +1,61 @@
+"""Tests for the group-commit violations writer"""
+import gc
+import weakref
+import pytest
+from clawcontrol.services.batch_writer import BatchedWriter
+
+
+@pytest.mark.parametrize("policy", ["none", "interval", "always"])
+def test_batches_and_flush(tmp_path, policy):
+    """Queued lines are grouped into few writes and visible after flush"""
+    writer = BatchedWriter(tmp_path / "out.log", fsync_policy=policy, flush_interval=0.2)
+    for i in range(500):
+        writer.write(f"line {i}\n")
+    
+    assert writer.flush(timeout=5)
+    assert (tmp_path / "out.log").read_text().count("\n") == 500
+    assert writer.batches_written < 500
+    writer.close()
+
+
+def test_close_writes_everything_queued(tmp_path):
+    """Nothing queued is lost on shutdown"""
+    writer = BatchedWriter(tmp_path / "out.log", flush_interval=10)
+    writer.write_many([f"{i}\n" for i in range(1000)])
+    writer.close()
+    
+    assert (tmp_path / "out.log").read_text().count("\n") == 1000
+    with pytest.raises(RuntimeError):
+        writer.write("late\n")
+
+
+def test_invalid_policy(tmp_path):
+    """Unknown fsync policies are rejected"""
+    with pytest.raises(ValueError):
+        BatchedWriter(tmp_path / "out.log", fsync_policy="sometimes")
+
+
+def test_close_releases_exit_hook(tmp_path):
+    """Closed writers are not kept alive by atexit"""
+    writer = BatchedWriter(tmp_path / "out.log")
+    writer.write("line\n")
+    writer.close()
+    
+    ref = weakref.ref(writer)
+    del writer
+    gc.collect()
+    assert ref() is None
+
+
+def test_dead_writer_drops_instead_of_blocking(tmp_path):
+    """Producers never block on a writer whose thread could not open the file"""
+    (tmp_path / "dir").mkdir()
+    writer = BatchedWriter(tmp_path / "dir", max_queue=2)
+    writer.write("first\n")
+    writer._thread.join(timeout=5)
+    
+    for i in range(10):
+        writer.write(f"line {i}\n")
+    assert writer.stats()["lines_dropped"] >= 10
+    assert writer.flush(timeout=1)
+    writer.close()
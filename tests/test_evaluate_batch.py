@@ -0,0 +1,33 @@
+"""Tests for batch evaluation endpoint"""
+import pytest
+from fastapi.testclient import TestClient
+from clawcontrol.main import app
+from clawcontrol.api import routes
+
+TEST_TOKEN = "test-token-123"
+
+
+@pytest.fixture
+def client(monkeypatch, engine):
+    """Create test client over an isolated engine"""
+    monkeypatch.setenv("CLAW_TOKEN", TEST_TOKEN)
+    monkeypatch.setattr(routes, "guardrails_engine", engine)
+    return TestClient(app)
+
+
+def test_evaluate_batch_endpoint(client):
+    """Test evaluating many lines in one request"""
+    headers = {"X-CLAW-TOKEN": TEST_TOKEN}
+    rule = client.post("/api/rules", json={
+        "name": "Batch Endpoint",
+        "block_patterns": ["endpoint-danger-91c"]
+    }, headers=headers).json()
+    
+    lines = ["ok"] * 50 + ["run endpoint-danger-91c now"] + ["ok"] * 50
+    response = client.post("/api/evaluate/batch", json={"lines": lines}, headers=headers)
+    assert response.status_code == 200
+    
+    body = response.json()
+    assert body["lines_evaluated"] == 101
+    assert body["total"] == 1
+    assert body["violations"][0]["rule_id"] == rule["id"]
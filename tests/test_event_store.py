@@ -0,0 +1,115 @@
+"""Tests for log line parsing and the columnar event store"""
+from datetime import datetime
+import pytest
+from clawcontrol.services.log_follower import LogFollower
+from clawcontrol.services.log_rotator import LogRotator
+from clawcontrol.services.log_parser import DefaultLineParser, LineParser, ParsedLine, get_parser, register_parser
+from clawcontrol.services.event_store import EventStore
+
+
+@pytest.fixture
+def setup(tmp_path):
+    """Follower, rotator and event store over a temp log"""
+    log_file = tmp_path / "openclaw.log"
+    log_file.write_text("")
+    follower = LogFollower(log_file=log_file, checkpoint_file=tmp_path / "checkpoint.json")
+    rotator = LogRotator(log_file=log_file, archive_dir=tmp_path / "archive",
+                         max_bytes=1, block_bytes=256, retention_days=100000, follower=follower)
+    store = EventStore(DefaultLineParser(), rotator=rotator, max_events=1000, initial_capacity=4)
+    follower.add_handler(store.add_lines)
+    follower.poll()
+    return follower, rotator, store
+
+
+def append(follower, lines):
+    with open(follower.log_file, 'a') as f:
+        f.writelines(line + "\n" for line in lines)
+    follower.poll()
+
+
+def test_default_parser_fields():
+    """Timestamp, level, tool, command and arguments are extracted"""
+    parsed = DefaultLineParser().parse("[2026-01-02T03:04:05] WARN [tool:shell] rm -rf /tmp/x")
+    assert parsed.ts == datetime(2026, 1, 2, 3, 4, 5).timestamp()
+    assert parsed.level == "WARNING"
+    assert parsed.tool == "shell"
+    assert parsed.command == "rm"
+    assert parsed.args == "rm -rf /tmp/x"
+    
+    parsed = DefaultLineParser().parse("plain output")
+    assert (parsed.level, parsed.tool, parsed.command) == ("", "", "plain")
+
+
+def test_custom_parser_registration():
+    """Registered parsers are selectable by name; unknown names fail loudly"""
+    class UpperParser(LineParser):
+        def parse(self, line):
+            return ParsedLine(0.0, "INFO", "", line.upper(), line.upper())
+    
+    register_parser("upper", UpperParser())
+    assert get_parser("upper").parse("ls").command == "LS"
+    with pytest.raises(ValueError):
+        get_parser("missing")
+
+
+def test_aggregations_and_events(setup):
+    """Per-minute counts, top commands and events survive growth and rotation"""
+    follower, rotator, store = setup
+    append(follower, [f"[2026-01-02T03:04:{i:02d}] INFO [tool:shell] ls /tmp/{i}" for i in range(30)])
+    append(follower, [f"[2026-01-02T03:05:{i:02d}] INFO [tool:read_file] cat /etc/{i}" for i in range(5)])
+    rotator.rotate()
+    append(follower, ["[2026-01-02T03:05:30] ERROR [tool:shell] rm -rf /", "no timestamp line"])
+    
+    minute = datetime(2026, 1, 2, 3, 4)
+    assert store.actions_per_minute() == [
+        {"minute": minute, "tool": "shell", "count": 30},
+        {"minute": datetime(2026, 1, 2, 3, 5), "tool": "shell", "count": 1},
+        {"minute": datetime(2026, 1, 2, 3, 5), "tool": "read_file", "count": 5}
+    ]
+    assert store.actions_per_minute(tool="read_file")[0]["count"] == 5
+    assert store.actions_per_minute(tool="unknown") == []
+    
+    assert store.top_commands(limit=2) == [{"command": "ls", "count": 30}, {"command": "cat", "count": 5}]
+    assert store.top_commands(tool="shell", since=datetime(2026, 1, 2, 3, 5)) == [{"command": "rm", "count": 1}]
+    
+    events = store.events(level="error")
+    assert len(events) == 1
+    assert events[0]["args"] == "rm -rf /"
+    assert events[0]["tool"] == "shell"
+    
+    events = store.events(tool="shell", until=datetime(2026, 1, 2, 3, 4, 59), limit=2)
+    assert [event["args"] for event in events] == ["ls /tmp/28", "ls /tmp/29"]
+    assert store.stats()["events"] == 37
+
+
+def test_eviction_keeps_newest(tmp_path):
+    """Past max_events the oldest rows are dropped"""
+    log_file = tmp_path / "openclaw.log"
+    follower = LogFollower(log_file=log_file, checkpoint_file=tmp_path / "checkpoint.json")
+    rotator = LogRotator(log_file=log_file, archive_dir=tmp_path / "archive", follower=follower)
+    store = EventStore(DefaultLineParser(), rotator=rotator, max_events=100, initial_capacity=8)
+    
+    for batch in range(10):
+        store.add_lines([f"[tool:shell] cmd{batch}" for _ in range(30)], list(range(30)))
+    
+    stats = store.stats()
+    assert stats["events"] <= 100
+    assert stats["events"] + stats["events_evicted"] == 300
+    assert store.top_commands(limit=1) == [{"command": "cmd9", "count": 30}]
+
+
+def test_dictionaries_stay_bounded(tmp_path):
+    """Evicted commands leave the dictionary; past the cap new ones count as other"""
+    log_file = tmp_path / "openclaw.log"
+    rotator = LogRotator(log_file=log_file, archive_dir=tmp_path / "archive")
+    store = EventStore(DefaultLineParser(), rotator=rotator, max_events=100, initial_capacity=8)
+    
+    for batch in range(50):
+        store.add_lines([f"[tool:shell] id-{batch}-{i}" for i in range(30)], list(range(30)))
+    assert store.stats()["commands"] <= 100
+    assert store.top_commands(limit=1)[0]["command"].startswith("id-49-")
+    
+    capped = EventStore(DefaultLineParser(), rotator=rotator, max_events=1000, max_dictionary_size=10)
+    capped.add_lines([f"[tool:shell] cmd{i % 3}" for i in range(30)] + [f"unique-{i}" for i in range(20)], list(range(50)))
+    assert capped.stats()["commands"] == 8
+    assert capped.top_commands(limit=1) == [{"command": "(other)", "count": 15}]
@@ -0,0 +1,80 @@
+"""Tests for shared log streaming"""
+import asyncio
+import pytest
+from clawcontrol.services.log_follower import LogFollower
+from clawcontrol.services.log_broadcaster import LogBroadcaster
+
+
+@pytest.fixture
+def follower(tmp_path):
+    """Follower over a temp log with a broadcaster attached"""
+    log_file = tmp_path / "openclaw.log"
+    log_file.write_text("")
+    follower = LogFollower(log_file=log_file, checkpoint_file=tmp_path / "checkpoint.json")
+    follower.broadcaster = LogBroadcaster(max_queue=1)
+    follower.add_handler(follower.broadcaster.publish)
+    follower.poll()
+    return follower
+
+
+def append(follower, text):
+    with open(follower.log_file, 'a') as f:
+        f.write(text)
+
+
+def test_lines_are_shared_and_slow_clients_drop(follower):
+    """Every client gets the same encoded chunk; a full queue drops instead of blocking"""
+    async def scenario():
+        broadcaster = follower.broadcaster
+        fast = broadcaster.subscribe()
+        slow = broadcaster.subscribe()
+        
+        append(follower, "first\n")
+        follower.poll()
+        await asyncio.sleep(0)
+        chunk = fast.queue.get_nowait()
+        assert chunk == b"id: 0\ndata: first\n\n"
+        assert slow.queue.get_nowait() is chunk
+        
+        append(follower, "second\n")
+        follower.poll()
+        await asyncio.sleep(0)
+        slow_backlog = slow.queue.qsize()
+        fast.queue.get_nowait()
+        
+        append(follower, "third\n")
+        follower.poll()
+        await asyncio.sleep(0)
+        assert fast.queue.get_nowait() == b"id: 13\ndata: third\n\n"
+        assert slow_backlog == 1 and slow.dropped == 1
+        assert broadcaster.stats()["chunks_dropped"] == 1
+    
+    asyncio.run(scenario())
+
+
+def test_stream_reports_drops_and_unsubscribes(follower):
+    """The SSE stream announces dropped chunks and cleans up on close"""
+    async def scenario():
+        broadcaster = follower.broadcaster
+        stream = broadcaster.stream()
+        assert await stream.__anext__() == b": connected\n\n"
+        
+        append(follower, "a\n")
+        follower.poll()
+        append(follower, "b\n")
+        follower.poll()
+        await asyncio.sleep(0)
+        
+        assert await stream.__anext__() == b"event: dropped\ndata: 1\n\n"
+        assert await stream.__anext__() == b"id: 0\ndata: a\n\n"
+        await stream.aclose()
+        assert broadcaster.stats()["subscribers"] == 0
+    
+    asyncio.run(scenario())
+
+
+def test_no_work_without_subscribers(follower):
+    """Lines are not encoded when nobody is listening"""
+    append(follower, "ignored\n")
+    follower.poll()
+    assert follower.broadcaster.stats()["chunks_published"] == 0
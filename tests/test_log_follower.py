@@ -0,0 +1,63 @@
+"""Tests for live log following"""
+import os
+import pytest
+from clawcontrol.services.log_follower import LogFollower
+
+
+@pytest.fixture
+def follower(tmp_path):
+    """Create follower over a temp log with a collecting handler"""
+    log_file = tmp_path / "openclaw.log"
+    log_file.write_text("old line before start\n")
+    follower = LogFollower(log_file=log_file, checkpoint_file=tmp_path / "checkpoint.json")
+    follower.collected = []
+    follower.add_handler(lambda lines, offsets: follower.collected.extend(zip(offsets, lines)))
+    follower.poll()
+    return follower
+
+
+def append(follower, text):
+    with open(follower.log_file, 'a') as f:
+        f.write(text)
+
+
+def test_reads_only_new_complete_lines(follower):
+    """Existing content is skipped and partial lines wait for their newline"""
+    assert follower.collected == []
+    
+    append(follower, "first\nsecond part")
+    assert follower.poll() == 1
+    assert follower.collected == [(22, "first")]
+    
+    append(follower, "ial\n")
+    follower.poll()
+    assert follower.collected[-1] == (28, "second partial")
+    assert follower.last_latency_ms is not None
+
+
+def test_truncation_and_rotation(follower):
+    """Truncated or replaced files are read again from the start"""
+    with open(follower.log_file, 'w') as f:
+        f.write("after truncate\n")
+    follower.poll()
+    assert follower.collected[-1] == (0, "after truncate")
+    
+    append(follower, "tail of old file\n")
+    os.rename(follower.log_file, str(follower.log_file) + ".1")
+    follower.log_file.write_text("new file\n")
+    follower.poll()
+    assert [line for _, line in follower.collected[-2:]] == ["tail of old file", "new file"]
+
+
+def test_checkpoint_resume(follower, tmp_path):
+    """A restarted follower resumes from the persisted offset"""
+    append(follower, "one\n")
+    follower.poll()
+    follower.stop()
+    
+    append(follower, "two\n")
+    resumed = LogFollower(log_file=follower.log_file, checkpoint_file=tmp_path / "checkpoint.json")
+    collected = []
+    resumed.add_handler(lambda lines, offsets: collected.extend(lines))
+    resumed.poll()
+    assert collected == ["two"]
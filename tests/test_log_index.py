@@ -0,0 +1,110 @@
+"""Tests for the inverted log index and search"""
+import time
+import pytest
+from clawcontrol.services.log_follower import LogFollower
+from clawcontrol.services.log_rotator import LogRotator
+from clawcontrol.services import log_index as log_index_module
+from clawcontrol.services.log_index import LogIndex
+
+
+@pytest.fixture
+def setup(tmp_path):
+    """Follower, rotator and index over a temp log"""
+    log_file = tmp_path / "openclaw.log"
+    log_file.write_text("")
+    follower = LogFollower(log_file=log_file, checkpoint_file=tmp_path / "checkpoint.json")
+    rotator = LogRotator(log_file=log_file, archive_dir=tmp_path / "archive",
+                         max_bytes=1, block_bytes=256, retention_days=100000, follower=follower)
+    index = LogIndex(directory=tmp_path / "index", rotator=rotator, flush_lines=50)
+    follower.add_handler(index.add_lines)
+    follower.poll()
+    return follower, rotator, index
+
+
+def append(follower, lines):
+    with open(follower.log_file, 'a') as f:
+        f.writelines(line + "\n" for line in lines)
+    follower.poll()
+
+
+def test_terms_phrases_and_pages_across_rotation(setup):
+    """Hits come back oldest first from archived segments and the live log"""
+    follower, rotator, index = setup
+    append(follower, [f"[tool:shell] ls /tmp/dir{i}" for i in range(40)])
+    append(follower, ["[tool:shell] rm -rf /etc/passwd", "[tool:read_file] /etc/passwd"])
+    rotator.rotate()
+    append(follower, [f"[tool:shell] echo {i}" for i in range(40)])
+    append(follower, ["[tool:shell] cat /etc/passwd", "[tool:shell] passwd rm -rf later"])
+    
+    assert index.stats()["segments"] >= 1
+    hits, cursor = index.search("etc passwd")
+    assert [hit["line"] for hit in hits] == [
+        "[tool:shell] rm -rf /etc/passwd",
+        "[tool:read_file] /etc/passwd",
+        "[tool:shell] cat /etc/passwd"
+    ]
+    assert cursor is None
+    
+    hits, _ = index.search('"rm -rf /etc"')
+    assert [hit["line"] for hit in hits] == ["[tool:shell] rm -rf /etc/passwd"]
+    
+    first, cursor = index.search("shell", limit=30)
+    second, cursor = index.search("shell", limit=30, cursor=cursor)
+    third, cursor = index.search("shell", limit=30, cursor=cursor)
+    assert cursor is None
+    assert len(first) + len(second) + len(third) == 83
+    assert first[0]["line"] == "[tool:shell] ls /tmp/dir0"
+    assert third[-1]["line"] == "[tool:shell] passwd rm -rf later"
+
+
+def test_reload_catches_up_with_unindexed_lines(setup, tmp_path):
+    """A restarted index keeps flushed segments and indexes lines written meanwhile"""
+    follower, rotator, index = setup
+    append(follower, [f"before {i}" for i in range(60)])
+    index.flush()
+    
+    with open(follower.log_file, 'a') as f:
+        f.write("while down\n")
+    
+    reopened = LogIndex(directory=tmp_path / "index", rotator=rotator)
+    follower.handlers = [reopened.add_lines]
+    append(follower, ["after restart"])
+    
+    assert [hit["line"] for hit in reopened.search("before 59")[0]] == ["before 59"]
+    assert [hit["line"] for hit in reopened.search("down")[0]] == ["while down"]
+    assert [hit["line"] for hit in reopened.search("restart")[0]] == ["after restart"]
+    assert len(reopened.search("before", limit=100)[0]) == 60
+
+
+def test_large_catch_up_runs_in_chunks_beside_live_lines(setup, monkeypatch):
+    """A big backlog is indexed in the background while live lines queue behind it"""
+    monkeypatch.setattr(log_index_module, "CATCH_UP_CHUNK_BYTES", 256)
+    
+    follower, rotator, index = setup
+    # Written while the index was not following
+    handlers, follower.handlers = follower.handlers, []
+    append(follower, [f"backlog line {i}" for i in range(500)])
+    follower.handlers = handlers
+    
+    seen = []
+    original_add = index._add
+    
+    def tracking_add(position, tokens, size):
+        seen.append(position)
+        original_add(position, tokens, size)
+    
+    monkeypatch.setattr(index, "_add", tracking_add)
+    started = []
+    original_start = index._start_thread
+    monkeypatch.setattr(index, "_start_thread", lambda target: started.append(target) or original_start(target))
+    append(follower, ["live line one"])
+    append(follower, ["live line two"])
+    
+    deadline = time.monotonic() + 5
+    while index.stats()["catching_up"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    
+    assert started and index.stats()["catching_up"] is False
+    assert seen == sorted(seen)
+    assert len(index.search("backlog", limit=1000)[0]) == 500
+    assert [hit["line"] for hit in index.search("live")[0]] == ["live line one", "live line two"]
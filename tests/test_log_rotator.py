@@ -0,0 +1,84 @@
+"""Tests for OpenClaw log rotation and time-range queries"""
+from datetime import datetime, timedelta
+from clawcontrol.services.log_follower import LogFollower
+from clawcontrol.services.log_rotator import LogRotator
+
+START = datetime(2026, 1, 1, 14, 0, 0)
+
+
+def write_lines(path, first, count):
+    with open(path, 'a') as f:
+        for i in range(first, first + count):
+            f.write(f"{(START + timedelta(seconds=i)).isoformat()} INFO line {i}\n")
+            if i % 7 == 0:
+                f.write("    continuation without timestamp\n")
+
+
+def make_rotator(tmp_path, **kwargs):
+    options = dict(max_bytes=4096, block_bytes=1024, retention_days=100000)
+    options.update(kwargs)
+    return LogRotator(log_file=tmp_path / "openclaw.log", archive_dir=tmp_path / "archive", **options)
+
+
+def test_rotation_and_range_query(tmp_path):
+    """Queries read only the overlapping blocks across segments and the live log"""
+    rotator = make_rotator(tmp_path)
+    for first in (0, 300, 600):
+        write_lines(rotator.log_file, first, 300)
+        assert rotator.rotate() is True
+    write_lines(rotator.log_file, 900, 20)
+    assert rotator.rotate() is False
+    
+    stats = rotator.stats()
+    assert stats["segments"] == 3
+    assert stats["archived_bytes"] < stats["raw_bytes"]
+    
+    lines, blocks_read = rotator.query(START + timedelta(seconds=280), START + timedelta(seconds=320))
+    ids = [int(line.split()[-1]) for line in lines if "INFO" in line]
+    assert ids == list(range(280, 321))
+    assert sum(1 for line in lines if "continuation" in line) == 6
+    assert blocks_read <= 4
+    
+    live, _ = rotator.query(START + timedelta(seconds=910), START + timedelta(seconds=911))
+    assert [line.split()[-1] for line in live if "INFO" in line] == ["910", "911"]
+
+
+def test_index_rebuilt_and_retention(tmp_path):
+    """A missing index is rebuilt from the gzip members; size limits prune old segments"""
+    rotator = make_rotator(tmp_path)
+    write_lines(rotator.log_file, 0, 300)
+    rotator.rotate()
+    (tmp_path / "archive" / "segment-00000001.idx.json").unlink()
+    
+    reopened = make_rotator(tmp_path)
+    original = rotator._segments[0][1]
+    rebuilt = reopened._segments[0][1]
+    assert rebuilt["blocks"] == original["blocks"]
+    assert rebuilt["lines"] == original["lines"]
+    
+    size = original["size"]
+    limited = make_rotator(tmp_path, max_archive_bytes=int(size * 2.5))
+    for first in (300, 600):
+        write_lines(limited.log_file, first, 300)
+        limited.rotate()
+    assert [seq for seq, _ in limited._segments] == [2, 3]
+    assert not (tmp_path / "archive" / "segment-00000001.log.gz").exists()
+
+
+def test_follower_drains_before_truncation(tmp_path):
+    """Lines appended up to the truncation are all seen by the follower"""
+    rotator = make_rotator(tmp_path)
+    rotator.log_file.write_text("")
+    follower = LogFollower(log_file=rotator.log_file, checkpoint_file=tmp_path / "checkpoint.json")
+    seen = []
+    follower.add_handler(lambda lines, offsets: seen.extend(lines))
+    follower.poll()
+    rotator.follower = follower
+    
+    write_lines(rotator.log_file, 0, 300)
+    rotator.rotate()
+    write_lines(rotator.log_file, 300, 1)
+    follower.poll()
+    
+    assert sum(1 for line in seen if "INFO" in line) == 301
+    assert seen[-1].endswith("line 300")
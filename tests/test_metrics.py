@@ -0,0 +1,28 @@
+"""Tests for the background metrics sampler"""
+import time
+from clawcontrol.services.metrics import MetricsCollector
+
+
+def test_collect_does_not_block():
+    """Collecting returns immediately instead of sleeping for a CPU reading"""
+    collector = MetricsCollector()
+    started = time.perf_counter()
+    metrics = collector.collect_system_metrics()
+    assert time.perf_counter() - started < 0.05
+    assert metrics["thread_count"] >= 1
+    assert collector.sampler_stats()["samples"] == 1
+
+
+def test_sampler_fills_history_and_reports_overhead():
+    """The sampler thread appends samples; readers get the latest one"""
+    collector = MetricsCollector(sample_interval=0.01)
+    collector.start()
+    time.sleep(0.2)
+    collector.stop()
+    
+    stats = collector.sampler_stats()
+    assert stats["samples"] >= 5
+    assert len(collector.cpu_history) == stats["samples"]
+    assert stats["max_ms"] >= stats["avg_ms"] > 0
+    assert collector.get_stats()["threads"]["current"] == collector.latest["thread_count"]
+    assert collector.get_history("memory", limit=3) == list(collector.memory_history)[-3:]
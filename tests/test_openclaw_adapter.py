@@ -1,4 +1,8 @@
 """Tests for OpenClaw adapter (mocked)"""
+import asyncio
+import signal
+import sys
+import time
 import pytest
 from unittest.mock import patch, MagicMock
 from clawcontrol.services.openclaw_adapter import OpenClawAdapter
@@ -22,3 +26,186 @@ def test_start_openclaw(mock_popen, adapter):
     status = adapter.start()
     assert status.running is True
     assert status.pid == 12345
+
+
+def test_logs_tail_reads_from_end(adapter, monkeypatch):
+    """Tail returns the last lines across block boundaries"""
+    monkeypatch.setattr("clawcontrol.services.openclaw_adapter.TAIL_BLOCK_SIZE", 16)
+    adapter.log_file.write_text("".join(f"line {i}\n" for i in range(50)))
+    
+    assert adapter.logs(tail=3) == ["line 47\n", "line 48\n", "line 49\n"]
+    assert adapter.logs(tail=100) == [f"line {i}\n" for i in range(50)]
+    
+    lines, offset = adapter.tail(2)
+    assert offset == adapter.log_file.stat().st_size
+
+
+def test_read_since_offset(adapter):
+    """Reads resume from the cursor and skip partial lines"""
+    adapter.log_file.write_text("first\nsecond\n")
+    _, offset = adapter.tail(10)
+    
+    with open(adapter.log_file, 'a') as f:
+        f.write("third\nfour")
+    lines, offset = adapter.read_since(offset)
+    assert lines == ["third\n"]
+    
+    with open(adapter.log_file, 'a') as f:
+        f.write("th\n")
+    lines, offset = adapter.read_since(offset)
+    assert lines == ["fourth\n"]
+    assert adapter.read_since(offset) == ([], offset)
+    
+    adapter.log_file.write_text("new\n")
+    assert adapter.read_since(offset) == (["new\n"], 4)
+
+
+IGNORES_SIGTERM = (
+    "import signal, time\n"
+    "signal.signal(signal.SIGTERM, signal.SIG_IGN)\n"
+    "print('ready', flush=True)\n"
+    "time.sleep(60)\n"
+)
+
+
+def script(tmp_path, name, body):
+    path = tmp_path / name
+    path.write_text(f"#!{sys.executable}\n{body}")
+    path.chmod(0o755)
+    return str(path)
+
+
+@pytest.mark.asyncio
+async def test_astop_keeps_event_loop_responsive(adapter, tmp_path):
+    """Stopping a child that ignores SIGTERM escalates to SIGKILL without blocking the loop"""
+    exits = []
+    adapter.add_exit_listener(exits.append)
+    status = await adapter.astart(script(tmp_path, "stubborn", IGNORES_SIGTERM))
+    assert status.running is True
+    
+    while "ready" not in adapter.log_file.read_text():
+        await asyncio.sleep(0.01)
+    
+    gaps = []
+    
+    async def ticker():
+        last = time.monotonic()
+        while True:
+            await asyncio.sleep(0.01)
+            now = time.monotonic()
+            gaps.append(now - last)
+            last = now
+    
+    ticking = asyncio.create_task(ticker())
+    status = await adapter.astop(timeout=0.5)
+    ticking.cancel()
+    
+    assert status.running is False
+    assert status.exit_code == -signal.SIGKILL
+    assert exits == [-signal.SIGKILL]
+    assert len(gaps) >= 20
+    assert max(gaps) < 0.1
+
+
+@pytest.mark.asyncio
+async def test_restart_on_failure(adapter, tmp_path):
+    """Failed runs are restarted with backoff up to max_restarts"""
+    adapter.restart_backoff = 0.01
+    adapter.max_restarts = 2
+    exits = []
+    adapter.add_exit_listener(exits.append)
+    
+    await adapter.astart(script(tmp_path, "failing", "raise SystemExit(3)\n"), restart_policy="on-failure")
+    while len(exits) < 3:
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.05)
+    
+    status = adapter.status()
+    assert exits == [3, 3, 3]
+    assert status.running is False
+    assert status.exit_code == 3
+    assert status.restarts == 2
+    await adapter.astop()
+
+
+@pytest.mark.asyncio
+async def test_capture_mode(adapter, tmp_path):
+    """Piped output reaches handlers, the ring buffer and the log file"""
+    from clawcontrol.services.log_follower import LogFollower
+    
+    adapter.capture_mode = True
+    adapter.follower = LogFollower(log_file=adapter.log_file, checkpoint_file=tmp_path / "checkpoint.json")
+    handled = []
+    adapter.follower.add_handler(lambda lines, offsets: handled.extend(zip(offsets, lines)))
+    
+    body = "for i in range(500):\n    print(f'line {i}')\nprint('no newline', end='')\n"
+    await adapter.astart(script(tmp_path, "chatty", body))
+    while adapter.returncode is None:
+        await asyncio.sleep(0.01)
+    
+    assert len(handled) == 501
+    assert handled[:2] == [(0, "line 0"), (7, "line 1")]
+    assert adapter.logs(tail=2) == ["line 499\n", "no newline\n"]
+    assert adapter.log_file.read_text().splitlines()[-1] == "no newline"
+    
+    adapter.buffer.max_bytes = 100
+    adapter.buffer.extend(["x" * 30 + "\n"] * 5)
+    assert adapter.buffer.stats()["bytes"] <= 100
+    assert len(adapter.logs(tail=100)) == 3
+    await adapter.astop()
+
+
+@pytest.mark.asyncio
+async def test_start_cancels_pending_restart(adapter, tmp_path):
+    """Starting during a restart backoff leaves exactly one child"""
+    adapter.restart_backoff = 0.3
+    adapter.max_restarts = 5
+    exits = []
+    adapter.add_exit_listener(exits.append)
+    
+    await adapter.astart(script(tmp_path, "failing", "raise SystemExit(3)\n"), restart_policy="on-failure")
+    while not exits:
+        await asyncio.sleep(0.01)
+    
+    status = await adapter.astart(script(tmp_path, "stubborn", IGNORES_SIGTERM))
+    await asyncio.sleep(0.5)
+    assert adapter.status().pid == status.pid
+    assert exits == [3]
+    
+    status = await adapter.astop(timeout=0.5)
+    assert status.running is False
+    assert exits == [3, -signal.SIGKILL]
+
+
+@pytest.mark.asyncio
+async def test_capture_offsets_survive_rotation(adapter, tmp_path):
+    """Positions of captured lines resolve to the same lines after the log is rotated"""
+    from clawcontrol.services.log_follower import LogFollower
+    from clawcontrol.services.log_rotator import LogRotator
+    
+    adapter.capture_mode = True
+    adapter.follower = LogFollower(log_file=adapter.log_file, checkpoint_file=tmp_path / "checkpoint.json")
+    rotator = LogRotator(log_file=adapter.log_file, archive_dir=tmp_path / "archive", follower=adapter.follower)
+    handled = []
+    adapter.follower.add_handler(
+        lambda lines, offsets: handled.extend((rotator.live_base + o, line) for o, line in zip(offsets, lines))
+    )
+    
+    marker = tmp_path / "rotated"
+    body = (
+        "import os, time\n"
+        "for i in range(5):\n    print(f'alpha {i}', flush=True)\n"
+        f"while not os.path.exists({str(marker)!r}):\n    time.sleep(0.01)\n"
+        "for i in range(5):\n    print(f'beta {i}', flush=True)\n"
+    )
+    await adapter.astart(script(tmp_path, "rotating", body))
+    while len(handled) < 5:
+        await asyncio.sleep(0.01)
+    assert rotator.rotate(force=True) is True
+    marker.touch()
+    while adapter.returncode is None:
+        await asyncio.sleep(0.01)
+    
+    assert [line for _, line in handled] == [f"alpha {i}" for i in range(5)] + [f"beta {i}" for i in range(5)]
+    assert [rotator.read_line(position) for position, _ in handled] == [line for _, line in handled]
+    await adapter.astop()
@@ -0,0 +1,69 @@
+"""Tests for compiled pattern matching"""
+import random
+from clawcontrol.services.pattern_matcher import PatternMatcher
+from clawcontrol.services.presets import PRESETS
+from clawcontrol.api.models import GuardRuleCreate
+
+
+def naive_first_match(rules, log_line):
+    """Reference implementation: the original nested loop"""
+    for rule in rules:
+        if not rule.enabled:
+            continue
+        for pattern in rule.block_patterns:
+            if pattern.lower() in log_line.lower():
+                return rule.id
+    return None
+
+
+def test_matcher_priority_and_case():
+    """Lowest priority wins regardless of position in the line"""
+    matcher = PatternMatcher([("SUDO", 1), ("rm -rf", 0), ("he", 2), ("she", 3)])
+    assert matcher.first_match("sudo rm -RF /") == 0
+    assert matcher.first_match("Sudo ls") == 1
+    assert matcher.first_match("ushers") == 2
+    assert matcher.first_match("nothing here") == 2
+    assert matcher.first_match("plain") is None
+
+
+def test_matcher_equivalent_to_naive_loop(engine):
+    """Compiled matcher returns the same first match as the nested loop"""
+    rng = random.Random(1234)
+    alphabet = "abcAB -/:."
+    
+    for preset in PRESETS.values():
+        engine.create_rule(GuardRuleCreate(
+            name=preset["name"],
+            block_patterns=preset["block_patterns"]
+        ))
+    for i in range(40):
+        engine.create_rule(GuardRuleCreate(
+            name=f"random-{i}",
+            block_patterns=[
+                "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4)))
+                for _ in range(rng.randint(0, 5))
+            ],
+            enabled=rng.random() > 0.2
+        ))
+    
+    words = [p for preset in PRESETS.values() for p in preset["block_patterns"]]
+    for _ in range(2000):
+        line = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        if rng.random() < 0.3:
+            line += rng.choice(words).upper()
+        violation = engine.evaluate_log_line(line)
+        expected = naive_first_match(engine.get_all_rules(), line)
+        assert (violation.rule_id if violation else None) == expected
+
+
+def test_matcher_rebuilt_on_rule_change(engine):
+    """Disabling or deleting a rule takes effect immediately"""
+    rule = engine.create_rule(GuardRuleCreate(name="Test", block_patterns=["danger"]))
+    assert engine.evaluate_log_line("DANGER zone") is not None
+    
+    engine.update_rule(rule.id, {"enabled": False})
+    assert engine.evaluate_log_line("DANGER zone") is None
+    
+    engine.update_rule(rule.id, {"enabled": True})
+    engine.delete_rule(rule.id)
+    assert engine.evaluate_log_line("DANGER zone") is None
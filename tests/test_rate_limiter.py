@@ -0,0 +1,39 @@
+"""Tests for per-rule rate limiting"""
+from clawcontrol.services.rate_limiter import TokenBucketLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+def test_limit_and_refill():
+    """Bucket empties at the limit and refills over time"""
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(clock=clock)
+    
+    assert all(limiter.acquire("rule", 3) for _ in range(3))
+    assert limiter.acquire("rule", 3) is False
+    
+    clock.now += 20  # 3/min -> one token every 20s
+    assert limiter.acquire("rule", 3) is True
+    assert limiter.acquire("rule", 3) is False
+
+
+def test_limits_above_1000_and_sources():
+    """Large limits trigger and sources have independent buckets"""
+    limiter = TokenBucketLimiter(clock=FakeClock())
+    
+    results = [limiter.acquire("rule", 5000) for _ in range(5001)]
+    assert results.count(True) == 5000
+    assert results[-1] is False
+    
+    assert limiter.acquire("rule", 1, source="a") is True
+    assert limiter.acquire("rule", 1, source="a") is False
+    assert limiter.acquire("rule", 1, source="b") is True
+    
+    limiter.forget("rule")
+    assert limiter.acquire("rule", 1, source="a") is True
@@ -0,0 +1,82 @@
+"""Tests for rule snapshots and hot reload of rules.json"""
+import json
+import time
+import pytest
+from clawcontrol.core.config import config
+from clawcontrol.services import guardrails as guardrails_module
+from clawcontrol.api.models import GuardRuleCreate
+
+
+def write_rules(path, rules):
+    with open(path, 'w') as f:
+        json.dump({"rules": rules}, f)
+
+
+def test_own_saves_are_not_reloaded(engine):
+    """Rules saved through the API do not trigger a reload"""
+    engine.create_rule(GuardRuleCreate(name="Block rm", block_patterns=["rm -rf"]))
+    assert engine.reload_rules_if_changed() is False
+
+
+def test_hand_edit_is_reloaded(engine):
+    """Editing rules.json directly swaps in the new rules"""
+    engine.create_rule(GuardRuleCreate(name="Block rm", block_patterns=["rm -rf"]))
+    write_rules(config.rules_file, [
+        {"id": "manual", "name": "Block dd", "block_patterns": ["dd if="]}
+    ])
+    
+    assert engine.reload_rules_if_changed() is True
+    assert list(engine.rules) == ["manual"]
+    assert engine.evaluate_log_line("rm -rf /") is None
+    assert engine.evaluate_log_line("dd if=/dev/zero").rule_id == "manual"
+
+
+def test_snapshot_is_stable_during_evaluation(engine):
+    """A snapshot taken before an update keeps evaluating the old rules"""
+    rule = engine.create_rule(GuardRuleCreate(name="Block rm", block_patterns=["rm -rf"]))
+    snapshot = engine._snapshot
+    
+    engine.update_rule(rule.id, {"block_patterns": ["shutdown"]})
+    
+    assert snapshot.matcher.first_match("rm -rf /") == 0
+    assert snapshot.rules[rule.id].block_patterns == ["rm -rf"]
+    assert engine.evaluate_log_line("rm -rf /") is None
+    with pytest.raises(TypeError):
+        engine.rules["other"] = rule
+
+
+def test_watcher_reloads_in_background(engine):
+    """The watcher thread picks up a hand edit without any API call"""
+    engine.start_watching(interval=0.01)
+    write_rules(config.rules_file, [
+        {"id": "manual", "name": "Block dd", "block_patterns": ["dd if="]}
+    ])
+    
+    deadline = time.monotonic() + 2
+    while "manual" not in engine.rules and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert "manual" in engine.rules
+
+
+def test_invalid_edit_keeps_current_rules(engine):
+    """A half-written or malformed rules.json does not drop the loaded rules"""
+    rule = engine.create_rule(GuardRuleCreate(name="Block rm", block_patterns=["rm -rf"]))
+    with open(config.rules_file, 'w') as f:
+        f.write('{"rules": [')
+    
+    assert engine.reload_rules_if_changed() is False
+    assert engine.evaluate_log_line("rm -rf /").rule_id == rule.id
+
+
+def test_rules_compile_outside_sequence_lock(engine, monkeypatch):
+    """Sequence evaluation is not paused while a rule edit compiles"""
+    compile_rules = guardrails_module.CompiledRules
+    held = []
+    
+    def spy(rules):
+        held.append(engine._sequence_lock.locked())
+        return compile_rules(rules)
+    
+    monkeypatch.setattr(guardrails_module, "CompiledRules", spy)
+    engine.create_rule(GuardRuleCreate(name="Block rm", block_patterns=["rm -rf"]))
+    assert held == [False]
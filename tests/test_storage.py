@@ -0,0 +1,92 @@
+"""Tests for the SQLite storage backend"""
+import json
+from datetime import datetime, timedelta
+import pytest
+from clawcontrol.services.storage import MIGRATIONS, SQLiteStorage
+from clawcontrol.services.violation_store import SQLiteViolationStore
+from clawcontrol.services.alerts import AlertSystem
+from clawcontrol.services.analytics import AnalyticsTracker
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SQLiteStorage(tmp_path / "clawcontrol.db")
+    yield storage
+    storage.close()
+
+
+def test_schema_and_wal(storage, tmp_path):
+    """A new database is migrated to the latest schema in WAL mode"""
+    assert storage.schema_version == len(MIGRATIONS)
+    assert storage.query("PRAGMA journal_mode")[0][0] == "wal"
+    storage.close()
+    
+    reopened = SQLiteStorage(tmp_path / "clawcontrol.db")
+    assert reopened.schema_version == len(MIGRATIONS)
+    reopened.close()
+
+
+def test_violations_query_and_import(storage, tmp_path):
+    """JSONL history is imported once; queries filter and page by time and rule"""
+    now = datetime.now()
+    legacy = tmp_path / "segment-00000001.jsonl"
+    legacy.write_text("".join(
+        json.dumps({"ts": (now - timedelta(minutes=10 - i)).isoformat(), "rule_id": f"r{i % 2}",
+                    "log_excerpt": f"line {i}", "severity": "high"}) + "\n"
+        for i in range(10)
+    ))
+    
+    store = SQLiteViolationStore(storage)
+    assert store.import_files([legacy]) == 10
+    assert store.import_files([legacy]) == 0
+    store.append([{"ts": now.isoformat(), "rule_id": "r0", "log_excerpt": "new", "severity": "low"}])
+    
+    entries, cursor = store.query(rule_id="r0", limit=4)
+    assert [e["log_excerpt"] for e in entries] == ["line 0", "line 2", "line 4", "line 6"]
+    entries, cursor = store.query(rule_id="r0", limit=4, cursor=cursor)
+    assert [e["log_excerpt"] for e in entries] == ["line 8", "new"]
+    assert cursor is None
+    
+    entries, _ = store.query(since=now - timedelta(minutes=2), severity="high")
+    assert [e["log_excerpt"] for e in entries] == ["line 8", "line 9"]
+    assert store.stats()["entries"] == 11
+
+
+def test_alerts_import_and_persist(storage, tmp_path):
+    """JSON alerts move into the database; later changes persist as row updates"""
+    alerts_file = tmp_path / "alerts.json"
+    json_alerts = AlertSystem(alerts_file=alerts_file, storage=None)
+    json_alerts.system_alert("From JSON", "details")
+    json_alerts.close()
+    
+    alerts = AlertSystem(alerts_file=alerts_file, storage=storage)
+    assert [a["title"] for a in alerts.get_alerts()] == ["From JSON"]
+    created = alerts.violation_alert("dangerous_command", "rm -rf /")
+    alerts.violation_alert("dangerous_command", "rm -rf /home")
+    alerts.mark_as_read(["0"])
+    alerts.close()
+    
+    reloaded = AlertSystem(alerts_file=alerts_file, storage=storage)
+    assert reloaded.get_alert("0")["read"] is True
+    assert reloaded.get_alert(created["id"])["count"] == 2
+    assert reloaded.unread_count == 1
+    assert reloaded.create_alert("next", "")["id"] == "2"
+    reloaded.close()
+
+
+def test_analytics_import_and_rollups(storage, tmp_path):
+    """Session history is imported and rollups rebuilt from one aggregate query"""
+    tracker = AnalyticsTracker(tmp_path / "analytics.json", tmp_path / "sessions.jsonl", storage=None)
+    for i in range(5):
+        tracker.track_session(duration=10, actions=2, violations=1)
+    tracker.close()
+    
+    tracker = AnalyticsTracker(tmp_path / "analytics.json", tmp_path / "sessions.jsonl", storage=storage)
+    tracker.track_session(duration=40, actions=1, violations=0)
+    expected = {"total_sessions": 6, "total_actions": 11, "total_violations": 5, "avg_duration": 15.0}
+    assert tracker.get_stats() == expected
+    tracker.close()
+    
+    reloaded = AnalyticsTracker(tmp_path / "analytics.json", tmp_path / "sessions.jsonl", storage=storage)
+    assert reloaded.get_stats(days=365) == expected
+    assert len(list(reloaded.history())) == 6
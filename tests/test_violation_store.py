@@ -0,0 +1,94 @@
+"""Tests for the segmented violation store"""
+import gc
+import json
+import weakref
+import pytest
+from datetime import datetime, timedelta
+from clawcontrol.services.violation_store import ViolationStore
+
+START = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def make_entries(count, rule_ids=("a", "b")):
+    return [
+        {
+            "ts": (START + timedelta(seconds=i)).isoformat(),
+            "rule_id": rule_ids[i % len(rule_ids)],
+            "log_excerpt": f"line {i}",
+            "severity": "warning" if i % 10 else "critical"
+        }
+        for i in range(count)
+    ]
+
+
+def test_since_until_filters_and_cursor(tmp_path):
+    """Range queries span segments and pages resume from the cursor"""
+    store = ViolationStore(tmp_path, segment_max_bytes=4096, index_interval=8, retention_days=100000)
+    store.append(make_entries(1000))
+    assert store.stats()["segments"] > 5
+    
+    since = START + timedelta(seconds=100)
+    until = START + timedelta(seconds=399)
+    page, cursor = store.query(since=since, until=until, limit=120)
+    assert [e["log_excerpt"] for e in page] == [f"line {i}" for i in range(100, 220)]
+    
+    seen = list(page)
+    while cursor:
+        page, cursor = store.query(since=since, until=until, limit=120, cursor=cursor)
+        seen.extend(page)
+    assert len(seen) == 300
+    
+    critical, _ = store.query(since=since, severity="critical", rule_id="a", limit=1000)
+    assert all(e["severity"] == "critical" and e["rule_id"] == "a" for e in critical)
+    assert len(critical) == 90
+    store.close()
+
+
+def test_reload_and_legacy_import(tmp_path):
+    """Indexes survive a restart and violations.log is imported once"""
+    legacy = tmp_path / "violations.log"
+    legacy.write_text("\n".join(json.dumps(e) for e in make_entries(50)) + "\n")
+    
+    store = ViolationStore(tmp_path / "store", segment_max_bytes=2048, retention_days=100000)
+    assert store.import_jsonl(legacy) == 50
+    store.append(make_entries(10, rule_ids=("late",)))
+    store.close()
+    
+    reopened = ViolationStore(tmp_path / "store", segment_max_bytes=2048, retention_days=100000)
+    assert reopened.import_jsonl(legacy) == 0
+    assert reopened.stats()["entries"] == 60
+    late, _ = reopened.query(rule_id="late", limit=100)
+    assert len(late) == 10
+    reopened.close()
+
+
+def test_query_skips_malformed_lines(tmp_path):
+    """A corrupt line is skipped; only a bad cursor raises ValueError"""
+    store = ViolationStore(tmp_path, retention_days=100000)
+    store.append(make_entries(5))
+    store.close()
+    with open(store._segments[-1].path, 'a') as f:
+        f.write("not json\n")
+        f.write(json.dumps({"rule_id": "a"}) + "\n")
+    
+    reopened = ViolationStore(tmp_path, retention_days=100000)
+    reopened.append(make_entries(2, rule_ids=("late",)))
+    entries, _ = reopened.query(since=START, limit=100)
+    assert len(entries) == 7
+    
+    with pytest.raises(ValueError):
+        reopened.query(since=START, cursor="not-a-cursor")
+    reopened.close()
+
+
+def test_rolled_writers_are_released(tmp_path):
+    """Writers of sealed segments are freed, not kept alive until exit"""
+    store = ViolationStore(tmp_path, segment_max_bytes=4096, retention_days=100000)
+    store.append(make_entries(10))
+    first = weakref.ref(store._writer)
+    store.append(make_entries(500))
+    assert store.stats()["segments"] > 1
+    
+    gc.collect()
+    assert first() is None
+    store.close()
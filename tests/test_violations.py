@@ -1,21 +1,7 @@
 """Tests for violations"""
-import pytest
-from clawcontrol.services.guardrails import GuardrailsEngine
 from clawcontrol.api.models import GuardRuleCreate
 
 
-@pytest.fixture
-def engine(tmp_path):
-    """Create engine"""
-    from clawcontrol.core import constants
-    constants.CONFIG_DIR = tmp_path / "config"
-    constants.LOGS_DIR = tmp_path / "logs"
-    constants.CONFIG_DIR.mkdir(parents=True)
-    constants.LOGS_DIR.mkdir(parents=True)
-    
-    return GuardrailsEngine()
-
-
 def test_evaluate_violation(engine):
     """Test violation detection (soft alert)"""
     rule = engine.create_rule(GuardRuleCreate(
@@ -26,3 +12,18 @@ def test_evaluate_violation(engine):
     violation = engine.evaluate_log_line("dangerous command")
     assert violation is not None
     assert violation.rule_id == rule.id
+
+
+def test_evaluate_batch(engine):
+    """Test batch evaluation persists all violations in one pass"""
+    rule = engine.create_rule(GuardRuleCreate(
+        name="Batch",
+        block_patterns=["batch-danger-7f3"]
+    ))
+    
+    lines = ["safe line", "BATCH-DANGER-7F3 here", "another safe line", "batch-danger-7f3 again"]
+    violations = engine.evaluate_log_lines(lines)
+    assert [v.rule_id for v in violations] == [rule.id, rule.id]
+    
+    logged, _ = engine.query_violations(rule_id=rule.id)
+    assert len(logged) == 2